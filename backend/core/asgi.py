@@ -1,20 +1,35 @@
 import os
 
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
-
-import game.routing
-from game.ws_auth import TokenAuthMiddleware
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
+# Django app registry, consumer/model importlarından önce hazır olmalı
+# (daphne core.asgi:application ile doğrudan çalıştırırken gerekli)
 django_asgi_app = get_asgi_application()
 
-application = ProtocolTypeRouter(
-    {
-        "http": django_asgi_app,
-        "websocket": TokenAuthMiddleware(
-            URLRouter(game.routing.websocket_urlpatterns)
-        ),
-    }
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from django.core.exceptions import ImproperlyConfigured  # noqa: E402
+
+import game.routing  # noqa: E402
+from game import bets, reaper  # noqa: E402
+from game.background import BackgroundTasks  # noqa: E402
+from game.checks import check_shared_cache  # noqa: E402
+from game.ws_auth import TokenAuthMiddleware  # noqa: E402
+
+# daphne `manage.py check` çalıştırmaz; paylaşılmayan cache ile worker hiç başlamasın
+for error in check_shared_cache():
+    raise ImproperlyConfigured(f"{error.msg} {error.hint}")
+
+application = BackgroundTasks(
+    ProtocolTypeRouter(
+        {
+            "http": django_asgi_app,
+            "websocket": TokenAuthMiddleware(
+                URLRouter(game.routing.websocket_urlpatterns)
+            ),
+        }
+    ),
+    # worker başına: BetSettings değişikliklerini diğer worker'lardan dinle, zaman aşımları
+    tasks=[bets.listen, reaper.run],
 )
@@ -2,17 +2,24 @@ from django.contrib import admin
 from django.urls import path, include
 
 from game.views import (
+    BetSettingsView,
     MeView as GameMeView,
     RoomListCreateView,
     RoomJoinView,
     TransactionListView,
+    TransactionExportView,
     LeaderboardView,
+    LeaderboardMeView,
+    MatchmakingView,
+    LobbyBootstrapView,
     lobby_view,
     play_room_view,
 )
+from game.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
 
     # Django template UI
     path("", lobby_view, name="lobby"),
@@ -23,8 +30,13 @@ urlpatterns = [
 
     # Game API
     path("api/me/", GameMeView.as_view(), name="api-me"),
+    path("api/lobby/bootstrap/", LobbyBootstrapView.as_view(), name="api-lobby-bootstrap"),
+    path("api/bet-settings/", BetSettingsView.as_view(), name="api-bet-settings"),
     path("api/rooms/", RoomListCreateView.as_view(), name="api-rooms"),
     path("api/rooms/<int:room_id>/join/", RoomJoinView.as_view(), name="api-room-join"),
+    path("api/matchmaking/", MatchmakingView.as_view(), name="api-matchmaking"),
     path("api/transactions/", TransactionListView.as_view(), name="api-transactions"),
+    path("api/transactions/export.<str:fmt>", TransactionExportView.as_view(), name="api-transactions-export"),
     path("api/leaderboard/", LeaderboardView.as_view(), name="api-leaderboard"),
+    path("api/leaderboard/me/", LeaderboardMeView.as_view(), name="api-leaderboard-me"),
 ]
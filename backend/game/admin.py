@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import BetSettings, Room, AccountTransaction
+from django.db import transaction
+
+from .models import AccountTransaction, ArchivedRoom, ArchivedTransaction, BetSettings, Room
+from .room_list import invalidate_room_list
 
 
 @admin.register(BetSettings)
@@ -27,6 +30,19 @@ class RoomAdmin(admin.ModelAdmin):
     search_fields = ("id", "player1__username", "player2__username", "winner__username")
     ordering = ("-id",)
 
+    # oda listesi cache'i / ETag'i sadece bilinen yazma yollarında düşer; admin düzenlemeleri de görünsün
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(invalidate_room_list)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(invalidate_room_list)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        transaction.on_commit(invalidate_room_list)
+
 
 @admin.register(AccountTransaction)
 class AccountTransactionAdmin(admin.ModelAdmin):
@@ -34,3 +50,30 @@ class AccountTransactionAdmin(admin.ModelAdmin):
     list_filter = ("type",)
     search_fields = ("user__username", "room__id")
     ordering = ("-id",)
+
+
+@admin.register(ArchivedRoom)
+class ArchivedRoomAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "status",
+        "bet_amount",
+        "player1",
+        "player2",
+        "turn_count",
+        "started_at",
+        "finished_at",
+        "winner",
+        "archived_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("id", "player1__username", "player2__username", "winner__username")
+    ordering = ("-id",)
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "type", "amount", "balance_after", "room_id", "created_at", "archived_at")
+    list_filter = ("type",)
+    search_fields = ("user__username", "room_id")
+    ordering = ("-id",)
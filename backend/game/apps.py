@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class GameConfig(AppConfig):
     name = 'game'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks, signals  # noqa: F401
+        from .metrics import install_query_wrapper
+
+        connection_created.connect(install_query_wrapper, dispatch_uid="game_metrics_query_wrapper")
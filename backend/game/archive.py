@@ -0,0 +1,102 @@
+"""
+Eski geçmişin arşiv tablolarına taşınması: HISTORY_ARCHIVE_AFTER_DAYS'ten önce
+bitmiş (FINISHED / EXPIRED) odalar işlemleriyle birlikte ArchivedRoom /
+ArchivedTransaction'a batch batch taşınır; Room ve AccountTransaction sadece
+canlı ve yakın geçmişi tutar. Liste endpoint'leri arşivi de okur (read-through).
+
+Bakiye User.balance'ta tutulduğu için işlemleri taşımak bakiyeyi etkilemez.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AccountTransaction, ArchivedRoom, ArchivedTransaction, Room
+
+ARCHIVED_ROOM_STATUSES = (Room.Status.FINISHED, Room.Status.EXPIRED)
+
+ROOM_ARCHIVE_FIELDS = (
+    "id",
+    "bet_amount",
+    "status",
+    "player1_id",
+    "player2_id",
+    "winner_id",
+    "secret_number",
+    "turn_count",
+    "started_at",
+    "finished_at",
+    "created_at",
+)
+TRANSACTION_ARCHIVE_FIELDS = ("id", "user_id", "room_id", "type", "amount", "balance_after", "note", "created_at")
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, "HISTORY_ARCHIVE_AFTER_DAYS", 30)
+    return timezone.now() - timedelta(days=days)
+
+
+def _archive_transactions(values, room_bets: dict) -> int:
+    ArchivedTransaction.objects.bulk_create(
+        [ArchivedTransaction(room_bet_amount=room_bets.get(v["room_id"]), **v) for v in values],
+        # iki worker aynı batch'i işlerse ikincisi sessizce geçer
+        ignore_conflicts=True,
+    )
+    return AccountTransaction.objects.filter(id__in=[v["id"] for v in values]).delete()[0]
+
+
+def archive_room_batch(before, batch_size: int) -> tuple[int, int]:
+    """before'dan önce biten en eski batch_size odayı işlemleriyle taşır; (oda, işlem) sayısı."""
+    with transaction.atomic():
+        rooms = list(
+            Room.objects.filter(status__in=ARCHIVED_ROOM_STATUSES, finished_at__lt=before)
+            .order_by("id")
+            .values(*ROOM_ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rooms:
+            return 0, 0
+
+        room_ids = [r["id"] for r in rooms]
+        room_bets = {r["id"]: r["bet_amount"] for r in rooms}
+        txns = list(AccountTransaction.objects.filter(room_id__in=room_ids).values(*TRANSACTION_ARCHIVE_FIELDS))
+
+        ArchivedRoom.objects.bulk_create([ArchivedRoom(**r) for r in rooms], ignore_conflicts=True)
+        moved_txns = _archive_transactions(txns, room_bets) if txns else 0
+        moved_rooms = Room.objects.filter(id__in=room_ids).delete()[1].get(Room._meta.label, 0)
+    return moved_rooms, moved_txns
+
+
+def archive_orphan_transaction_batch(before, batch_size: int) -> int:
+    """Odasız (ADJUST vb.) eski işlemler."""
+    with transaction.atomic():
+        txns = list(
+            AccountTransaction.objects.filter(room__isnull=True, created_at__lt=before)
+            .order_by("id")
+            .values(*TRANSACTION_ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not txns:
+            return 0
+        return _archive_transactions(txns, {})
+
+
+def archive_history(before=None, batch_size=None, max_batches=None) -> tuple[int, int]:
+    """
+    Taşınacak bir şey kalmayana (ya da max_batches'e) kadar batch'ler halinde arşivler.
+    Her batch kendi transaction'ında; yarıda kesilirse kaldığı yerden devam eder.
+    """
+    before = before or archive_cutoff()
+    batch_size = batch_size or getattr(settings, "HISTORY_ARCHIVE_BATCH_SIZE", 500)
+
+    rooms_total = txns_total = batches = 0
+    while max_batches is None or batches < max_batches:
+        rooms, txns = archive_room_batch(before, batch_size)
+        if not rooms:
+            txns += archive_orphan_transaction_batch(before, batch_size)
+        rooms_total += rooms
+        txns_total += txns
+        batches += 1
+        if not rooms and not txns:
+            break
+    return rooms_total, txns_total
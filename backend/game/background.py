@@ -0,0 +1,38 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """
+    ASGI wrapper: worker'ın event loop'unda ilk bağlantıda verilen coroutine
+    fonksiyonlarını arka plan görevi olarak başlatır (Daphne lifespan desteklemez).
+    Hata ile biten görev birkaç saniye sonra yeniden başlatılır.
+    """
+
+    RESTART_DELAY = 5
+
+    def __init__(self, app, tasks):
+        self.app = app
+        self.tasks = list(tasks)
+        self._loop = None
+        self._running = []
+
+    async def __call__(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._running = [loop.create_task(self._supervise(task)) for task in self.tasks]
+        return await self.app(scope, receive, send)
+
+    async def _supervise(self, task):
+        while True:
+            try:
+                await task()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background task %s failed; restarting", task.__qualname__)
+            await asyncio.sleep(self.RESTART_DELAY)
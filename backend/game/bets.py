@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .models import BetSettings
+
+logger = logging.getLogger(__name__)
+
+BET_SETTINGS_GROUP = "bet_settings"
+
+
+class BetSettingsCache:
+    """
+    Process-local BetSettings kopyası: oda oluşturma / matchmaking yolunda sorgu yok.
+
+    Model kaydedilince / silinince signals.py on_commit'te invalidate() + broadcast()
+    çağırır; diğer worker'lar channel layer'daki BET_SETTINGS_GROUP'tan duyar
+    (bkz. listen). Mesaj kaçarsa BET_SETTINGS_CACHE_TTL sonunda yeniden okunur.
+    """
+
+    _MISSING = object()
+
+    def __init__(self):
+        self._value = self._MISSING
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        return getattr(settings, "BET_SETTINGS_CACHE_TTL", 60)
+
+    def get(self):
+        """{"min_bet", "max_bet", "step"} ya da ayar satırı yoksa None."""
+        value = self._value
+        if value is not self._MISSING and time.monotonic() - self._loaded_at < self.ttl:
+            return value
+
+        row = BetSettings.objects.values("min_bet", "max_bet", "step").first()
+        with self._lock:
+            self._value = row
+            self._loaded_at = time.monotonic()
+        return row
+
+    def invalidate(self):
+        with self._lock:
+            self._value = self._MISSING
+
+    def etag(self) -> str:
+        value = self.get()
+        if value is None:
+            return 'W/"bet-settings-none"'
+        return f'W/"bet-settings-{value["min_bet"]}-{value["max_bet"]}-{value["step"]}"'
+
+
+bet_settings_cache = BetSettingsCache()
+
+
+def get_bet_settings():
+    return bet_settings_cache.get()
+
+
+def validate_bet_amount(bet_amount: int) -> tuple[bool, str]:
+    settings_obj = get_bet_settings()
+    if not settings_obj:
+        return True, ""
+
+    if bet_amount < settings_obj["min_bet"] or bet_amount > settings_obj["max_bet"]:
+        return False, "bet_amount out of allowed range"
+
+    if ((bet_amount - settings_obj["min_bet"]) % settings_obj["step"]) != 0:
+        return False, "bet_amount must follow step"
+
+    return True, ""
+
+
+def broadcast_invalidate():
+    """Diğer worker'ların cache'ini düşürür (sync kod için; on_commit'ten çağrılır)."""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(BET_SETTINGS_GROUP, {"type": "bet_settings.invalidate"})
+
+
+async def listen():
+    """
+    Worker başına bir arka plan görevi (core/asgi.py'deki BackgroundTasks başlatır):
+    kendi kanalını BET_SETTINGS_GROUP'a ekler, gelen her mesajda cache'i düşürür.
+    """
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    channel = await channel_layer.new_channel("bet_settings")
+    # group_expiry dolmasın diye üyelik periyodik yenilenir
+    refresh_every = max(60, getattr(channel_layer, "group_expiry", 86400) // 2)
+    while True:
+        await channel_layer.group_add(BET_SETTINGS_GROUP, channel)
+        deadline = time.monotonic() + refresh_every
+        while time.monotonic() < deadline:
+            try:
+                message = await asyncio.wait_for(channel_layer.receive(channel), timeout=refresh_every)
+            except asyncio.TimeoutError:
+                break
+            if message.get("type") == "bet_settings.invalidate":
+                bet_settings_cache.invalidate()
@@ -0,0 +1,272 @@
+"""
+Unix socket üzerinden çalışan, çok process'li channel layer.
+
+Production'da channels_redis (RedisChannelLayer) kullanılır; bu modül Redis
+kurmadan birden fazla Daphne worker'ını yerelde aynı grupları paylaşarak
+çalıştırmak için projeyle gelen stand-in'dir:
+
+    python manage.py channel_broker          # tek broker process
+    CHANNEL_LAYER=unix daphne ... (N adet)   # worker'lar
+
+Her worker broker'a tek bir bağlantı açar. Grup üyelikleri broker'da tutulur;
+group_send broker'da fan-out edilir ve mesaj kanalın sahibi olan worker'a
+iletilir. Protokol satır başına bir JSON nesnesidir.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+logger = logging.getLogger(__name__)
+
+STREAM_LIMIT = 1024 * 1024
+
+
+def _encode(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _client_of(channel: str):
+    """'specific.<client_id>!<id>' -> '<client_id>'; process'e özel değilse None."""
+    if "!" not in channel:
+        return None
+    return channel.split("!", 1)[0].rsplit(".", 1)[-1]
+
+
+class UnixSocketChannelLayer(BaseChannelLayer):
+    extensions = ["groups", "flush"]
+
+    def __init__(self, path="channels.sock", expiry=60, group_expiry=86400, capacity=100, channel_capacity=None):
+        super().__init__(expiry=expiry, capacity=capacity)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.client_id = uuid.uuid4().hex
+
+        # kanal -> [(expires_at, message), ...] kuyruğu
+        self._queues: dict[str, asyncio.Queue] = {}
+        # reconnect sonrası broker'a yeniden bildirmek için yerel grup üyelikleri
+        self._groups: dict[str, set[str]] = {}
+
+        self._loop = None
+        self._writer = None
+        self._reader_task = None
+        self._connect_lock = None
+
+    # ---------------- connection ----------------
+
+    async def _connection(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # async_to_sync her çağrıda yeni loop açabilir; eski bağlantı kullanılamaz
+            self._loop = loop
+            self._writer = None
+            self._connect_lock = asyncio.Lock()
+            self._queues = {}
+
+        if self._writer is not None and not self._writer.is_closing():
+            return self._writer
+
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return self._writer
+
+            reader, writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+            writer.write(_encode({"op": "hello", "client": self.client_id}))
+            for group, channels in self._groups.items():
+                for channel in channels:
+                    writer.write(_encode({"op": "group_add", "group": group, "channel": channel}))
+            await writer.drain()
+
+            self._writer = writer
+            self._reader_task = loop.create_task(self._read_loop(reader, writer))
+            return writer
+
+    async def _send_op(self, op: dict):
+        writer = await self._connection()
+        writer.write(_encode(op))
+        await writer.drain()
+
+    async def _read_loop(self, reader, writer):
+        try:
+            async for line in reader:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    logger.warning("Broker sent an invalid frame")
+                    continue
+                self._deliver(data["channel"], data["message"])
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+            logger.warning("Channel broker connection lost (%s)", self.path)
+
+    def _deliver(self, channel: str, message: dict):
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = asyncio.Queue(maxsize=self.get_capacity(channel))
+        if queue.full():
+            # group_send semantiği: dolu kanala mesaj sessizce düşer
+            return False
+        queue.put_nowait((time.monotonic() + self.expiry, message))
+        return True
+
+    # ---------------- channel layer API ----------------
+
+    async def new_channel(self, prefix="specific"):
+        return f"{prefix}.{self.client_id}!{uuid.uuid4().hex}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+
+        client = _client_of(channel)
+        if client is None:
+            raise NotImplementedError("UnixSocketChannelLayer only supports process-specific channels")
+
+        if client == self.client_id:
+            await self._connection()
+            if not self._deliver(channel, message):
+                raise ChannelFull(channel)
+            return
+
+        await self._send_op({"op": "send", "channel": channel, "message": message})
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        await self._connection()
+
+        while True:
+            queue = self._queues.get(channel)
+            if queue is None:
+                queue = self._queues[channel] = asyncio.Queue(maxsize=self.get_capacity(channel))
+            expires_at, message = await queue.get()
+            if queue.empty() and self._queues.get(channel) is queue:
+                # boş kuyruğu tutma; consumer kapanınca sızıntı olmasın
+                del self._queues[channel]
+            if expires_at >= time.monotonic():
+                return message
+
+    async def flush(self):
+        self._queues = {}
+        self._groups = {}
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def close(self):
+        await self.flush()
+
+    # ---------------- groups ----------------
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        self._groups.setdefault(group, set()).add(channel)
+        await self._send_op({"op": "group_add", "group": group, "channel": channel})
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        members = self._groups.get(group)
+        if members is not None:
+            members.discard(channel)
+            if not members:
+                del self._groups[group]
+        await self._send_op({"op": "group_discard", "group": group, "channel": channel})
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        await self._send_op({"op": "group_send", "group": group, "message": message})
+
+
+class ChannelBroker:
+    """UnixSocketChannelLayer worker'ları arasındaki grup/mesaj yönlendiricisi."""
+
+    # yavaş bir worker'ın buffer'ı bu sınırı aşarsa yeni mesajları düşer
+    MAX_WRITE_BUFFER = 8 * 1024 * 1024
+
+    def __init__(self, path, group_expiry=86400):
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.clients: dict[str, asyncio.StreamWriter] = {}
+        self.groups: dict[str, dict[str, float]] = {}
+
+    async def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, path=self.path, limit=STREAM_LIMIT)
+        logger.info("Channel broker listening on %s", self.path)
+        async with server:
+            await server.serve_forever()
+
+    def _route(self, channel: str, message: dict):
+        writer = self.clients.get(_client_of(channel))
+        if writer is None or writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > self.MAX_WRITE_BUFFER:
+            logger.warning("Dropping message for slow worker (channel=%s)", channel)
+            return
+        writer.write(_encode({"channel": channel, "message": message}))
+
+    def _group_send(self, group: str, message: dict):
+        members = self.groups.get(group)
+        if not members:
+            return
+        now = time.time()
+        for channel, expires_at in list(members.items()):
+            if expires_at < now:
+                del members[channel]
+                continue
+            self._route(channel, message)
+        if not members:
+            del self.groups[group]
+
+    def _drop_client(self, client_id: str):
+        self.clients.pop(client_id, None)
+        for group in list(self.groups):
+            members = self.groups[group]
+            for channel in [c for c in members if _client_of(c) == client_id]:
+                del members[channel]
+            if not members:
+                del self.groups[group]
+
+    async def _handle(self, reader, writer):
+        client_id = None
+        try:
+            async for line in reader:
+                op = json.loads(line)
+                kind = op.get("op")
+
+                if kind == "hello":
+                    client_id = op["client"]
+                    self.clients[client_id] = writer
+                elif kind == "send":
+                    self._route(op["channel"], op["message"])
+                elif kind == "group_add":
+                    members = self.groups.setdefault(op["group"], {})
+                    members[op["channel"]] = time.time() + self.group_expiry
+                elif kind == "group_discard":
+                    members = self.groups.get(op["group"])
+                    if members is not None:
+                        members.pop(op["channel"], None)
+                        if not members:
+                            del self.groups[op["group"]]
+                elif kind == "group_send":
+                    self._group_send(op["group"], op["message"])
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            logger.warning("Worker connection closed with error (client=%s)", client_id)
+        finally:
+            if client_id is not None and self.clients.get(client_id) is writer:
+                self._drop_client(client_id)
+            writer.close()
@@ -0,0 +1,28 @@
+"""
+Çok process'li kurulum kontrolü. ETag versiyon sayaçları (versions.py), oda listesi
+sayfaları ve token cache'i Django cache'inde durur; channel layer process'ler arasıysa
+(unix / redis) cache de ortak olmalı, yoksa bir worker sonsuza kadar eski 304 döner.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CHANNEL_LAYERS = ("channels.layers.InMemoryChannelLayer",)
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_shared_cache(app_configs=None, **kwargs):
+    layer = settings.CHANNEL_LAYERS.get("default", {}).get("BACKEND")
+    cache = settings.CACHES.get("default", {}).get("BACKEND")
+    if layer in PROCESS_LOCAL_CHANNEL_LAYERS or cache not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"Channel layer {layer} spans processes but the default cache ({cache}) is process-local.",
+            hint="Set CACHE_BACKEND=file (single host) or CACHE_BACKEND=redis.",
+            id="game.E001",
+        )
+    ]
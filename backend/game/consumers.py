@@ -1,20 +1,46 @@
-import random
+import asyncio
 import logging
+from urllib.parse import parse_qs
 
-from django.utils import timezone
-from django.db import transaction
-from django.contrib.auth import get_user_model
+from django.conf import settings
 
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
-from channels.db import database_sync_to_async
 
-from .models import Room, AccountTransaction
+from .db_executor import db_write
+from .models import Room
+from .metrics import InstrumentedConsumerMixin, enabled as metrics_enabled, registry
+from .bets import validate_bet_amount
+from .ledger import InsufficientBalance
+from .lobby import LOBBY_GROUP
+from .matchmaking import join_queue, matchmaking_queue, user_group
+from .reaper import turn_timer
+from .throttle import allow_guess, connection_bucket
+from .room_list import ROOM_LIST_MAX_LIMIT, aroom_page
+from .room_state import LiveRoom, event_seq, room_store
+from .rooms import finish_room, start_game
+from .turn_journal import turn_journal
+from .wire import WireProtocolMixin
 
 logger = logging.getLogger(__name__)
-User = get_user_model()
 
 
-class RoomConsumer(AsyncJsonWebsocketConsumer):
+class RoomConsumer(WireProtocolMixin, InstrumentedConsumerMixin, AsyncJsonWebsocketConsumer):
+    """
+    Gelen frame'ler receive()'da rate limit'ten geçip bağlantı başına sınırlı bir
+    kuyruğa alınır, _process_inbox sırayla işler. Limit aşılırsa frame düşer;
+    art arda WS_GUESS_MAX_THROTTLED frame düşen bağlantı 4429 ile kapatılır.
+    Bağlantı kapanınca kuyruk iptal edilmez, boşalana kadar işlenir.
+    """
+
+    metrics_message_types = ("GUESS",)
+    inbox_task = None
+    # room_store.attach çağrıldı mı (disconnect'te detach)
+    attached = False
+    # oyun bittiği biliniyorsa tahminler DB'ye gitmeden reddedilir
+    game_over = False
+    # disconnect başladı: yeni frame alınmaz, kuyruktakiler bitirilir
+    closing = False
+
     async def connect(self):
         try:
             self.room_id = int(self.scope["url_route"]["kwargs"]["room_id"])
@@ -25,34 +51,67 @@ class RoomConsumer(AsyncJsonWebsocketConsumer):
                 await self.close(code=4401)
                 return
 
-            state = await self.db_get_room_state()
-            if state is None:
-                await self.close(code=4404)
-                return
-
-            # participant kontrolü: player2 None ise sadece player1 kabul
-            allowed_ids = [state["player1_id"]]
-            if state["player2_id"]:
-                allowed_ids.append(state["player2_id"])
+            # bu consumer'a gönderilen son event seq'i (snapshot dahil); tekrarlar atlanır
+            self.sent_seq = 0
+            self.guess_bucket = connection_bucket()
+            self.throttled = 0
+            self.inbox = asyncio.Queue(maxsize=getattr(settings, "WS_INBOUND_QUEUE_SIZE", 8))
+
+            # oyun bu process'te canlıysa participant kontrolü için DB'ye gitmeye gerek yok
+            live = room_store.get(self.room_id)
+            state = None
+            if live is not None:
+                allowed_ids = [live.player1_id, live.player2_id]
+            else:
+                state = await self.db_get_room_state()
+                if state is None:
+                    await self.close(code=4404)
+                    return
+
+                # participant kontrolü: player2 None ise sadece player1 kabul
+                allowed_ids = [state["player1_id"]]
+                if state["player2_id"]:
+                    allowed_ids.append(state["player2_id"])
 
             if user.id not in allowed_ids:
                 await self.close(code=4403)
                 return
 
-            await self.accept()
+            await self.accept(subprotocol=self.negotiate_wire())
+            if await self.reject_unavailable_wire():
+                return
             await self.channel_layer.group_add(self.group_name, self.channel_name)
+            room_store.attach(self.room_id)
+            self.attached = True
+            self.inbox_task = asyncio.create_task(self._process_inbox())
 
-            # Her durumda snapshot gönder
-            await self.send_json({"type": "SNAPSHOT", "payload": state["snapshot"]})
+            # ?since=<seq>: kaçırılan event'ler buffer'dan; kapsamıyorsa snapshot'a düş
+            since = self._since_param()
+            if since is not None and await self._resume(since):
+                return
 
-            # FULL değilse sadece bekle
+            if state is None:
+                state = await self.db_get_room_state()
+
+            # FULL değilse snapshot gönder ve bekle
             if state["player2_id"] is None or state["status"] != "full":
-                await self.send_json({"type": "INFO", "payload": {"detail": "Waiting for second player"}})
+                await self.send_snapshot(state["snapshot"])
+                if state["status"] == "open":
+                    await self.send_json({"type": "INFO", "payload": {"detail": "Waiting for second player"}})
                 return
 
-            # FULL ise: oyun başlat + bet lock (idempotent)
-            started = await self.db_start_game_if_ready()
-            await self.send_json({"type": "SNAPSHOT", "payload": started["snapshot"]})
+            # FULL ise: oyun başlamadıysa başlat + bet lock; snapshot tek sefer, start sonrası
+            async with room_store.lock(self.room_id):
+                live = room_store.get(self.room_id)
+                if live is None:
+                    live, started = await self._load_live_room()
+                    if live is None:
+                        await self.send_snapshot(started["snapshot"])
+                        return
+                else:
+                    started = state
+                live.apply_to_snapshot(started["snapshot"])
+            await self.send_snapshot(started["snapshot"])
 
             # herkes görsün diye event bas
             await self.channel_layer.group_send(
@@ -61,6 +120,8 @@ class RoomConsumer(AsyncJsonWebsocketConsumer):
                     "type": "room.event",
                     "payload": {
                         "event": "GAME_STARTED",
+                        "seq": event_seq(0),
+                        "players": started["snapshot"].get("players"),
                         "turn": started["snapshot"].get("turn"),
                         "turn_count": started["snapshot"].get("turn_count"),
                     },
@@ -76,10 +137,61 @@ class RoomConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=1011)
 
     async def disconnect(self, close_code):
+        self.closing = True
+        if self.inbox_task is not None:
+            # iptal değil: kuyruktaki frame'ler ve yarıdaki tahmin bitsin, yoksa commit edilmiş
+            # bir sonucun GAME_OVER / GUESS yayını kaybolur. Task hata ile çıktıysa beklenmez.
+            drained = asyncio.ensure_future(self.inbox.join())
+            await asyncio.wait([drained, self.inbox_task], return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+            self.inbox_task.cancel()
         try:
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
         except Exception:
             pass
+        if self.attached:
+            # işlenmekte olan tahmin bitsin; son consumer'sa kopya atılır
+            async with room_store.lock(self.room_id):
+                room_store.detach(self.room_id)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if self.closing:
+            return
+        # Daphne'nin bağlantı kuyruğu sınırsız; frame burada beklemeden alınır ya da düşürülür
+        if not allow_guess(self.guess_bucket, self.scope["user"].id):
+            await self._drop_frame("rate")
+            return
+        try:
+            self.inbox.put_nowait((text_data, bytes_data))
+        except asyncio.QueueFull:
+            await self._drop_frame("queue")
+            return
+        self.throttled = 0
+
+    async def _drop_frame(self, reason: str):
+        self.throttled += 1
+        if metrics_enabled():
+            registry.inc(
+                "app_ws_frames_dropped_total",
+                {"reason": reason},
+                help_text="RoomConsumer frames dropped by the guess rate limit / full inbound queue",
+            )
+        if self.throttled == getattr(settings, "WS_GUESS_MAX_THROTTLED", 20):
+            await self.close(code=4429)
+        elif self.throttled == 1:
+            await self.send_json({"type": "ERROR", "payload": {"detail": "Too many messages, slow down"}})
+
+    async def _process_inbox(self):
+        while True:
+            text_data, bytes_data = await self.inbox.get()
+            try:
+                await super().receive(text_data, bytes_data)
+            except Exception:
+                logger.exception("RoomConsumer.receive failed")
+                await self.close(code=1011)
+                return
+            finally:
+                self.inbox.task_done()
 
     async def receive_json(self, content, **kwargs):
         msg_type = content.get("type")
@@ -103,228 +215,186 @@ class RoomConsumer(AsyncJsonWebsocketConsumer):
             await self.send_json({"type": "ERROR", "payload": {"detail": "Authentication required"}})
             return
 
-        # Güncel state al
-        state = await self.db_get_room_state()
-        if state is None:
-            await self.send_json({"type": "ERROR", "payload": {"detail": "Room not found"}})
-            return
-
-        if state["status"] == "finished":
+        # lock ve DB'ye gitmeden reddedilebilenler (kesin kontrol aşağıda lock altında)
+        if self.game_over:
             await self.send_json({"type": "ERROR", "payload": {"detail": "Game already finished"}})
             return
-
-        # 2. oyuncu yoksa guess YASAK
-        if state["player2_id"] is None or state["status"] != "full":
-            await self.send_json({"type": "ERROR", "payload": {"detail": "Waiting for second player"}})
+        live = room_store.get(self.room_id)
+        if live is not None and live.current_turn_id != user.id:
+            await self.send_json({"type": "ERROR", "payload": {"detail": "Not your turn"}})
             return
 
-        # FULL ise oyun startı garanti et (idempotent)
-        state = await self.db_start_game_if_ready()
+        # Aynı odadaki tahminler sırayla işlenir; state bellekte, DB'ye sadece finish'te gidilir.
+        async with room_store.lock(self.room_id):
+            live, error = await self._get_live_room()
+            if live is None:
+                await self.send_json({"type": "ERROR", "payload": {"detail": error}})
+                return
 
-        if state["current_turn_id"] != user.id:
-            await self.send_json({"type": "ERROR", "payload": {"detail": "Not your turn"}})
-            return
+            if live.current_turn_id != user.id:
+                await self.send_json({"type": "ERROR", "payload": {"detail": "Not your turn"}})
+                return
 
-        # doğru tahmin -> finish
-        if value == state["secret_number"]:
-            end_state = await self.db_finish_room_and_payout(winner_user_id=user.id)
+            hint = live.apply_guess(value)
+
+            # doğru tahmin -> finish
+            if hint is None:
+                try:
+                    end_state = await self.db_finish_room_and_payout(
+                        winner_user_id=user.id,
+                        turn_count=live.turn_count,
+                    )
+                finally:
+                    room_store.discard(self.room_id)
+
+                await self.channel_layer.group_send(
+                    self.group_name,
+                    {
+                        "type": "room.event",
+                        "payload": {
+                            "event": "GAME_OVER",
+                            "seq": live.seq,
+                            "winner": end_state["winner_username"],
+                            "number": value,
+                            "turn_count": end_state["turn_count"],
+                            "finished_at": end_state["finished_at"],
+                        },
+                        "state": {"finished": True},
+                    },
+                )
+                return
+
+            # DB'ye write-behind: journal coalesce edip toplu yazar
+            turn_journal.record(self.room_id, live.current_turn_id, live.turn_count)
+            turn_timer.schedule(live)
 
             await self.channel_layer.group_send(
                 self.group_name,
                 {
                     "type": "room.event",
                     "payload": {
-                        "event": "GAME_OVER",
-                        "winner": end_state["winner_username"],
-                        "number": value,
-                        "turn_count": end_state["turn_count"],
-                        "finished_at": end_state["finished_at"],
+                        "event": "GUESS",
+                        "seq": live.seq,
+                        "by": user.username,
+                        "value": value,
+                        "result": hint,
+                        "next_turn": live.current_turn_username,
+                        "turn_count": live.turn_count,
                     },
+                    "state": {"current_turn_id": live.current_turn_id, "turn_count": live.turn_count},
                 },
             )
-            return
 
-        hint = "higher" if value < state["secret_number"] else "lower"
-        next_state = await self.db_switch_turn_and_increment()
-
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "room.event",
-                "payload": {
-                    "event": "GUESS",
-                    "by": user.username,
-                    "value": value,
-                    "result": hint,
-                    "next_turn": next_state["current_turn_username"],
-                    "turn_count": next_state["turn_count"],
-                },
-            },
-        )
-
-    async def room_event(self, event):
-        await self.send_json({"type": "GAME_EVENT", "payload": event["payload"]})
-
-    # ---------------- DB layer ----------------
+    async def _get_live_room(self):
+        """
+        Odanın canlı state'ini döner: (LiveRoom, None) ya da (None, hata mesajı).
+        Bellekte yoksa (ilk guess / worker restart) DB'den bir kez yüklenir.
+        Çağıran room_store.lock(room_id) tutmalı.
+        """
+        live = room_store.get(self.room_id)
+        if live is not None:
+            return live, None
 
-    @database_sync_to_async
-    def db_get_room_state(self):
-        try:
-            room = Room.objects.select_related("player1", "player2", "current_turn", "winner").get(id=self.room_id)
-        except Room.DoesNotExist:
-            return None
-        return self._state_from_room(room)
+        live, state = await self._load_live_room()
+        if live is not None:
+            return live, None
+        if state is None:
+            return None, "Room not found"
+        if state["status"] in ("finished", "expired"):
+            self.game_over = True
+            return None, "Game already finished"
+        # 2. oyuncu yoksa guess YASAK
+        return None, "Waiting for second player"
 
-    @database_sync_to_async
-    def db_start_game_if_ready(self):
+    async def _load_live_room(self):
         """
-        SADECE: player2 varsa ve status FULL ise
-        - secret_number üret
-        - current_turn yazı-tura
-        - bet lock + transaction
-        - started_at set
-        Bu fonksiyon idempotent: bir kez çalışır.
+        DB'den okuyup (gerekirse oyunu başlatıp) room_store'a koyar: (LiveRoom | None, state).
+        Başlamış oyun için sadece okuma yapılır; start tek conditional UPDATE (bkz. rooms.start_game).
+        Çağıran room_store.lock(room_id) tutmalı.
         """
-        with transaction.atomic():
-            room = (
-                Room.objects.select_for_update()
-                .select_related("player1", "player2", "current_turn", "winner")
-                .get(id=self.room_id)
-            )
+        state = await self.db_get_room_state()
+        if state is None or state["status"] != "full":
+            return None, state
 
-            # güvenlik: player2 yokken ASLA başlatma
-            if room.player2_id is None:
-                return self._state_from_room(room)
-
-            # FULL değilse full'a çek (join sonrası bazen gecikebilir)
-            if room.status not in (Room.Status.FULL, Room.Status.FINISHED):
-                room.status = Room.Status.FULL
-                room.save(update_fields=["status"])
-
-            # zaten kilitlendiyse sadece state dön
-            if room.is_locked:
-                room.refresh_from_db()
-                return self._state_from_room(room)
-
-            # init secret
-            if room.secret_number is None:
-                room.secret_number = random.randint(1, 100)
-
-            # init turn (yazı-tura)
-            if room.current_turn_id is None:
-                room.current_turn_id = random.choice([room.player1_id, room.player2_id])
-
-            room.turn_count = room.turn_count or 0
-
-            # bet lock
-            bet = int(room.bet_amount)
-            p1 = User.objects.select_for_update().get(id=room.player1_id)
-            p2 = User.objects.select_for_update().get(id=room.player2_id)
-
-            if p1.balance < bet or p2.balance < bet:
-                raise ValueError("Insufficient balance to lock bet")
-
-            p1.balance -= bet
-            p2.balance -= bet
-            p1.save(update_fields=["balance"])
-            p2.save(update_fields=["balance"])
-
-            AccountTransaction.objects.create(
-                user=p1,
-                room=room,
-                type=AccountTransaction.Type.BET_LOCK,
-                amount=-bet,
-                balance_after=p1.balance,
-                note=f"Bet lock for room {room.id}",
-            )
-            AccountTransaction.objects.create(
-                user=p2,
-                room=room,
-                type=AccountTransaction.Type.BET_LOCK,
-                amount=-bet,
-                balance_after=p2.balance,
-                note=f"Bet lock for room {room.id}",
-            )
+        if not state["started"]:
+            await self.db_start_game()
+            state = await self.db_get_room_state()
+            if not state["started"]:
+                return None, state
 
-            room.is_locked = True
-            room.started_at = room.started_at or timezone.now()
-
-            room.save(
-                update_fields=[
-                    "status",
-                    "secret_number",
-                    "current_turn",
-                    "turn_count",
-                    "is_locked",
-                    "started_at",
-                ]
-            )
+        live = room_store.put(LiveRoom.from_state(state))
+        turn_timer.schedule(live)
+        return live, state
 
-            room.refresh_from_db()
-            return self._state_from_room(room)
+    async def room_event(self, event):
+        # diğer worker'larda işlenen tahminleri bu process'in canlı state'ine yansıt
+        room_store.sync(self.room_id, event.get("state"))
+        if (event.get("state") or {}).get("finished"):
+            self.game_over = True
+
+        payload = event["payload"]
+        seq = payload.get("seq")
+        room_store.record_event(self.room_id, seq, payload)
+        if seq is not None:
+            # snapshot / resume bu event'i zaten kapsıyorsa tekrar gönderme
+            if seq <= self.sent_seq:
+                return
+            self.sent_seq = seq
+        await self.send_json({"type": "GAME_EVENT", "payload": payload})
 
-    @database_sync_to_async
-    def db_switch_turn_and_increment(self):
-        with transaction.atomic():
-            room = (
-                Room.objects.select_for_update()
-                .select_related("player1", "player2", "current_turn")
-                .get(id=self.room_id)
-            )
+    async def send_snapshot(self, snapshot: dict):
+        self.sent_seq = max(self.sent_seq, snapshot.get("seq") or 0)
+        await self.send_json({"type": "SNAPSHOT", "payload": snapshot})
 
-            room.turn_count = (room.turn_count or 0) + 1
-            room.current_turn_id = room.player2_id if room.current_turn_id == room.player1_id else room.player1_id
-            room.save(update_fields=["current_turn", "turn_count"])
-            room.refresh_from_db()
+    def _since_param(self):
+        params = parse_qs(self.scope.get("query_string", b"").decode("utf-8"))
+        try:
+            return int((params.get("since") or [None])[0])
+        except (TypeError, ValueError):
+            return None
 
-            return {
-                "current_turn_id": room.current_turn_id,
-                "current_turn_username": room.current_turn.username if room.current_turn else None,
-                "turn_count": room.turn_count,
+    async def _resume(self, since: int) -> bool:
+        """Kaçırılan event'leri sırayla gönderir; buffer yetmiyorsa False (snapshot gönderilmeli)."""
+        missed = room_store.events_since(self.room_id, since)
+        if missed is None:
+            return False
+
+        live = room_store.get(self.room_id)
+        self.sent_seq = since
+        await self.send_json(
+            {
+                "type": "RESUMED",
+                "payload": {
+                    "since": since,
+                    "count": len(missed),
+                    "players": [live.player1_username, live.player2_username],
+                },
             }
+        )
+        for payload in missed:
+            self.sent_seq = payload["seq"]
+            await self.send_json({"type": "GAME_EVENT", "payload": payload})
+        return True
 
-    @database_sync_to_async
-    def db_finish_room_and_payout(self, winner_user_id: int):
-        with transaction.atomic():
-            room = (
-                Room.objects.select_for_update()
-                .select_related("winner", "player1", "player2")
-                .get(id=self.room_id)
-            )
+    # ---------------- DB layer ----------------
 
-            if room.status == Room.Status.FINISHED:
-                return {
-                    "winner_username": room.winner.username if room.winner else None,
-                    "turn_count": room.turn_count,
-                    "finished_at": room.finished_at.isoformat() if room.finished_at else None,
-                }
-
-            bet = int(room.bet_amount)
-            payout = 2 * bet
-
-            room.status = Room.Status.FINISHED
-            room.winner_id = winner_user_id
-            room.finished_at = timezone.now()
-            room.save(update_fields=["status", "winner", "finished_at"])
-
-            winner = User.objects.select_for_update().get(id=winner_user_id)
-            winner.balance += payout
-            winner.save(update_fields=["balance"])
-
-            AccountTransaction.objects.create(
-                user=winner,
-                room=room,
-                type=AccountTransaction.Type.PAYOUT,
-                amount=payout,
-                balance_after=winner.balance,
-                note=f"Payout for room {room.id}",
+    # okumalar async ORM ile; yazmalar db_write havuzunda (bkz. db_executor)
+    async def db_get_room_state(self):
+        try:
+            room = await Room.objects.select_related("player1", "player2", "current_turn", "winner").aget(
+                id=self.room_id
             )
+        except Room.DoesNotExist:
+            return None
+        return self._state_from_room(room)
 
-            return {
-                "winner_username": room.winner.username if room.winner else None,
-                "turn_count": room.turn_count,
-                "finished_at": room.finished_at.isoformat() if room.finished_at else None,
-            }
+    @db_write
+    def db_start_game(self):
+        return start_game(self.room_id)
+
+    @db_write
+    def db_finish_room_and_payout(self, winner_user_id: int, turn_count: int | None = None):
+        return finish_room(self.room_id, winner_user_id, turn_count)
 
     def _state_from_room(self, room: Room):
         status_str = str(room.status).lower()
@@ -341,13 +411,158 @@ class RoomConsumer(AsyncJsonWebsocketConsumer):
             "winner": room.winner.username if room.winner else None,
             "finished_at": room.finished_at.isoformat() if room.finished_at else None,
             "turn_count": room.turn_count,
+            "seq": event_seq(
+                room.turn_count,
+                started=room.is_locked,
+                finished=room.status in (Room.Status.FINISHED, Room.Status.EXPIRED),
+            ),
         }
 
         return {
             "player1_id": room.player1_id,
             "player2_id": room.player2_id,
             "status": status_str,
+            "started": room.is_locked,
             "secret_number": room.secret_number,        # frontend'e göstermiyorsun zaten, WS iç state
             "current_turn_id": room.current_turn_id,
             "snapshot": snapshot,
         }
+
+
+class LobbyConsumer(InstrumentedConsumerMixin, AsyncJsonWebsocketConsumer):
+    """
+    ws/lobby/: bağlanınca OPEN odaların snapshot'ı, sonra
+    ROOM_CREATED / ROOM_FILLED / ROOM_FINISHED / ROOM_EXPIRED delta'ları (lobby polling yerine).
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if not user or not getattr(user, "is_authenticated", False):
+            await self.close(code=4401)
+            return
+
+        await self.accept()
+        # snapshot'tan önce gruba gir: arada oluşan delta kaçmasın (client id ile upsert eder)
+        await self.channel_layer.group_add(LOBBY_GROUP, self.channel_name)
+
+        rows, _ = await self.db_open_rooms()
+        await self.send_json({"type": "LOBBY_SNAPSHOT", "payload": {"rooms": rows}})
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(LOBBY_GROUP, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        await self.send_json({"type": "ERROR", "payload": {"detail": "Lobby feed is read-only"}})
+
+    async def lobby_event(self, event):
+        await self.send_json({"type": "LOBBY_EVENT", "payload": event["payload"]})
+
+    async def db_open_rooms(self):
+        return await aroom_page(status=Room.Status.OPEN, limit=ROOM_LIST_MAX_LIMIT)
+
+
+class MatchmakingConsumer(InstrumentedConsumerMixin, AsyncJsonWebsocketConsumer):
+    """
+    ws/matchmaking/: {"type": "ENQUEUE", "payload": {"bet_amount": 50}} / {"type": "DEQUEUE"} / {"type": "STATUS"}.
+    Eşleşince MATCH_FOUND {room_id, bet_amount, players} gelir (REST ile sıraya girenler de alır).
+    Bağlantı açık kaldıkça kullanıcının kuyruk kaydı heartbeat ile tazelenir (MATCHMAKING_QUEUE_TTL'e
+    takılmaz); kapanınca bu bağlantıdan girilen kayıt silinir.
+    """
+
+    metrics_message_types = ("ENQUEUE", "DEQUEUE", "STATUS")
+    heartbeat_task = None
+
+    async def connect(self):
+        self.user = self.scope.get("user")
+        if not self.user or not getattr(self.user, "is_authenticated", False):
+            await self.close(code=4401)
+            return
+
+        self.enqueued = False
+        await self.accept()
+        await self.channel_layer.group_add(user_group(self.user.id), self.channel_name)
+        await self.send_json({"type": "MATCHMAKING_STATUS", "payload": await self.db_status()})
+        self.heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def disconnect(self, close_code):
+        if not getattr(self, "user", None) or not self.user.is_authenticated:
+            return
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+        await self.channel_layer.group_discard(user_group(self.user.id), self.channel_name)
+        if getattr(self, "enqueued", False):
+            await self.db_dequeue()
+
+    async def _heartbeat(self):
+        # TTL dolmadan birkaç kez tazele; kayıt yoksa (REST'ten de girilmemişse) UPDATE boşa düşer
+        interval = max(matchmaking_queue.ttl / 3, 0.1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.db_touch()
+            except Exception:
+                logger.exception("Matchmaking heartbeat failed for user %s", self.user.id)
+
+    async def receive_json(self, content, **kwargs):
+        msg_type = content.get("type")
+
+        if msg_type == "STATUS":
+            await self.send_json({"type": "MATCHMAKING_STATUS", "payload": await self.db_status()})
+            return
+
+        if msg_type == "DEQUEUE":
+            self.enqueued = False
+            await self.db_dequeue()
+            await self.send_json({"type": "MATCHMAKING_STATUS", "payload": {"status": "idle"}})
+            return
+
+        if msg_type != "ENQUEUE":
+            await self.send_json({"type": "ERROR", "payload": {"detail": "Unknown message type"}})
+            return
+
+        payload = content.get("payload") or {}
+        try:
+            bet_amount = int(payload.get("bet_amount"))
+        except (TypeError, ValueError):
+            await self.send_json({"type": "ERROR", "payload": {"detail": "bet_amount must be an integer"}})
+            return
+
+        result, error = await self.db_join_queue(bet_amount)
+        if result is None:
+            await self.send_json({"type": "ERROR", "payload": {"detail": error}})
+            return
+
+        self.enqueued = result.get("status") == "queued"
+        # eşleşmede MATCH_FOUND user group'una ayrıca gelir
+        await self.send_json({"type": "MATCHMAKING_STATUS", "payload": result})
+
+    async def match_event(self, event):
+        payload = event["payload"]
+        if payload.get("event") in ("MATCH_FOUND", "MATCH_FAILED"):
+            self.enqueued = False
+        await self.send_json({"type": payload["event"], "payload": payload})
+
+    @db_write
+    def db_status(self):
+        return matchmaking_queue.status(self.user.id)
+
+    @db_write
+    def db_dequeue(self):
+        return matchmaking_queue.dequeue(self.user.id)
+
+    @db_write
+    def db_touch(self):
+        return matchmaking_queue.touch(self.user.id)
+
+    @db_write
+    def db_join_queue(self, bet_amount: int):
+        """(sonuç, None) ya da (None, hata mesajı)."""
+        ok, msg = validate_bet_amount(bet_amount)
+        if not ok:
+            return None, msg
+        if self.user.current_balance() < bet_amount:
+            return None, "Insufficient balance to join matchmaking"
+        try:
+            return join_queue(self.user, bet_amount), None
+        except InsufficientBalance as e:
+            return None, str(e)
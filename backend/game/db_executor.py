@@ -0,0 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from channels.db import DatabaseSyncToAsync
+
+# database_sync_to_async varsayılanı thread_sensitive: process'teki tüm DB işleri tek
+# thread'de sıraya girer. Oyun yazmaları bunun yerine bu havuzda paralel çalışır;
+# her çağrı kendi thread'inde, kendi bağlantısıyla (close_old_connections önce/sonra).
+db_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "GAME_DB_EXECUTOR_WORKERS", 8),
+    thread_name_prefix="game-db",
+)
+
+
+def db_write(func):
+    """database_sync_to_async yerine: thread_sensitive olmayan, boyutu ayarlanabilir havuz."""
+    return DatabaseSyncToAsync(func, thread_sensitive=False, executor=db_executor)
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from sortedcontainers import SortedList
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    """
+    Process-local, balance'a göre sıralı leaderboard.
+
+    Anahtarlar (-balance, user_id) olarak SortedList'te tutulur:
+    - update(): eski anahtarı sil + yenisini ekle, O(log n)
+    - top(n): baştan dilim
+    - rank(user_id): bisect ile O(log n)
+    - around(user_id, radius): rank etrafında dilim
+
+    Bu process'in bet lock / payout yolları update() çağırır (anında görünür). Başka
+    process'lerin (diğer worker'lar, admin) değişiklikleri LEADERBOARD_REFRESH_SECONDS'ta
+    bir tam yeniden yüklemeyle gelir; yükleme arka plan thread'inde yapılır, istek
+    thread'i sadece process'in ilk yüklemesini bekler. Worker'lar arası sıralama farkı
+    en fazla LEADERBOARD_REFRESH_SECONDS + bir yükleme süresi kadar sürer.
+    """
+
+    def __init__(self):
+        self._keys = SortedList()
+        self._balances: dict[int, int] = {}
+        self._usernames: dict[int, str] = {}
+        self._loaded_at = None
+        self._next_refresh = 0.0
+        self._refresher = None
+        # ETag için: her tam yüklemede yeni epoch, her update'te revision++
+        self._epoch = 0
+        self._revision = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def refresh_seconds(self) -> int:
+        return getattr(settings, "LEADERBOARD_REFRESH_SECONDS", 60)
+
+    def reload(self):
+        """users tablosunu baştan okur (users_user_balance_rank_idx sırasıyla) ve index'i değiştirir."""
+        rows = list(User.objects.order_by("-balance", "id").values_list("id", "username", "balance"))
+        keys = SortedList((-balance, user_id) for user_id, _, balance in rows)
+        with self._lock:
+            self._keys = keys
+            self._balances = {user_id: balance for user_id, _, balance in rows}
+            self._usernames = {user_id: username for user_id, username, _ in rows}
+            self._loaded_at = time.monotonic()
+            self._next_refresh = self._loaded_at + self.refresh_seconds
+            self._epoch = time.time_ns()
+            self._revision = 0
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None:
+            # ilk yükleme: aynı anda gelen istekler tek sorgu bekler
+            with self._load_lock:
+                if self._loaded_at is None:
+                    self.reload()
+            return
+        if time.monotonic() >= self._next_refresh:
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            # yükleme hata verirse de bir aralık beklenir (her istek yeni thread açmasın)
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+            self._refresher = threading.Thread(target=self._background_reload, name="leaderboard-refresh", daemon=True)
+            self._refresher.start()
+
+    def _background_reload(self):
+        try:
+            self.reload()
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+        finally:
+            connection.close()
+
+    def update(self, user_id: int, balance: int, username: str | None = None):
+        """Bakiye değişti; anahtarı yeniden konumlandırır. Henüz yüklenmediyse no-op."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+
+            old = self._balances.get(user_id)
+            if old is not None:
+                self._keys.discard((-old, user_id))
+
+            self._keys.add((-balance, user_id))
+            self._balances[user_id] = balance
+            if username is not None:
+                self._usernames[user_id] = username
+            self._revision += 1
+
+    def version(self) -> tuple[int, int]:
+        """İçerik değişince değişen (epoch, revision); sıralama sorgusuz ETag üretmek için."""
+        self._ensure_loaded()
+        with self._lock:
+            return self._epoch, self._revision
+
+    def _entry(self, index: int, key: tuple[int, int]) -> dict:
+        neg_balance, user_id = key
+        return {
+            "rank": index + 1,
+            "id": user_id,
+            "username": self._usernames.get(user_id),
+            "balance": -neg_balance,
+        }
+
+    def top(self, n: int) -> list[dict]:
+        self._ensure_loaded()
+        with self._lock:
+            return [self._entry(i, key) for i, key in enumerate(self._keys.islice(0, n))]
+
+    def _index_of(self, user_id: int):
+        balance = self._balances.get(user_id)
+        if balance is None:
+            return None
+        i = self._keys.bisect_left((-balance, user_id))
+        if i < len(self._keys) and self._keys[i] == (-balance, user_id):
+            return i
+        return None
+
+    def rank(self, user_id: int):
+        self._ensure_loaded()
+        with self._lock:
+            i = self._index_of(user_id)
+            return None if i is None else i + 1
+
+    def around(self, user_id: int, radius: int = 5) -> list[dict]:
+        self._ensure_loaded()
+        with self._lock:
+            i = self._index_of(user_id)
+            if i is None:
+                return []
+            start = max(0, i - radius)
+            end = min(len(self._keys), i + radius + 1)
+            return [self._entry(j, key) for j, key in enumerate(self._keys.islice(start, end), start)]
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F
+
+from .leaderboard import leaderboard
+from .models import AccountTransaction
+from .versions import bump, ledger_version_key
+
+User = get_user_model()
+
+
+class InsufficientBalance(ValueError):
+    def __init__(self, user_ids):
+        self.user_ids = list(user_ids)
+        super().__init__("Insufficient balance to lock bet")
+
+
+def _supports_update_returning() -> bool:
+    # MySQL/MariaDB UPDATE ... RETURNING desteklemiyor; sqlite >= 3.35 destekliyor
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" and connection.features.can_return_columns_from_insert
+
+
+def _apply_delta(user_ids, delta: int, min_balance=None) -> dict[int, int]:
+    """
+    balance += delta; min_balance verilirse sadece balance >= min_balance olan
+    satırlar güncellenir. Güncellenen {user_id: yeni balance} döner; eksik id
+    varsa çağıran transaction'ı geri almalı.
+    """
+    if _supports_update_returning():
+        qn = connection.ops.quote_name
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        sql = (
+            f"UPDATE {qn(User._meta.db_table)} SET {qn('balance')} = {qn('balance')} + %s "
+            f"WHERE {qn('id')} IN ({placeholders})"
+        )
+        params = [delta, *user_ids]
+        if min_balance is not None:
+            sql += f" AND {qn('balance')} >= %s"
+            params.append(min_balance)
+        sql += f" RETURNING {qn('id')}, {qn('balance')}"
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return dict(cursor.fetchall())
+
+    # RETURNING yoksa: bakiyesi yetenleri kilitleyip seç, güncelle, yeni bakiyeleri oku
+    qs = User.objects.filter(id__in=user_ids)
+    if min_balance is not None:
+        eligible = qs.filter(balance__gte=min_balance).select_for_update().values_list("id", flat=True)
+        qs = User.objects.filter(id__in=list(eligible))
+    qs.update(balance=F("balance") + delta)
+    return dict(qs.values_list("id", "balance"))
+
+
+def _on_commit_balances(balances: dict[int, int]):
+    """Commit sonrası: leaderboard'u güncelle, kullanıcıların hesap hareketleri ETag'lerini düşür."""
+    for user_id, balance in balances.items():
+        transaction.on_commit(lambda user_id=user_id, balance=balance: leaderboard.update(user_id, balance))
+        transaction.on_commit(lambda user_id=user_id: bump(ledger_version_key(user_id)))
+
+
+def lock_bets(room, user_ids, bet: int) -> dict[int, int]:
+    """
+    Oyun başı bet lock: tüm oyuncuların bakiyesinden `bet` tek conditional UPDATE ile düşülür,
+    BET_LOCK satırları tek bulk_create ile yazılır. Birinin bakiyesi yetmezse
+    InsufficientBalance fırlatılır ve kendi savepoint'i geri alınır.
+    """
+    bet = int(bet)
+    with transaction.atomic():
+        balances = _apply_delta(user_ids, -bet, min_balance=bet)
+        missing = [user_id for user_id in user_ids if user_id not in balances]
+        if missing:
+            raise InsufficientBalance(missing)
+
+        AccountTransaction.objects.bulk_create(
+            [
+                AccountTransaction(
+                    user_id=user_id,
+                    room=room,
+                    type=AccountTransaction.Type.BET_LOCK,
+                    amount=-bet,
+                    balance_after=balances[user_id],
+                    note=f"Bet lock for room {room.id}",
+                )
+                for user_id in user_ids
+            ]
+        )
+
+    _on_commit_balances(balances)
+    return balances
+
+
+def payout(room, user_id: int, amount: int) -> int:
+    """Kazanana ödeme: tek UPDATE ... RETURNING + PAYOUT satırı. Yeni bakiyeyi döner."""
+    amount = int(amount)
+    with transaction.atomic():
+        balances = _apply_delta([user_id], amount)
+        AccountTransaction.objects.create(
+            user_id=user_id,
+            room=room,
+            type=AccountTransaction.Type.PAYOUT,
+            amount=amount,
+            balance_after=balances[user_id],
+            note=f"Payout for room {room.id}",
+        )
+
+    _on_commit_balances(balances)
+    return balances[user_id]
+
+
+def refund(room, user_ids, amount: int) -> dict[int, int]:
+    """Terk edilen oyunun bet'lerini iade eder: tek UPDATE + REFUND satırları."""
+    amount = int(amount)
+    with transaction.atomic():
+        balances = _apply_delta(user_ids, amount)
+        AccountTransaction.objects.bulk_create(
+            [
+                AccountTransaction(
+                    user_id=user_id,
+                    room=room,
+                    type=AccountTransaction.Type.REFUND,
+                    amount=amount,
+                    balance_after=balances[user_id],
+                    note=f"Refund for room {room.id}",
+                )
+                for user_id in user_ids
+            ]
+        )
+
+    _on_commit_balances(balances)
+    return balances
@@ -0,0 +1,40 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .room_list import room_row
+
+LOBBY_GROUP = "lobby"
+
+ROOM_CREATED = "ROOM_CREATED"
+ROOM_FILLED = "ROOM_FILLED"
+ROOM_FINISHED = "ROOM_FINISHED"
+ROOM_EXPIRED = "ROOM_EXPIRED"
+
+
+def _lobby_message(event: str, row: dict) -> dict:
+    return {"type": "lobby.event", "payload": {"event": event, "room": row}}
+
+
+def notify_lobby(event: str, room):
+    """
+    LobbyConsumer'lara delta yayınlar (sync kod için).
+    Transaction içinden transaction.on_commit ile çağrılmalı.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(LOBBY_GROUP, _lobby_message(event, room_row(room)))
+
+
+def notify_lobby_rows(event: str, rows):
+    """notify_lobby'nin liste satırlarıyla çalışan hali (bulk update'ler için)."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not rows:
+        return
+
+    async def send_all():
+        for row in rows:
+            await channel_layer.group_send(LOBBY_GROUP, _lobby_message(event, row))
+
+    async_to_sync(send_all)()
+
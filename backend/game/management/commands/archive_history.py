@@ -0,0 +1,38 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game.archive import archive_cutoff, archive_history
+
+
+class Command(BaseCommand):
+    help = (
+        "HISTORY_ARCHIVE_AFTER_DAYS'ten önce bitmiş odaları ve işlemlerini arşiv tablolarına taşır "
+        "(batch'ler halinde). Cron ya da --loop ile daemon olarak."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Default: HISTORY_ARCHIVE_AFTER_DAYS")
+        parser.add_argument("--batch-size", type=int, default=None, help="Default: HISTORY_ARCHIVE_BATCH_SIZE")
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--loop", action="store_true", help="HISTORY_ARCHIVE_INTERVAL'de bir tekrar et")
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        interval = getattr(settings, "HISTORY_ARCHIVE_INTERVAL", 3600) or 3600
+
+        while True:
+            rooms, txns = archive_history(
+                before=archive_cutoff(options["days"]),
+                batch_size=options["batch_size"],
+                max_batches=options["max_batches"],
+            )
+            self.stdout.write(f"archived rooms={rooms} transactions={txns}")
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,23 @@
+import asyncio
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game.channel_layers import ChannelBroker
+
+
+class Command(BaseCommand):
+    help = "UnixSocketChannelLayer için yerel broker'ı çalıştırır (CHANNEL_LAYER=unix)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=None, help="Unix socket path (default: CHANNEL_BROKER_SOCKET)")
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        path = options["path"] or settings.CHANNEL_BROKER_SOCKET
+        self.stdout.write(f"Channel broker: {path}")
+        try:
+            asyncio.run(ChannelBroker(path).serve_forever())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+class QueryCounter:
+    """Tüm thread'lerdeki DB bağlantılarında çalışan sorguları sayar (execute_wrapper)."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.value += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        for conn in connections.all():
+            conn.execute_wrappers.append(self)
+        connection_created.connect(self._on_connection_created, weak=False)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class GameStats:
+    def __init__(self):
+        self.games = 0
+        self.guesses = 0
+        self.latencies = []
+        self.errors = 0
+        self.error_samples = []
+
+    def error(self, detail):
+        self.errors += 1
+        if len(self.error_samples) < 10:
+            self.error_samples.append(str(detail))
+
+
+class Command(BaseCommand):
+    help = (
+        "İki oyunculu oyunları uçtan uca simüle eden load test: REST ile signup/oda/join, "
+        "WebsocketCommunicator ile ws/rooms/<id>/ üzerinden binary-search tahminlerle oyunu bitirir. "
+        "Geçici bir test veritabanı kullanır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=50, help="aynı anda oynanan oyun sayısı")
+        parser.add_argument("--bet", type=int, default=10)
+        parser.add_argument("--timeout", type=float, default=10.0, help="mesaj başına bekleme (sn)")
+        parser.add_argument("--json", action="store_true", help="raporu JSON olarak yaz")
+
+    def handle(self, *args, **options):
+        # sentetik kullanıcılar için hızlı hasher; sadece geçici test DB'sinde
+        settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        if connection.vendor == "sqlite":
+            # in-memory test DB'si shared-cache kullanır ve paralel yazıcılarda beklemeden
+            # "table is locked" verir; gerçek kurulum gibi dosya (WAL + busy timeout) kullan
+            connection.settings_dict["TEST"]["NAME"] = str(settings.BASE_DIR / "loadtest.sqlite3")
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self._run(options)
+        finally:
+            test_name = connection.settings_dict["NAME"]
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if connection.vendor == "sqlite":
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(f"{test_name}{suffix}"):
+                        os.remove(f"{test_name}{suffix}")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for key, value in report.items():
+            self.stdout.write(f"{key:>24}: {value}")
+
+    # ---------------- phases ----------------
+
+    def _run(self, options):
+        n = options["games"]
+        counter = QueryCounter()
+        counter.install()
+
+        setup_started = time.perf_counter()
+        pairs = [self._setup_game(i, options["bet"]) for i in range(n)]
+        setup_seconds = time.perf_counter() - setup_started
+
+        stats = GameStats()
+        queries_before = counter.value
+        play_started = time.perf_counter()
+        asyncio.run(self._play_all(pairs, stats, options))
+        play_seconds = time.perf_counter() - play_started
+        play_queries = counter.value - queries_before
+
+        latencies = sorted(stats.latencies)
+        return {
+            "games_requested": n,
+            "games_finished": stats.games,
+            "setup_seconds": round(setup_seconds, 3),
+            "play_seconds": round(play_seconds, 3),
+            "games_per_sec": round(stats.games / play_seconds, 2) if play_seconds else 0,
+            "guesses": stats.guesses,
+            "guess_p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "guess_p90_ms": round(_percentile(latencies, 90) * 1000, 2),
+            "guess_p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "guess_max_ms": round((latencies[-1] if latencies else 0) * 1000, 2),
+            "play_queries": play_queries,
+            "queries_per_guess": round(play_queries / stats.guesses, 2) if stats.guesses else 0,
+            "errors": stats.errors,
+            "error_rate": round(stats.errors / max(1, stats.guesses + n), 4),
+            "error_samples": stats.error_samples,
+        }
+
+    def _setup_game(self, i, bet):
+        tokens = []
+        for role in ("a", "b"):
+            res = Client().post(
+                "/api/auth/signup/",
+                {"username": f"lt_{i}_{role}", "password": "loadtest", "age": 30},
+                content_type="application/json",
+            )
+            tokens.append(res.json()["token"])
+
+        creator = Client(HTTP_AUTHORIZATION=f"Token {tokens[0]}")
+        joiner = Client(HTTP_AUTHORIZATION=f"Token {tokens[1]}")
+        room_id = creator.post("/api/rooms/", {"bet_amount": bet}, content_type="application/json").json()["id"]
+        joiner.post(f"/api/rooms/{room_id}/join/", {}, content_type="application/json")
+        return room_id, tokens
+
+    async def _play_all(self, pairs, stats, options):
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def run(room_id, tokens):
+            async with semaphore:
+                try:
+                    await self._play_game(room_id, tokens, stats, options["timeout"])
+                except Exception as e:
+                    stats.error(f"room {room_id}: {type(e).__name__}: {e}")
+
+        await asyncio.gather(*(run(room_id, tokens) for room_id, tokens in pairs))
+
+    async def _play_game(self, room_id, tokens, stats, timeout):
+        from channels.testing import WebsocketCommunicator
+        from core.asgi import application
+
+        comms = [WebsocketCommunicator(application, f"/ws/rooms/{room_id}/?token={t}") for t in tokens]
+        try:
+            for comm in comms:
+                connected, _ = await comm.connect(timeout=timeout)
+                if not connected:
+                    raise RuntimeError("WebSocket rejected")
+
+            snapshot = None
+            while snapshot is None or not snapshot.get("turn"):
+                msg = await comms[0].receive_json_from(timeout=timeout)
+                if msg["type"] == "SNAPSHOT":
+                    snapshot = msg["payload"]
+
+            by_name = dict(zip(snapshot["players"], comms))
+            turn = snapshot["turn"]
+            low, high = 1, 100
+
+            while True:
+                guess = (low + high) // 2
+                sender = by_name[turn]
+                started = time.perf_counter()
+                await sender.send_json_to({"type": "GUESS", "payload": {"value": guess}})
+
+                event = await self._next_event(sender, timeout)
+                stats.latencies.append(time.perf_counter() - started)
+                stats.guesses += 1
+                for other in comms:
+                    if other is not sender:
+                        await self._next_event(other, timeout)
+
+                if event["event"] == "GAME_OVER":
+                    stats.games += 1
+                    return
+                if event["result"] == "higher":
+                    low = guess + 1
+                else:
+                    high = guess - 1
+                turn = event["next_turn"]
+        finally:
+            for comm in comms:
+                await comm.disconnect()
+
+    async def _next_event(self, comm, timeout):
+        while True:
+            msg = await comm.receive_json_from(timeout=timeout)
+            if msg["type"] == "ERROR":
+                raise RuntimeError(msg["payload"].get("detail"))
+            if msg["type"] == "GAME_EVENT" and msg["payload"]["event"] in ("GUESS", "GAME_OVER"):
+                return msg["payload"]
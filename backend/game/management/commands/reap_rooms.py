@@ -0,0 +1,35 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game.matchmaking import matchmaking_queue
+from game.rooms import expire_stale_rooms, refund_abandoned_rooms
+
+
+class Command(BaseCommand):
+    help = (
+        "Bayat OPEN odaları EXPIRED yapar, terk edilmiş oyunların bet'lerini iade eder. "
+        "ASGI worker'larındaki reaper ile aynı sweep; cron ya da --loop ile daemon olarak."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="REAPER_SWEEP_INTERVAL'de bir tekrar et")
+        parser.add_argument("--interval", type=float, default=None, help="Saniye (default: REAPER_SWEEP_INTERVAL)")
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        interval = options["interval"] or getattr(settings, "REAPER_SWEEP_INTERVAL", 30) or 30
+
+        while True:
+            expired = expire_stale_rooms()
+            refunded = refund_abandoned_rooms()
+            matchmaking_queue.purge()
+            self.stdout.write(f"expired={expired} refunded={refunded}")
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,191 @@
+import random
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .ledger import InsufficientBalance, lock_bets
+from .models import MatchmakingTicket, Room
+from .room_list import invalidate_room_list
+
+MATCH_FOUND = "MATCH_FOUND"
+MATCH_FAILED = "MATCH_FAILED"
+
+
+def user_group(user_id: int) -> str:
+    """Kullanıcıya özel channel group'u (ws/matchmaking/ bağlantıları burada)."""
+    return f"user_{user_id}"
+
+
+class MatchmakingQueue:
+    """
+    Bet miktarı başına FIFO kuyruk; kayıtlar MatchmakingTicket tablosunda, yani
+    tüm worker'larda ortak (REST ve WS istekleri farklı process'lere düşebilir).
+
+    enqueue() aynı bet'te bekleyen en eski oyuncuyu conditional DELETE ile sahiplenip
+    döner; yoksa çağıranı sıraya ekler. Aynı rakibi iki worker aynı anda seçerse
+    DELETE'i etkileyen kazanır, diğeri sıradakine geçer. Oda oluşturma çağıranın
+    işidir (bkz. join_queue). MATCHMAKING_QUEUE_TTL saniyedir tazelenmeyen
+    (enqueue / status / touch) kayıtlar eşleştirilmez; açık ws/matchmaking/
+    bağlantıları kaydı heartbeat ile touch() eder.
+    """
+
+    @property
+    def ttl(self) -> float:
+        return getattr(settings, "MATCHMAKING_QUEUE_TTL", 120)
+
+    def _cutoff(self, now):
+        return now - timedelta(seconds=self.ttl)
+
+    def enqueue(self, user_id: int, username: str, bet: int):
+        """Eşleşen rakibi (user_id, username) döner; yoksa kullanıcıyı sıraya ekleyip None."""
+        now = timezone.now()
+        tickets = MatchmakingTicket.objects
+        with transaction.atomic():
+            # eski eşleşme kaydı ya da başka bet'teki sıra düşer; aynı bet'teyse yeri korunur
+            tickets.filter(user_id=user_id).exclude(bet_amount=bet, room__isnull=True).delete()
+
+            waiting = (
+                tickets.filter(bet_amount=bet, room__isnull=True, last_seen__gte=self._cutoff(now))
+                .exclude(user_id=user_id)
+                .order_by("enqueued_at", "user_id")
+            )
+            while True:
+                opponent = waiting.values_list("user_id", "user__username").first()
+                if opponent is None:
+                    break
+                if tickets.filter(user_id=opponent[0], room__isnull=True).delete()[0]:
+                    tickets.filter(user_id=user_id).delete()
+                    return opponent
+
+            updated = tickets.filter(user_id=user_id).update(last_seen=now)
+            if not updated:
+                tickets.create(user_id=user_id, bet_amount=bet, enqueued_at=now, last_seen=now)
+            return None
+
+    def requeue_front(self, user_id: int, username: str, bet: int):
+        """Eşleşme yarıda kaldı (rakibin bakiyesi yetmedi); sıranın başına geri koy."""
+        now = timezone.now()
+        with transaction.atomic():
+            first = (
+                MatchmakingTicket.objects.filter(bet_amount=bet, room__isnull=True)
+                .order_by("enqueued_at")
+                .values_list("enqueued_at", flat=True)
+                .first()
+            )
+            enqueued_at = min(now, first - timedelta(microseconds=1)) if first else now
+            MatchmakingTicket.objects.update_or_create(
+                user_id=user_id,
+                defaults={"bet_amount": bet, "room": None, "enqueued_at": enqueued_at, "last_seen": now},
+            )
+
+    def dequeue(self, user_id: int) -> bool:
+        return MatchmakingTicket.objects.filter(user_id=user_id, room__isnull=True).delete()[0] > 0
+
+    def touch(self, user_id: int) -> bool:
+        """Sıradaki kaydın last_seen'ini tazeler (ws/matchmaking/ heartbeat'i)."""
+        return MatchmakingTicket.objects.filter(user_id=user_id, room__isnull=True).update(last_seen=timezone.now()) > 0
+
+    def record_match(self, user_ids, room_id: int, bet: int):
+        """Eşleşmeyi polling client'lar için kaydeder (status -> matched, TTL boyunca)."""
+        now = timezone.now()
+        with transaction.atomic():
+            MatchmakingTicket.objects.filter(user_id__in=user_ids).delete()
+            MatchmakingTicket.objects.bulk_create(
+                MatchmakingTicket(user_id=user_id, bet_amount=bet, room_id=room_id, enqueued_at=now, last_seen=now)
+                for user_id in user_ids
+            )
+
+    def status(self, user_id: int) -> dict:
+        """Kuyruktaki yer ya da son eşleşme. Çağrı kaydı canlı tutar (TTL)."""
+        now = timezone.now()
+        ticket = MatchmakingTicket.objects.filter(user_id=user_id).first()
+        if ticket is None:
+            return {"status": "idle"}
+
+        if ticket.room_id is not None:
+            if ticket.last_seen >= self._cutoff(now):
+                return {"status": "matched", "room_id": ticket.room_id}
+            MatchmakingTicket.objects.filter(user_id=user_id, room_id=ticket.room_id).delete()
+            return {"status": "idle"}
+
+        if not MatchmakingTicket.objects.filter(user_id=user_id, room__isnull=True).update(last_seen=now):
+            return self.status(user_id)  # bu arada eşleşti ya da sıradan çıktı
+        ahead = (
+            MatchmakingTicket.objects.filter(
+                bet_amount=ticket.bet_amount, room__isnull=True, last_seen__gte=self._cutoff(now)
+            )
+            .filter(Q(enqueued_at__lt=ticket.enqueued_at) | Q(enqueued_at=ticket.enqueued_at, user_id__lt=user_id))
+            .count()
+        )
+        return {"status": "queued", "bet_amount": ticket.bet_amount, "position": ahead + 1}
+
+    def purge(self) -> int:
+        """TTL'i geçmiş kayıtları (bekleyen ya da eşleşmiş) siler; reaper sweep'i çağırır."""
+        return MatchmakingTicket.objects.filter(last_seen__lt=self._cutoff(timezone.now())).delete()[0]
+
+
+matchmaking_queue = MatchmakingQueue()
+
+
+def _notify_user(user_id: int, payload: dict):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(user_group(user_id), {"type": "match.event", "payload": payload})
+
+
+def create_match_room(player1_id: int, player2_id: int, bet: int) -> Room:
+    """
+    Eşleşen iki oyuncu için oyunu başlamış (FULL + locked) oda: tek transaction'da
+    INSERT + lock_bets. Bakiyesi yetmeyen varsa InsufficientBalance ve oda oluşmaz.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        room = Room.objects.create(
+            bet_amount=bet,
+            status=Room.Status.FULL,
+            player1_id=player1_id,
+            player2_id=player2_id,
+            secret_number=random.randint(1, 100),
+            current_turn_id=random.choice([player1_id, player2_id]),
+            is_locked=True,
+            started_at=now,
+            last_move_at=now,
+        )
+        lock_bets(room, [player1_id, player2_id], bet)
+        transaction.on_commit(invalidate_room_list)
+    return room
+
+
+def join_queue(user, bet: int) -> dict:
+    """
+    Kullanıcıyı bet kuyruğuna sokar ya da bekleyen rakiple eşleştirir.
+    Kullanıcının kendi bakiyesi yetmezse InsufficientBalance (kuyruğa girmez).
+    """
+    while True:
+        opponent = matchmaking_queue.enqueue(user.id, user.username, bet)
+        if opponent is None:
+            return matchmaking_queue.status(user.id)
+
+        opponent_id, opponent_name = opponent
+        try:
+            room = create_match_room(opponent_id, user.id, bet)
+        except InsufficientBalance as e:
+            if opponent_id in e.user_ids:
+                _notify_user(opponent_id, {"event": MATCH_FAILED, "detail": "Insufficient balance"})
+            else:
+                matchmaking_queue.requeue_front(opponent_id, opponent_name, bet)
+            if user.id in e.user_ids:
+                raise
+            continue
+
+        matchmaking_queue.record_match([opponent_id, user.id], room.id, bet)
+        players = [opponent_name, user.username]
+        for user_id in (opponent_id, user.id):
+            _notify_user(user_id, {"event": MATCH_FOUND, "room_id": room.id, "bet_amount": bet, "players": players})
+        return {"status": "matched", "room_id": room.id}
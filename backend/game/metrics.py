@@ -0,0 +1,231 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Aktif istek / WS mesajı için sorgu sayacı; sync_to_async context'i DB thread'ine taşır.
+_current = ContextVar("game_metrics_current", default=None)
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = {
+    "app_handler_duration_seconds": ("Total handler time per endpoint / message type", DURATION_BUCKETS),
+    "app_handler_db_queries": ("DB queries per endpoint / message type", QUERY_BUCKETS),
+    "app_handler_db_seconds": ("DB time per endpoint / message type", DURATION_BUCKETS),
+    "app_handler_payload_bytes": ("Payload size (HTTP response / WS inbound frame)", SIZE_BUCKETS),
+    "app_room_join_update_seconds": ("Time spent in the conditional join UPDATE (incl. DB write lock wait)", DURATION_BUCKETS),
+}
+
+
+class _QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Process-local histogram / counter deposu; /metrics Prometheus text formatında basar."""
+
+    def __init__(self):
+        self._histograms: dict[tuple, Histogram] = {}
+        self._counters: dict[tuple, float] = {}
+        self._help: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: dict, value: float):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(HISTOGRAMS[name][1])
+            hist.observe(value)
+
+    def inc(self, name: str, labels: dict | None = None, value: float = 1, help_text: str = ""):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        seen = set()
+        for (name, labels), hist in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {HISTOGRAMS[name][0]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {hist.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {hist.sum}")
+            lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels, **extra) -> str:
+    items = list(labels) + [(k, v) for k, v in extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+registry = Registry()
+
+
+def enabled() -> bool:
+    return getattr(settings, "METRICS_ENABLED", True)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """Tüm bağlantılara takılan execute_wrapper; sadece ölçülen bir handler içindeyken sayar."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    # connection_created sinyali (apps.ready'de bağlanır)
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+@contextmanager
+def measure(kind: str, endpoint: str):
+    """
+    Blok süresince çalışan sorguları sayar ve süreyi ölçer.
+    yield edilen dict'e "payload_bytes" yazılırsa o da kaydedilir; "endpoint"
+    yazılırsa etiket onunla değiştirilir (route ancak view çözülünce belli olur).
+    """
+    stats = _QueryStats()
+    extra = {}
+    token = _current.set(stats)
+    started = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        elapsed = time.perf_counter() - started
+        _current.reset(token)
+
+        labels = {"kind": kind, "endpoint": extra.get("endpoint", endpoint)}
+        registry.observe("app_handler_duration_seconds", labels, elapsed)
+        registry.observe("app_handler_db_queries", labels, stats.count)
+        registry.observe("app_handler_db_seconds", labels, stats.seconds)
+        if extra.get("payload_bytes") is not None:
+            registry.observe("app_handler_payload_bytes", labels, extra["payload_bytes"])
+
+
+class MetricsMiddleware:
+    """HTTP: endpoint (URL route) başına sorgu sayısı, DB süresi, toplam süre ve response boyutu."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not enabled():
+            return self.get_response(request)
+
+        with measure("http", "unmatched") as extra:
+            response = self.get_response(request)
+            match = getattr(request, "resolver_match", None)
+            extra["endpoint"] = f"{request.method} /{match.route}" if match else "unmatched"
+            if not getattr(response, "streaming", False):
+                extra["payload_bytes"] = len(response.content)
+        return response
+
+
+class InstrumentedConsumerMixin:
+    """
+    WS consumer'lar için: connect ve gelen mesaj başına (mesaj tipine göre) metrik.
+    Tanınmayan tipler "other" etiketine düşer (label cardinality sınırlı kalsın).
+    """
+
+    metrics_message_types: tuple = ()
+
+    @property
+    def _metrics_name(self):
+        return type(self).__name__
+
+    async def websocket_connect(self, message):
+        if not enabled():
+            return await super().websocket_connect(message)
+        with measure("ws", f"{self._metrics_name}.connect"):
+            return await super().websocket_connect(message)
+
+    async def decode_frame(self, text_data=None, bytes_data=None):
+        # WireProtocolMixin binary frame'ler için override eder
+        if text_data:
+            return await self.decode_json(text_data)
+        raise ValueError("No text section for incoming WebSocket frame!")
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        # receive_json alt sınıfta override edildiği için ölçüm burada, decode'dan sonra yapılır
+        content = await self.decode_frame(text_data, bytes_data)
+        if not enabled():
+            return await self.receive_json(content, **kwargs)
+
+        msg_type = content.get("type") if isinstance(content, dict) else None
+        if msg_type not in self.metrics_message_types:
+            msg_type = "other"
+        with measure("ws", f"{self._metrics_name}.{msg_type}") as extra:
+            extra["payload_bytes"] = len(text_data or bytes_data or "")
+            return await self.receive_json(content, **kwargs)
+
+
+def metrics_view(request):
+    """GET /metrics: Prometheus text format. Sadece METRICS_ALLOWED_IPS'ten erişilir."""
+    if request.META.get("REMOTE_ADDR") not in getattr(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1", "::1"]):
+        return HttpResponseForbidden()
+
+    from users.authentication import token_cache
+
+    stats = token_cache.stats()
+    body = registry.render()
+    body += "# TYPE auth_token_cache_hits_total counter\n"
+    body += f"auth_token_cache_hits_total {stats['hits']}\n"
+    body += "# TYPE auth_token_cache_misses_total counter\n"
+    body += f"auth_token_cache_misses_total {stats['misses']}\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_alter_room_options_remove_betsettings_updated_at_and_more'),
+        ('users', '0002_user_balance_rank_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchmakingTicket',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('bet_amount', models.PositiveIntegerField()),
+                ('enqueued_at', models.DateTimeField()),
+                ('last_seen', models.DateTimeField(db_index=True)),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bet_amount', 'enqueued_at'], name='game_mm_bet_fifo_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_matchmakingticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='last_move_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='accounttransaction',
+            name='type',
+            field=models.CharField(choices=[('bet_lock', 'Bet lock'), ('payout', 'Payout'), ('adjust', 'Adjust'), ('refund', 'Refund')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('full', 'Full'), ('finished', 'Finished'), ('expired', 'Expired')], db_index=True, default='open', max_length=16),
+        ),
+    ]
@@ -16,6 +16,8 @@ class Room(models.Model):
         OPEN = "open", "Open"
         FULL = "full", "Full"
         FINISHED = "finished", "Finished"
+        # hiç başlamadan zaman aşımına uğrayan ya da terk edilip iade edilen oda
+        EXPIRED = "expired", "Expired"
 
     bet_amount = models.PositiveIntegerField()
 
@@ -63,6 +65,8 @@ class Room(models.Model):
     is_locked = models.BooleanField(default=False, db_index=True)
     started_at = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
+    # son tahmin (ya da oyun başlangıcı); terk edilmiş oyun taraması buna bakar
+    last_move_at = models.DateTimeField(null=True, blank=True)
     turn_count = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -83,6 +87,7 @@ class AccountTransaction(models.Model):
         BET_LOCK = "bet_lock", "Bet lock"
         PAYOUT = "payout", "Payout"
         ADJUST = "adjust", "Adjust"
+        REFUND = "refund", "Refund"
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -112,3 +117,89 @@ class AccountTransaction(models.Model):
 
     class Meta:
         ordering = ["-id"]
+        indexes = [
+            # hesap hareketleri keyset pagination'ı (game/transactions.py)
+            models.Index(fields=["user", "-id"], name="game_txn_user_id_desc_idx"),
+        ]
+
+
+class ArchivedRoom(models.Model):
+    """
+    Arşive taşınmış (bitmiş / expire olmuş, eski) oda. id orijinal Room id'sidir;
+    sıcak tablo küçük kalsın diye game/archive.py taşır, liste endpoint'i buradan da okur.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    bet_amount = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=Room.Status.choices)
+
+    player1 = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="+", on_delete=models.CASCADE)
+    player2 = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="+", null=True, blank=True, on_delete=models.SET_NULL
+    )
+    winner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="+", null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    secret_number = models.PositiveSmallIntegerField(null=True, blank=True)
+    turn_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ArchivedRoom(id={self.id}, bet={self.bet_amount}, status={self.status})"
+
+    class Meta:
+        ordering = ["-id"]
+
+
+class ArchivedTransaction(models.Model):
+    """Arşive taşınmış AccountTransaction. room FK yerine id + o anki bet tutarı (oda da arşivde olabilir)."""
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    room_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    room_bet_amount = models.PositiveIntegerField(null=True, blank=True)
+
+    type = models.CharField(max_length=20, choices=AccountTransaction.Type.choices)
+    amount = models.IntegerField()
+    balance_after = models.IntegerField()
+
+    note = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ArchivedTxn(user={self.user_id}, type={self.type}, amount={self.amount})"
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["user", "-id"], name="game_archtxn_user_id_desc_idx"),
+        ]
+
+
+class MatchmakingTicket(models.Model):
+    """
+    Matchmaking kuyruğundaki oyuncu (game/matchmaking.py). Tablo tüm worker'larda
+    ortak; eşleşince silinmez, room dolar (polling client'lar status ile görür).
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, primary_key=True, on_delete=models.CASCADE, related_name="+")
+    bet_amount = models.PositiveIntegerField()
+    room = models.ForeignKey(Room, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+
+    enqueued_at = models.DateTimeField()
+    # enqueue / status / açık ws/matchmaking/ heartbeat'i tazeler; MATCHMAKING_QUEUE_TTL
+    last_seen = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"MatchmakingTicket(user={self.user_id}, bet={self.bet_amount}, room={self.room_id})"
+
+    class Meta:
+        indexes = [
+            # aynı bet'te bekleyen en eski oyuncu
+            models.Index(fields=["bet_amount", "enqueued_at"], name="game_mm_bet_fifo_idx"),
+        ]
@@ -0,0 +1,161 @@
+"""
+Oyun zaman aşımları (worker başına arka plan görevi, bkz. core/asgi.py):
+
+- Sıra zaman aşımı: sırası gelen oyuncu GAME_TURN_TIMEOUT_SECONDS içinde tahmin
+  etmezse oyunu kaybeder (rakibe 2 * bet ödenir). Deadline'lar bellekte bir heap'te.
+- DB sweep (REAPER_SWEEP_INTERVAL'de bir): hiçbir worker'ın belleğinde olmayan
+  terk edilmiş oyunların bet'leri iade edilir, bayat OPEN odalar EXPIRED olur
+  (bkz. rooms.py). Restart / çok worker durumunda timer'ların kaçırdıklarını toplar.
+  TTL'i geçmiş matchmaking kayıtları da silinir.
+- Arşivleme (HISTORY_ARCHIVE_INTERVAL'de bir): eski geçmiş arşiv tablolarına (bkz. archive.py).
+"""
+import asyncio
+import heapq
+import logging
+import time
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .archive import archive_history
+from .db_executor import db_write
+from .matchmaking import matchmaking_queue
+from .room_state import LiveRoom, room_store
+from .rooms import expire_stale_rooms, forfeit_room, refund_abandoned_rooms
+
+logger = logging.getLogger(__name__)
+
+
+class TurnTimer:
+    """
+    (deadline, room_id, turn_count) min-heap'i. Yeni hamlede eski kayıt silinmez;
+    süresi dolunca canlı state ile karşılaştırılır, turn_count değiştiyse atlanır.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, int]] = []
+        self._wakeup = None
+        self._loop = None
+
+    @property
+    def timeout(self) -> float:
+        return getattr(settings, "GAME_TURN_TIMEOUT_SECONDS", 60)
+
+    def schedule(self, live: LiveRoom):
+        """Çağıran event loop'ta olmalı (consumer'lar)."""
+        if self.timeout <= 0:
+            return
+        entry = (time.monotonic() + self.timeout, live.room_id, live.turn_count)
+        heapq.heappush(self._heap, entry)
+        if self._wakeup is not None and self._heap[0] is entry and self._loop is asyncio.get_running_loop():
+            self._wakeup.set()
+
+    def pop_due(self, now: float):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+    async def wait(self, max_wait: float):
+        """Sıradaki deadline'a (ya da max_wait'e) kadar bekler; daha erken bir deadline eklenirse uyanır."""
+        # Event ilk kullanıldığı loop'a bağlanır; BackgroundTasks her loop'ta run()'ı yeniden başlatır
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+        self._wakeup.clear()
+        delay = max_wait
+        if self._heap:
+            delay = min(delay, max(0.0, self._heap[0][0] - time.monotonic()))
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+
+turn_timer = TurnTimer()
+
+
+async def forfeit_turn(room_id: int, turn_count: int):
+    """
+    Sırası gelen oyuncu süreyi doldurduysa oyunu rakibine verir. Karar DB'deki sıraya
+    göre verilir (forfeit_room): bu process'in kopyası bayatsa oda dokunulmaz, kopya atılır.
+    """
+    channel_layer = get_channel_layer()
+    async with room_store.lock(room_id):
+        live = room_store.get(room_id)
+        # bu arada hamle yapıldı / oyun bitti ya da başka worker'da devam ediyor
+        if live is None or live.finished or live.turn_count != turn_count:
+            return
+
+        loser_id = live.current_turn_id
+        winner_id = live.player2_id if loser_id == live.player1_id else live.player1_id
+        try:
+            end_state = await db_write(forfeit_room)(room_id, winner_id, loser_id, live.turn_count)
+        finally:
+            room_store.discard(room_id)
+        if end_state is None:
+            logger.info("Turn timeout skipped for room %s: game moved on elsewhere", room_id)
+            return
+        live.finished = True
+
+        await channel_layer.group_send(
+            f"room_{room_id}",
+            {
+                "type": "room.event",
+                "payload": {
+                    "event": "GAME_OVER",
+                    "reason": "timeout",
+                    "seq": live.seq,
+                    "winner": end_state["winner_username"],
+                    "number": live.secret_number,
+                    "turn_count": end_state["turn_count"],
+                    "finished_at": end_state["finished_at"],
+                },
+                "state": {"finished": True},
+            },
+        )
+
+
+async def sweep():
+    expired = await db_write(expire_stale_rooms)()
+    refunded = await db_write(refund_abandoned_rooms)()
+    await db_write(matchmaking_queue.purge)()
+    if expired or refunded:
+        logger.info("Reaper: %s stale rooms expired, %s abandoned games refunded", expired, refunded)
+
+
+async def archive():
+    rooms, txns = await db_write(archive_history)()
+    if rooms or txns:
+        logger.info("Reaper: archived %s rooms, %s transactions", rooms, txns)
+
+
+async def run():
+    sweep_interval = getattr(settings, "REAPER_SWEEP_INTERVAL", 30)
+    archive_interval = getattr(settings, "HISTORY_ARCHIVE_INTERVAL", 3600)
+    next_sweep = next_archive = time.monotonic()
+    while True:
+        now = time.monotonic()
+        for _deadline, room_id, turn_count in turn_timer.pop_due(now):
+            try:
+                await forfeit_turn(room_id, turn_count)
+            except Exception:
+                logger.exception("Turn timeout failed for room %s", room_id)
+
+        if sweep_interval > 0 and now >= next_sweep:
+            next_sweep = now + sweep_interval
+            try:
+                await sweep()
+            except Exception:
+                logger.exception("Reaper sweep failed")
+
+        if archive_interval > 0 and now >= next_archive:
+            next_archive = now + archive_interval
+            try:
+                await archive()
+            except Exception:
+                logger.exception("History archive failed")
+
+        wakeups = [t for t, interval in ((next_sweep, sweep_interval), (next_archive, archive_interval)) if interval > 0]
+        await turn_timer.wait(max(0.0, min(wakeups, default=time.monotonic() + 60) - time.monotonic()))
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ArchivedRoom, Room
+from .versions import ROOM_LIST_VERSION_KEY, aget_version, bump, get_version
+
+ROOM_LIST_FIELDS = ("id", "bet_amount", "status", "player1_id", "player2_id", "created_at")
+ROOM_LIST_DEFAULT_LIMIT = 50
+ROOM_LIST_MAX_LIMIT = 200
+
+
+def room_list_version() -> int:
+    return get_version(ROOM_LIST_VERSION_KEY)
+
+
+def invalidate_room_list():
+    """Oda oluşturma / katılma / bitişte çağrılır; cache'lenmiş ilk sayfaları ve ETag'leri geçersiz kılar."""
+    bump(ROOM_LIST_VERSION_KEY)
+
+
+def values_row(values: dict) -> dict:
+    created = values["created_at"]
+    return {
+        "id": values["id"],
+        "bet_amount": values["bet_amount"],
+        "status": str(values["status"]).lower(),
+        "player1_id": values["player1_id"],
+        "player2_id": values["player2_id"],
+        "player_count": 1 + (1 if values["player2_id"] else 0),
+        "created_at": created.isoformat() if created else None,
+    }
+
+
+def room_row(room: Room) -> dict:
+    """Model instance'ından liste satırı (lobby feed delta'ları için)."""
+    return values_row({field: getattr(room, field) for field in ROOM_LIST_FIELDS})
+
+
+def _page_querysets(status, cursor, limit):
+    querysets = [Room.objects]
+    if status in (None, Room.Status.FINISHED, Room.Status.EXPIRED):
+        querysets.append(ArchivedRoom.objects)
+
+    sliced = []
+    for qs in querysets:
+        qs = qs.order_by("-id")
+        if status:
+            qs = qs.filter(status=status)
+        if cursor is not None:
+            qs = qs.filter(id__lt=cursor)
+        sliced.append(qs.values(*ROOM_LIST_FIELDS)[: limit + 1])
+    return sliced
+
+
+def _page(values: list, limit: int):
+    values.sort(key=lambda v: v["id"], reverse=True)
+    rows = [values_row(v) for v in values[: limit + 1]]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["id"]
+    return rows, next_cursor
+
+
+def fetch_room_page(status=None, cursor=None, limit=ROOM_LIST_DEFAULT_LIMIT):
+    """
+    id üzerinde keyset pagination: id < cursor olan en yeni `limit` oda.
+    Model instance üretmeden values() ile okur. (rows, next_cursor) döner.
+    Bitmiş odalar istenirse arşiv tablosu da okunur (bkz. archive.py); id'ler ortak.
+    """
+    return _page([v for qs in _page_querysets(status, cursor, limit) for v in qs], limit)
+
+
+async def afetch_room_page(status=None, cursor=None, limit=ROOM_LIST_DEFAULT_LIMIT):
+    """fetch_room_page'in async ORM hali (consumer'lar için)."""
+    return _page([v for qs in _page_querysets(status, cursor, limit) async for v in qs], limit)
+
+
+def _page_cache_key(status, limit, version) -> str:
+    return f"rooms:list:{version}:{status or 'all'}:{limit}"
+
+
+def room_page(status=None, cursor=None, limit=ROOM_LIST_DEFAULT_LIMIT):
+    """fetch_room_page + ilk sayfa için kısa TTL'li cache (lobby refresh'leri buraya düşer)."""
+    if cursor is not None:
+        return fetch_room_page(status=status, cursor=cursor, limit=limit)
+
+    key = _page_cache_key(status, limit, room_list_version())
+    page = cache.get(key)
+    if page is None:
+        page = fetch_room_page(status=status, limit=limit)
+        cache.set(key, page, timeout=getattr(settings, "ROOM_LIST_CACHE_TTL", 2))
+    return page
+
+
+async def aroom_page(status=None, cursor=None, limit=ROOM_LIST_DEFAULT_LIMIT):
+    """room_page'in async hali; aynı cache key'lerini kullanır."""
+    if cursor is not None:
+        return await afetch_room_page(status=status, cursor=cursor, limit=limit)
+
+    key = _page_cache_key(status, limit, await aget_version(ROOM_LIST_VERSION_KEY))
+    page = await cache.aget(key)
+    if page is None:
+        page = await afetch_room_page(status=status, limit=limit)
+        await cache.aset(key, page, timeout=getattr(settings, "ROOM_LIST_CACHE_TTL", 2))
+    return page
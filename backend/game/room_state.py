@@ -0,0 +1,208 @@
+import asyncio
+from collections import deque
+
+from django.conf import settings
+
+
+def event_seq(turn_count: int, started: bool = True, finished: bool = False) -> int:
+    """
+    Oda event'lerinin sıra numarası oyun state'inden türetilir (her worker aynı numarayı
+    üretir): 0 başlamamış, 1 GAME_STARTED, n+1 n. yanlış tahmin, GAME_OVER son tahmin + 1.
+    """
+    if not started:
+        return 0
+    return (turn_count or 0) + (2 if finished else 1)
+
+
+class LiveRoom:
+    """
+    Aktif (başlamış) bir oyunun process-local kopyası.
+    Guess hot path'i sadece bunu okur/yazar; DB'ye yalnızca start/finish
+    geçişlerinde ve arka planda turn write-through ile gidilir.
+    """
+
+    __slots__ = (
+        "room_id",
+        "bet_amount",
+        "player1_id",
+        "player2_id",
+        "player1_username",
+        "player2_username",
+        "secret_number",
+        "current_turn_id",
+        "turn_count",
+        "finished",
+    )
+
+    def __init__(
+        self,
+        room_id: int,
+        bet_amount: int,
+        player1_id: int,
+        player2_id: int,
+        player1_username: str,
+        player2_username: str,
+        secret_number: int,
+        current_turn_id: int,
+        turn_count: int = 0,
+    ):
+        self.room_id = room_id
+        self.bet_amount = bet_amount
+        self.player1_id = player1_id
+        self.player2_id = player2_id
+        self.player1_username = player1_username
+        self.player2_username = player2_username
+        self.secret_number = secret_number
+        self.current_turn_id = current_turn_id
+        self.turn_count = turn_count
+        self.finished = False
+
+    @classmethod
+    def from_state(cls, state: dict) -> "LiveRoom":
+        """RoomConsumer._state_from_room çıktısından kurar (oyun başlamış olmalı)."""
+        snapshot = state["snapshot"]
+        return cls(
+            room_id=snapshot["room"],
+            bet_amount=snapshot["bet_amount"],
+            player1_id=state["player1_id"],
+            player2_id=state["player2_id"],
+            player1_username=snapshot["players"][0],
+            player2_username=snapshot["players"][1],
+            secret_number=state["secret_number"],
+            current_turn_id=state["current_turn_id"],
+            turn_count=snapshot["turn_count"] or 0,
+        )
+
+    def username_of(self, user_id):
+        if user_id == self.player1_id:
+            return self.player1_username
+        if user_id == self.player2_id:
+            return self.player2_username
+        return None
+
+    @property
+    def current_turn_username(self):
+        return self.username_of(self.current_turn_id)
+
+    @property
+    def seq(self) -> int:
+        return event_seq(self.turn_count, finished=self.finished)
+
+    def apply_guess(self, value: int):
+        """
+        Tahmini uygular. Doğruysa None döner (oyun biter), yanlışsa
+        sırayı değiştirip "higher"/"lower" döner.
+        """
+        if value == self.secret_number:
+            self.finished = True
+            return None
+
+        self.turn_count += 1
+        self.current_turn_id = self.player2_id if self.current_turn_id == self.player1_id else self.player1_id
+        return "higher" if value < self.secret_number else "lower"
+
+    def apply_to_snapshot(self, snapshot: dict) -> dict:
+        """DB'den gelen snapshot'ı (write-through gecikmiş olabilir) canlı state ile günceller."""
+        snapshot["turn"] = self.current_turn_username
+        snapshot["turn_count"] = self.turn_count
+        snapshot["seq"] = self.seq
+        return snapshot
+
+
+class RoomStateStore:
+    """
+    room_id -> LiveRoom. Her oda için ayrı asyncio.Lock: aynı odadaki tahminler
+    sıralanır, farklı odalar birbirini beklemez.
+    Process-local'dir; oyuncular farklı worker'lardaysa kopyalar room.event
+    ile senkron tutulur (bkz. sync). Canlı odaların son event'leri reconnect'te
+    ?since=<seq> ile tekrar oynatılmak için halka buffer'da tutulur.
+    Kopya yalnızca bu process'te odaya bağlı consumer varken tutulur (attach / detach):
+    event almayan bir kopya bayatlar ve yanlış timeout'a yol açar.
+    """
+
+    def __init__(self):
+        self._rooms: dict[int, LiveRoom] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._events: dict[int, deque] = {}
+        # room_id -> bu process'te bağlı RoomConsumer sayısı
+        self._consumers: dict[int, int] = {}
+
+    @property
+    def event_buffer_size(self) -> int:
+        return getattr(settings, "ROOM_EVENT_BUFFER_SIZE", 64)
+
+    def lock(self, room_id: int) -> asyncio.Lock:
+        lock = self._locks.get(room_id)
+        if lock is None:
+            lock = self._locks[room_id] = asyncio.Lock()
+        return lock
+
+    def get(self, room_id: int):
+        return self._rooms.get(room_id)
+
+    def put(self, live: LiveRoom) -> LiveRoom:
+        self._rooms[live.room_id] = live
+        return live
+
+    def sync(self, room_id: int, state):
+        """
+        Başka bir worker'da işlenen tahmini (room.event ile gelen "state")
+        bu process'teki kopyaya uygular. Aynı event birden çok consumer'dan
+        gelebilir; uygulama idempotent.
+        """
+        live = self._rooms.get(room_id)
+        if live is None or not state:
+            return
+        if state.get("finished"):
+            self.discard(room_id)
+            return
+        if state["turn_count"] >= live.turn_count:
+            live.current_turn_id = state["current_turn_id"]
+            live.turn_count = state["turn_count"]
+
+    def record_event(self, room_id: int, seq, payload: dict):
+        """room.event payload'ını buffer'a ekler; aynı event her consumer'dan gelebilir, idempotent."""
+        if seq is None or room_id not in self._rooms:
+            return
+        events = self._events.get(room_id)
+        if events is None:
+            events = self._events[room_id] = deque(maxlen=self.event_buffer_size)
+        if events and seq <= events[-1][0]:
+            return
+        events.append((seq, payload))
+
+    def events_since(self, room_id: int, since: int):
+        """
+        since'ten sonraki event payload'ları; buffer boşluk bırakmadan kapsamıyorsa
+        (taşmış, worker yeniden başlamış, oda bu process'te canlı değil) None.
+        """
+        live = self._rooms.get(room_id)
+        if live is None or since > live.seq:
+            return None
+        if since == live.seq:
+            return []
+        events = self._events.get(room_id)
+        if not events or events[0][0] > since + 1 or events[-1][0] != live.seq:
+            return None
+        return [payload for seq, payload in events if seq > since]
+
+    def attach(self, room_id: int):
+        self._consumers[room_id] = self._consumers.get(room_id, 0) + 1
+
+    def detach(self, room_id: int):
+        """Son yerel consumer ayrılınca kopya atılır; oda tekrar gerekirse DB'den yüklenir."""
+        count = self._consumers.get(room_id, 0) - 1
+        if count > 0:
+            self._consumers[room_id] = count
+            return
+        self._consumers.pop(room_id, None)
+        self.discard(room_id)
+
+    def discard(self, room_id: int):
+        # Oyun bitince çağrılır; lock'u bekleyen varsa DB'den "finished" görür.
+        self._rooms.pop(room_id, None)
+        self._locks.pop(room_id, None)
+        self._events.pop(room_id, None)
+
+
+room_store = RoomStateStore()
@@ -0,0 +1,312 @@
+"""
+Oda yaşam döngüsünün DB tarafı: oyun başlatma, bitiş + ödeme, terk edilen oyunların
+iadesi, bayat OPEN odaların toplu expire edilmesi. Sync kod; DB thread'inde çağrılır.
+"""
+import random
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .ledger import InsufficientBalance, lock_bets, payout as ledger_payout, refund as ledger_refund
+from .lobby import ROOM_EXPIRED, ROOM_FILLED, ROOM_FINISHED, notify_lobby, notify_lobby_rows
+from .metrics import enabled as metrics_enabled, registry
+from .models import Room
+from .room_list import ROOM_LIST_FIELDS, invalidate_room_list, values_row
+from .room_state import event_seq
+from .turn_journal import turn_journal
+
+User = get_user_model()
+
+# Oda durum makinesi; durum status + is_locked'tan türetilir:
+#
+#   OPEN --(player2 katılır)--> FULL --start_game--> LOCKED --finish_room--> FINISHED
+#   OPEN / FULL --expire_stale_rooms--> EXPIRED      LOCKED --refund_abandoned_rooms--> EXPIRED
+#
+# Her geçiş kaynak durumu WHERE'de şart koşan tek bir conditional UPDATE'tir: 0 satır
+# güncellendiyse geçiş başka biri tarafından yapılmış (ya da geçersiz); satır kilidi alınmaz.
+OPEN, FULL, LOCKED, FINISHED, EXPIRED = "open", "full", "locked", "finished", "expired"
+
+STATE_FILTERS = {
+    OPEN: {"status": Room.Status.OPEN, "player2__isnull": True},
+    FULL: {"status": Room.Status.FULL, "is_locked": False, "player2__isnull": False},
+    LOCKED: {"status": Room.Status.FULL, "is_locked": True},
+    FINISHED: {"status": Room.Status.FINISHED},
+    EXPIRED: {"status": Room.Status.EXPIRED},
+}
+
+
+class JoinRejected(ValueError):
+    """join_room başarısız; reason JOIN_REJECTIONS anahtarlarından biri."""
+
+    def __init__(self, reason: str):
+        super().__init__(JOIN_REJECTIONS[reason])
+        self.reason = reason
+
+
+def room_state(status, is_locked: bool) -> str:
+    if status == Room.Status.FULL and is_locked:
+        return LOCKED
+    return str(status).lower()
+
+
+def _transition(room_id: int, source: str, *conditions, **changes) -> bool:
+    return Room.objects.filter(*conditions, id=room_id, **STATE_FILTERS[source]).update(**changes) == 1
+
+
+def _end_state(room: Room) -> dict:
+    return {
+        "winner_username": room.winner.username if room.winner else None,
+        "turn_count": room.turn_count,
+        "finished_at": room.finished_at.isoformat() if room.finished_at else None,
+    }
+
+
+def _notify_room_expired(room: Room):
+    """Odada bağlı kalmış client'lar (başka worker'da da olabilir) oyunun iade ile bittiğini görsün."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        f"room_{room.id}",
+        {
+            "type": "room.event",
+            "payload": {
+                "event": "GAME_OVER",
+                "reason": "abandoned",
+                "seq": event_seq(room.turn_count, finished=True),
+                "winner": None,
+                "number": room.secret_number,
+                "turn_count": room.turn_count,
+                "finished_at": room.finished_at.isoformat(),
+            },
+            "state": {"finished": True},
+        },
+    )
+
+
+# join_room reddedilme sebepleri -> API mesajı
+JOIN_REJECTIONS = {
+    "not_found": "Room not found",
+    "finished": "Room already finished",
+    "expired": "Room expired",
+    "own_room": "Cannot join your own room",
+    "full": "Room is full",
+}
+
+
+def _join_rejection(room_id: int, user_id: int) -> str:
+    """Join UPDATE'i 0 satır güncellediyse sebebi (kilitsiz tek okuma)."""
+    room = Room.objects.filter(id=room_id).values("status", "player1_id", "player2_id").first()
+    if room is None:
+        return "not_found"
+    if room["status"] == Room.Status.FINISHED:
+        return "finished"
+    if room["status"] == Room.Status.EXPIRED:
+        return "expired"
+    if room["player1_id"] == user_id:
+        return "own_room"
+    if room["player2_id"] is not None:
+        return "full"
+    # oda hâlâ OPEN: UPDATE'in bakiye şartı tutmadı
+    return "insufficient_balance"
+
+
+def _count_join(result: str, wait: float = 0.0):
+    if not metrics_enabled():
+        return
+    registry.inc(
+        "app_room_join_attempts_total",
+        {"result": result},
+        help_text="Room join attempts by result (conflict = lost the race for player2)",
+    )
+    registry.observe("app_room_join_update_seconds", {}, wait)
+
+
+def join_room(room_id: int, user) -> Room:
+    """
+    OPEN -> FULL -> LOCKED: player2 tek conditional UPDATE ile yazılır (WHERE player2 IS NULL,
+    kendi odası değil, bakiye >= bet), ardından start_game. Yarışı kaybeden beklemeden
+    JoinRejected alır; bet kilitlenemezse InsufficientBalance ve join geri alınır.
+    """
+    with transaction.atomic():
+        started = time.perf_counter()
+        joined = _transition(
+            room_id,
+            OPEN,
+            ~Q(player1_id=user.id),
+            Exists(User.objects.filter(id=user.id, balance__gte=OuterRef("bet_amount"))),
+            player2_id=user.id,
+            status=Room.Status.FULL,
+        )
+        wait = time.perf_counter() - started
+
+        if not joined:
+            reason = _join_rejection(room_id, user.id)
+            _count_join("conflict" if reason == "full" else reason, wait)
+            if reason == "insufficient_balance":
+                raise InsufficientBalance([user.id])
+            raise JoinRejected(reason)
+
+        try:
+            start_game(room_id)
+        except InsufficientBalance:
+            _count_join("insufficient_balance", wait)
+            raise
+
+        room = Room.objects.get(id=room_id)
+        transaction.on_commit(invalidate_room_list)
+        transaction.on_commit(lambda: notify_lobby(ROOM_FILLED, room))
+
+    _count_join("joined", wait)
+    return room
+
+
+def start_game(room_id: int) -> bool:
+    """
+    FULL -> LOCKED: secret / ilk sıra / started_at tek conditional UPDATE ile yazılır,
+    sonra iki oyuncunun bet'i kilitlenir. Oyunu bu çağrı başlattıysa True; zaten
+    başlamış ya da hazır değilse False (satır kilidi alınmaz). Bakiye yetmezse
+    InsufficientBalance ve UPDATE geri alınır (oda FULL kalır).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        started = _transition(
+            room_id,
+            FULL,
+            is_locked=True,
+            secret_number=Coalesce(F("secret_number"), Value(random.randint(1, 100))),
+            current_turn_id=F(random.choice(["player1_id", "player2_id"])),
+            turn_count=0,
+            started_at=now,
+            last_move_at=now,
+        )
+        if not started:
+            return False
+
+        room = Room.objects.get(id=room_id)
+        lock_bets(room, [room.player1_id, room.player2_id], room.bet_amount)
+    return True
+
+
+def _settle(room_id: int, winner_user_id: int, finished: bool) -> dict:
+    """finish / forfeit geçişinden sonra: geçişi bu çağrı yaptıysa ödeme ve bildirimler."""
+    room = Room.objects.select_related("winner", "player1", "player2").get(id=room_id)
+    if not finished:
+        return _end_state(room)
+
+    transaction.on_commit(invalidate_room_list)
+    transaction.on_commit(lambda: notify_lobby(ROOM_FINISHED, room))
+    ledger_payout(room, winner_user_id, 2 * int(room.bet_amount))
+
+    return _end_state(room)
+
+
+def finish_room(room_id: int, winner_user_id: int, turn_count: int | None = None) -> dict:
+    """LOCKED -> FINISHED ve kazanana 2 * bet. İdempotent: bitmiş odada sadece sonucu döner."""
+    with transaction.atomic():
+        # journal'da bekleyen turn kaydı burada senkron yazılır
+        pending = turn_journal.pop(room_id)
+        if turn_count is None and pending is not None:
+            turn_count = pending[1]
+
+        changes = {"status": Room.Status.FINISHED, "winner_id": winner_user_id, "finished_at": timezone.now()}
+        if turn_count is not None:
+            changes["turn_count"] = turn_count
+        finished = _transition(room_id, LOCKED, **changes)
+        return _settle(room_id, winner_user_id, finished)
+
+
+def forfeit_room(room_id: int, winner_user_id: int, loser_user_id: int, turn_count: int) -> dict | None:
+    """
+    Sıra zaman aşımı: LOCKED -> FINISHED, kazanan rakip. Sadece DB'de sıra hâlâ
+    (turn_count, loser_user_id) ise; oyun başka worker'da ilerlemişse (bu process'in
+    kopyası bayat) oda dokunulmadan kalır ve None döner.
+    """
+    with transaction.atomic():
+        # bu worker'ın henüz yazılmamış hamlesi karşılaştırmaya dahil olsun
+        turn_journal.flush_room(room_id)
+        finished = _transition(
+            room_id,
+            LOCKED,
+            Q(turn_count=turn_count, current_turn_id=loser_user_id),
+            status=Room.Status.FINISHED,
+            winner_id=winner_user_id,
+            finished_at=timezone.now(),
+        )
+        if not finished:
+            return None
+        return _settle(room_id, winner_user_id, finished)
+
+
+def refund_abandoned_rooms(limit: int = 100) -> int:
+    """
+    LOCKED -> EXPIRED: başlamış ama GAME_ABANDON_SECONDS boyunca hamle görmemiş oyunlarda
+    iki oyuncunun bet'i iade edilir. Her oda kendi transaction'ında.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "GAME_ABANDON_SECONDS", 600))
+    idle = Q(last_move_at__lt=cutoff) | Q(last_move_at__isnull=True, started_at__lt=cutoff)
+    candidates = list(
+        Room.objects.filter(idle, **STATE_FILTERS[LOCKED]).order_by("id").values_list("id", flat=True)[:limit]
+    )
+
+    refunded = 0
+    for room_id in candidates:
+        with transaction.atomic():
+            # bu arada bitmiş / hamle yapılmış olabilir: koşul UPDATE'te tekrar kontrol edilir
+            if not _transition(room_id, LOCKED, idle, status=Room.Status.EXPIRED, finished_at=timezone.now()):
+                continue
+
+            pending = turn_journal.pop(room_id)
+            if pending is not None:
+                Room.objects.filter(id=room_id, turn_count__lt=pending[1]).update(turn_count=pending[1])
+            room = Room.objects.get(id=room_id)
+            ledger_refund(room, [room.player1_id, room.player2_id], room.bet_amount)
+            transaction.on_commit(lambda room=room: notify_lobby(ROOM_EXPIRED, room))
+            transaction.on_commit(lambda room=room: _notify_room_expired(room))
+        refunded += 1
+
+    if refunded:
+        invalidate_room_list()
+    return refunded
+
+
+def expire_stale_rooms(limit: int = 500) -> int:
+    """
+    ROOM_OPEN_TTL_SECONDS'tan eski, bet'i kilitlenmemiş OPEN/FULL odaları tek UPDATE ile EXPIRED yapar.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "ROOM_OPEN_TTL_SECONDS", 1800))
+    stale = Room.objects.filter(
+        status__in=[Room.Status.OPEN, Room.Status.FULL],
+        is_locked=False,
+        created_at__lt=cutoff,
+    )
+    rows = [values_row(values) for values in stale.order_by("id").values(*ROOM_LIST_FIELDS)[:limit]]
+    if not rows:
+        return 0
+
+    # satırlar okunduktan sonra join olanlar (is_locked) dokunulmadan kalır; lobby'ye sadece
+    # bu UPDATE'in değiştirdikleri (finished_at = now) bildirilir
+    now = timezone.now()
+    ids = [row["id"] for row in rows]
+    with transaction.atomic():
+        stale.filter(id__in=ids).update(status=Room.Status.EXPIRED, finished_at=now)
+        expired_ids = set(
+            Room.objects.filter(id__in=ids, status=Room.Status.EXPIRED, finished_at=now).values_list("id", flat=True)
+        )
+    if not expired_ids:
+        return 0
+
+    invalidate_room_list()
+    rows = [row for row in rows if row["id"] in expired_ids]
+    for row in rows:
+        row["status"] = Room.Status.EXPIRED.value
+    notify_lobby_rows(ROOM_EXPIRED, rows)
+    return len(rows)
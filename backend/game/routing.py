@@ -1,6 +1,8 @@
 from django.urls import re_path
-from .consumers import RoomConsumer
+from .consumers import LobbyConsumer, MatchmakingConsumer, RoomConsumer
 
 websocket_urlpatterns = [
+    re_path(r"ws/lobby/$", LobbyConsumer.as_asgi()),
+    re_path(r"ws/matchmaking/$", MatchmakingConsumer.as_asgi()),
     re_path(r"ws/rooms/(?P<room_id>\d+)/$", RoomConsumer.as_asgi()),
 ]
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .bets import bet_settings_cache, broadcast_invalidate
+from .leaderboard import leaderboard
+from .models import AccountTransaction, BetSettings
+from .versions import bump, ledger_version_key
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # yeni kullanıcı leaderboard'a bir sonraki tam yüklemeyi beklemeden girsin
+    if created:
+        transaction.on_commit(lambda: leaderboard.update(instance.id, instance.balance, instance.username))
+
+
+@receiver(post_save, sender=AccountTransaction)
+@receiver(post_delete, sender=AccountTransaction)
+def account_transaction_changed(sender, instance, **kwargs):
+    # admin'den eklenen / düzeltilen kayıtlar; ledger.py yolları ayrıca bump eder (bulk_create signal atmaz)
+    transaction.on_commit(lambda: bump(ledger_version_key(instance.user_id)))
+
+
+@receiver(post_save, sender=BetSettings)
+@receiver(post_delete, sender=BetSettings)
+def bet_settings_changed(sender, instance, **kwargs):
+    # bu process hemen, diğer worker'lar channel layer üzerinden (bets.listen)
+    def invalidate():
+        bet_settings_cache.invalidate()
+        broadcast_invalidate()
+
+    transaction.on_commit(invalidate)
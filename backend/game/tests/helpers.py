@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from game.models import AccountTransaction, Room
+
+User = get_user_model()
+
+
+def make_user(username: str, balance: int = 1000):
+    # parola hash'lenmez (testler token / force_login kullanır)
+    return User.objects.create_user(username=username, balance=balance)
+
+
+def token_for(user) -> str:
+    return Token.objects.get_or_create(user=user)[0].key
+
+
+def make_room(player1, player2=None, bet: int = 50, **fields) -> Room:
+    fields.setdefault("status", Room.Status.FULL if player2 else Room.Status.OPEN)
+    return Room.objects.create(player1=player1, player2=player2, bet_amount=bet, **fields)
+
+
+def make_started_room(player1, player2, bet: int = 50, secret: int = 42, turn=None, turn_count: int = 0) -> Room:
+    """Bet'leri kilitlenmiş gibi LOCKED bir oda (ledger'a dokunmaz)."""
+    return make_room(
+        player1,
+        player2,
+        bet=bet,
+        is_locked=True,
+        secret_number=secret,
+        current_turn=turn or player1,
+        turn_count=turn_count,
+    )
+
+
+def add_txn(user, type_, amount, room=None, days_ago=0):
+    txn = AccountTransaction.objects.create(user=user, room=room, type=type_, amount=amount, balance_after=1000)
+    if days_ago:
+        AccountTransaction.objects.filter(id=txn.id).update(created_at=timezone.now() - timedelta(days=days_ago))
+    return txn
+
+
+def ws_application():
+    """core.asgi'deki WS yığını, BackgroundTasks olmadan (testte reaper / bets.listen çalışmasın)."""
+    from channels.routing import URLRouter
+
+    from game.routing import websocket_urlpatterns
+    from game.ws_auth import TokenAuthMiddleware
+
+    return TokenAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+async def receive_until(communicator, predicate, timeout: float = 3):
+    """predicate(msg) True olana kadar gelen JSON mesajlarını okur; eşleşeni döner."""
+    while True:
+        message = await communicator.receive_json_from(timeout=timeout)
+        if predicate(message):
+            return message
+
+
+def game_event(name: str):
+    return lambda m: m["type"] == "GAME_EVENT" and m["payload"].get("event") == name
+
+
+@override_settings(GAME_TURN_TIMEOUT_SECONDS=0)
+class RoomSocketTestCase(TransactionTestCase):
+    """
+    ws/rooms/<id>/ testleri: consumer yazmaları db_write thread'lerinde çalıştığı için
+    TransactionTestCase. Süreç geneli state (canlı odalar, journal) her testten sonra temizlenir.
+    """
+
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+
+    def tearDown(self):
+        from game.room_state import room_store
+        from game.turn_journal import turn_journal
+
+        turn_journal.flush_sync()
+        room_store._consumers.clear()
+        for room_id in list(room_store._rooms):
+            room_store.discard(room_id)
+
+    async def open_socket(self, user, room, query: str = "", subprotocols=None, connect: bool = True):
+        path = f"/ws/rooms/{room.id}/?token={await _atoken_for(user)}"
+        if query:
+            path += "&" + query
+        communicator = WebsocketCommunicator(ws_application(), path, subprotocols=subprotocols)
+        if connect:
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+        return communicator
+
+
+async def _atoken_for(user) -> str:
+    from asgiref.sync import sync_to_async
+
+    return await sync_to_async(token_for)(user)
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from game.archive import archive_history, archive_orphan_transaction_batch, archive_room_batch
+from game.models import AccountTransaction, ArchivedRoom, ArchivedTransaction, Room
+
+from .helpers import add_txn, make_room, make_user, token_for
+
+
+class ArchiveHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.cutoff = timezone.now() - timedelta(days=30)
+        old = self.cutoff - timedelta(days=1)
+
+        self.old_rooms = []
+        for bet in (10, 20, 30, 40, 50):
+            room = make_room(self.alice, self.bob, bet=bet, status=Room.Status.FINISHED, winner=self.bob)
+            add_txn(self.alice, "bet_lock", -bet, room)
+            add_txn(self.bob, "payout", 2 * bet, room)
+            self.old_rooms.append(room)
+        Room.objects.filter(id__in=[r.id for r in self.old_rooms]).update(finished_at=old)
+
+        self.recent = make_room(self.alice, self.bob, bet=60, status=Room.Status.FINISHED, finished_at=timezone.now())
+        self.active = make_room(self.alice, self.bob, bet=70, is_locked=True)
+        self.old_adjust = add_txn(self.alice, "adjust", 5, days_ago=31)
+        self.new_adjust = add_txn(self.alice, "adjust", 5)
+
+    def test_batch_moves_oldest_rooms_with_their_transactions(self):
+        self.assertEqual(archive_room_batch(self.cutoff, 2), (2, 4))
+
+        moved = [r.id for r in self.old_rooms[:2]]
+        self.assertEqual(sorted(ArchivedRoom.objects.values_list("id", flat=True)), moved)
+        self.assertFalse(Room.objects.filter(id__in=moved).exists())
+        self.assertFalse(AccountTransaction.objects.filter(room_id__in=moved).exists())
+        archived = ArchivedTransaction.objects.filter(room_id=moved[0])
+        self.assertEqual(sorted(archived.values_list("room_bet_amount", flat=True)), [10, 10])
+
+    def test_history_runs_batches_until_done(self):
+        self.assertEqual(archive_history(before=self.cutoff, batch_size=2), (5, 11))
+
+        self.assertEqual(set(Room.objects.values_list("id", flat=True)), {self.recent.id, self.active.id})
+        self.assertEqual(ArchivedRoom.objects.count(), 5)
+        self.assertEqual(list(AccountTransaction.objects.values_list("id", flat=True)), [self.new_adjust.id])
+        self.assertEqual(archive_history(before=self.cutoff, batch_size=2), (0, 0))
+
+    def test_max_batches_stops_early(self):
+        self.assertEqual(archive_history(before=self.cutoff, batch_size=2, max_batches=1), (2, 4))
+        self.assertEqual(Room.objects.filter(id__in=[r.id for r in self.old_rooms]).count(), 3)
+
+    def test_orphan_transactions(self):
+        self.assertEqual(archive_orphan_transaction_batch(self.cutoff, 10), 1)
+        self.assertTrue(ArchivedTransaction.objects.filter(id=self.old_adjust.id, room_id=None).exists())
+        self.assertTrue(AccountTransaction.objects.filter(id=self.new_adjust.id).exists())
+
+    def test_already_copied_rows_are_not_duplicated(self):
+        # başka bir worker aynı batch'i kopyalamış: ignore_conflicts ile geçilir, canlı satırlar yine silinir
+        room = self.old_rooms[0]
+        ArchivedRoom.objects.create(
+            id=room.id,
+            bet_amount=room.bet_amount,
+            status=room.status,
+            player1=self.alice,
+            created_at=room.created_at,
+        )
+        txn = AccountTransaction.objects.filter(room=room).first()
+        ArchivedTransaction.objects.create(
+            id=txn.id, user_id=txn.user_id, room_id=room.id, type=txn.type, amount=txn.amount,
+            balance_after=txn.balance_after, created_at=txn.created_at,
+        )
+
+        self.assertEqual(archive_room_batch(self.cutoff, 1), (1, 2))
+        self.assertEqual(ArchivedRoom.objects.count(), 1)
+        self.assertEqual(ArchivedTransaction.objects.filter(room_id=room.id).count(), 2)
+        self.assertFalse(Room.objects.filter(id=room.id).exists())
+
+    def test_lists_still_return_archived_rows(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.alice)}")
+        rooms_before = client.get("/api/rooms/", {"status": "finished"}).json()["results"]
+        txns_before = client.get("/api/transactions/", {"limit": 200}).json()["results"]
+
+        archive_history(before=self.cutoff, batch_size=2)
+        cache.clear()
+
+        self.assertEqual(client.get("/api/rooms/", {"status": "finished"}).json()["results"], rooms_before)
+        self.assertEqual(client.get("/api/transactions/", {"limit": 200}).json()["results"], txns_before)
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from game import signals
+from game.bets import bet_settings_cache, validate_bet_amount
+from game.models import BetSettings
+
+
+class BetSettingsCacheTests(TestCase):
+    def setUp(self):
+        bet_settings_cache.invalidate()
+        self.addCleanup(bet_settings_cache.invalidate)
+
+    def test_reads_once_until_invalidated(self):
+        BetSettings.objects.create(min_bet=10, max_bet=100, step=5)
+        bet_settings_cache.invalidate()
+
+        self.assertEqual(bet_settings_cache.get(), {"min_bet": 10, "max_bet": 100, "step": 5})
+        with self.assertNumQueries(0):
+            self.assertEqual(validate_bet_amount(15), (True, ""))
+            self.assertEqual(validate_bet_amount(12), (False, "bet_amount must follow step"))
+            self.assertEqual(validate_bet_amount(200), (False, "bet_amount out of allowed range"))
+
+    @override_settings(BET_SETTINGS_CACHE_TTL=0)
+    def test_ttl_expiry_rereads(self):
+        bet_settings_cache.get()
+        with self.assertNumQueries(1):
+            bet_settings_cache.get()
+
+    def test_save_and_delete_invalidate_on_commit(self):
+        self.assertIsNone(bet_settings_cache.get())
+
+        with mock.patch.object(signals, "broadcast_invalidate") as broadcast:
+            with self.captureOnCommitCallbacks(execute=True):
+                row = BetSettings.objects.create(min_bet=10, max_bet=100, step=10)
+            self.assertEqual(bet_settings_cache.get()["min_bet"], 10)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                row.min_bet = 20
+                row.save()
+            self.assertEqual(bet_settings_cache.get()["min_bet"], 20)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                row.delete()
+            self.assertIsNone(bet_settings_cache.get())
+        self.assertEqual(broadcast.call_count, 3)
+
+    def test_no_invalidation_before_commit(self):
+        self.assertIsNone(bet_settings_cache.get())
+        with mock.patch.object(signals, "broadcast_invalidate"), self.captureOnCommitCallbacks(execute=False):
+            BetSettings.objects.create(min_bet=10, max_bet=100, step=10)
+            self.assertIsNone(bet_settings_cache.get())
+
+
+class BetSettingsViewTests(TestCase):
+    def setUp(self):
+        bet_settings_cache.invalidate()
+        self.addCleanup(bet_settings_cache.invalidate)
+
+    def test_empty_settings(self):
+        response = self.client.get("/api/bet-settings/")
+        self.assertEqual(response.json(), {"min_bet": None, "max_bet": None, "step": None})
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+    def test_304_until_settings_change(self):
+        BetSettings.objects.create(min_bet=10, max_bet=100, step=10)
+        first = self.client.get("/api/bet-settings/")
+        self.assertEqual(first.json(), {"min_bet": 10, "max_bet": 100, "step": 10})
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/bet-settings/", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+        # liste halinde gelen etag'ler de eşleşir
+        listed = self.client.get("/api/bet-settings/", headers={"If-None-Match": f'W/"other", {etag}'})
+        self.assertEqual(listed.status_code, 304)
+
+        with mock.patch.object(signals, "broadcast_invalidate"), self.captureOnCommitCallbacks(execute=True):
+            row = BetSettings.objects.get()
+            row.max_bet = 200
+            row.save()
+
+        changed = self.client.get("/api/bet-settings/", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["max_bet"], 200)
+        self.assertNotEqual(changed["ETag"], etag)
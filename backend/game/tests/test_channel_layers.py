@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.test import TransactionTestCase, override_settings
+
+from game.room_state import room_store
+from game.turn_journal import turn_journal
+
+from .helpers import game_event, make_started_room, make_user, receive_until, token_for, ws_application
+
+# ikinci worker: odanın grubuna katılır, ilk GUESS event'ini basar, sonra kendi GUESS'ini yayınlar
+OTHER_WORKER = """
+import asyncio, json, sys
+import django
+django.setup()
+from channels.layers import get_channel_layer
+
+async def main(group, reply):
+    layer = get_channel_layer()
+    channel = await layer.new_channel()
+    await layer.group_add(group, channel)
+    print("ready", flush=True)
+    message = {}
+    while message.get("payload", {}).get("event") != "GUESS":
+        message = await asyncio.wait_for(layer.receive(channel), timeout=10)
+    print(json.dumps(message), flush=True)
+    await layer.group_send(group, json.loads(reply))
+    await asyncio.sleep(0.2)
+
+asyncio.run(main(sys.argv[1], sys.argv[2]))
+"""
+
+
+@override_settings(GAME_TURN_TIMEOUT_SECONDS=0)
+class UnixSocketChannelLayerTests(TransactionTestCase):
+    """channel_broker + iki process: handle_guess'in group_send'i diğer process'teki consumer'a ulaşır."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.socket = os.path.join(self.tmp, "channels.sock")
+        self.env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "CHANNEL_LAYER": "unix",
+            "CHANNEL_BROKER_SOCKET": self.socket,
+        }
+        self.broker = subprocess.Popen(
+            [sys.executable, "manage.py", "channel_broker", "--path", self.socket],
+            cwd=settings.BASE_DIR,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.socket):
+            if time.monotonic() > deadline or self.broker.poll() is not None:
+                self.fail("channel_broker did not start")
+            time.sleep(0.05)
+
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.room = make_started_room(self.alice, self.bob, secret=42, turn=self.alice)
+        self.token = token_for(self.alice)
+
+    def tearDown(self):
+        turn_journal.flush_sync()
+        room_store.discard(self.room.id)
+        self.broker.terminate()
+        self.broker.wait(timeout=5)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    async def test_guess_event_crosses_worker_processes(self):
+        group = f"room_{self.room.id}"
+        reply = {
+            "type": "room.event",
+            "payload": {
+                "event": "GUESS",
+                "seq": 3,
+                "by": "bob",
+                "value": 60,
+                "result": "lower",
+                "next_turn": "alice",
+                "turn_count": 2,
+            },
+            "state": {"current_turn_id": self.alice.id, "turn_count": 2},
+        }
+        other = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            OTHER_WORKER,
+            group,
+            json.dumps(reply),
+            cwd=settings.BASE_DIR,
+            env=self.env,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        try:
+            self.assertEqual((await asyncio.wait_for(other.stdout.readline(), 10)).strip(), b"ready")
+
+            layers = {"default": {"BACKEND": "game.channel_layers.UnixSocketChannelLayer", "CONFIG": {"path": self.socket}}}
+            with self.settings(CHANNEL_LAYERS=layers):
+                communicator = WebsocketCommunicator(ws_application(), f"/ws/rooms/{self.room.id}/?token={self.token}")
+                connected, _ = await communicator.connect()
+                self.assertTrue(connected)
+                await receive_until(communicator, lambda m: m["type"] == "SNAPSHOT")
+
+                # bu process'teki handle_guess -> broker -> diğer process
+                await communicator.send_json_to({"type": "GUESS", "payload": {"value": 10}})
+                received = json.loads(await asyncio.wait_for(other.stdout.readline(), 10))
+                self.assertEqual(received["type"], "room.event")
+                self.assertEqual(received["payload"]["event"], "GUESS")
+                self.assertEqual(received["payload"]["by"], "alice")
+                self.assertEqual(received["payload"]["result"], "higher")
+                self.assertEqual(received["state"], {"current_turn_id": self.bob.id, "turn_count": 1})
+
+                # diğer process'in yayınladığı GUESS bu process'teki consumer'a ve canlı state'e
+                message = await receive_until(
+                    communicator, lambda m: game_event("GUESS")(m) and m["payload"]["by"] == "bob", timeout=10
+                )
+                self.assertEqual(message["payload"]["turn_count"], 2)
+                self.assertEqual(room_store.get(self.room.id).current_turn_id, self.alice.id)
+
+                await communicator.disconnect()
+            await asyncio.wait_for(other.wait(), 10)
+        finally:
+            if other.returncode is None:
+                other.kill()
+                await other.wait()
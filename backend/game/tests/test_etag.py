@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from game.checks import check_shared_cache
+from game.ledger import lock_bets
+
+from .helpers import make_room, make_user, token_for
+
+UNIX_LAYER = {"default": {"BACKEND": "game.channel_layers.UnixSocketChannelLayer", "CONFIG": {"path": "/tmp/x.sock"}}}
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+FILE_CACHE = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp/x"}}
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.alice)}")
+
+    def get(self, url, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_room_list_304_until_a_room_changes(self):
+        first = self.get("/api/rooms/")
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get("/api/rooms/", etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post("/api/rooms/", {"bet_amount": 50}).status_code, 201)
+
+        changed = self.get("/api/rooms/", etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(len(changed.json()["results"]), 1)
+
+    def test_transactions_304_until_the_ledger_changes(self):
+        etag = self.get("/api/transactions/")["ETag"]
+        self.assertEqual(self.get("/api/transactions/", etag).status_code, 304)
+
+        bob = make_user("bob")
+        room = make_room(self.alice, bob, bet=50)
+        with self.captureOnCommitCallbacks(execute=True):
+            lock_bets(room, [self.alice.id, bob.id], 50)
+
+        changed = self.get("/api/transactions/", etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()["results"]), 1)
+
+    def test_leaderboard_304_for_unchanged_etag(self):
+        etag = self.get("/api/leaderboard/")["ETag"]
+        self.assertEqual(self.get("/api/leaderboard/", etag).status_code, 304)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CHANNEL_LAYERS=UNIX_LAYER, CACHES=LOCMEM)
+    def test_cross_process_layer_with_local_cache_fails(self):
+        self.assertEqual([e.id for e in check_shared_cache()], ["game.E001"])
+
+    @override_settings(CHANNEL_LAYERS=UNIX_LAYER, CACHES=FILE_CACHE)
+    def test_cross_process_layer_with_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(), [])
+
+    def test_in_memory_layer_allows_local_cache(self):
+        self.assertEqual(check_shared_cache(), [])
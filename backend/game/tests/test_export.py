@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+
+from game import transactions
+
+from .helpers import make_room, make_user, token_for
+from .test_transactions import add_txn, archive
+
+
+class TransactionExportTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        room = make_room(self.alice, self.bob, bet=50)
+        self.txns = [
+            add_txn(self.alice, "bet_lock", -50, room, days_ago=3),
+            add_txn(self.alice, "payout", 100, room, days_ago=2),
+            add_txn(self.alice, "adjust", 5),
+        ]
+        self.ids = [t.id for t in self.txns]
+        add_txn(self.bob, "bet_lock", -50, room)
+        self.headers = {"Authorization": f"Token {token_for(self.alice)}"}
+
+    async def get(self, path, params=None, headers=None):
+        return await AsyncClient().get(path, params or {}, headers=headers or self.headers)
+
+    async def export(self, fmt, headers=None, **params):
+        response = await self.get(f"/api/transactions/export.{fmt}", params, headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        return "".join([chunk.decode() async for chunk in response.streaming_content])
+
+    async def test_csv_has_header_and_rows_oldest_first(self):
+        rows = list(csv.DictReader(io.StringIO(await self.export("csv"))))
+
+        self.assertEqual(list(rows[0]), list(transactions.TRANSACTION_EXPORT_COLUMNS))
+        self.assertEqual([int(r["id"]) for r in rows], self.ids)
+        self.assertEqual((rows[1]["type"], rows[1]["net_change"], rows[1]["room_bet_amount"]), ("payout", "50", "50"))
+
+    async def test_ndjson_rows(self):
+        lines = (await self.export("ndjson")).splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r["id"] for r in rows], self.ids)
+        self.assertEqual(rows[2]["amount"], 5)
+
+    async def test_filters_match_the_list_endpoint(self):
+        today = timezone.localdate().isoformat()
+        rows = [json.loads(line) for line in (await self.export("ndjson", date_to=today)).splitlines()]
+        self.assertEqual([r["id"] for r in rows], self.ids)
+
+        rows = [json.loads(line) for line in (await self.export("ndjson", date_from=today)).splitlines()]
+        self.assertEqual([r["id"] for r in rows], self.ids[2:])
+
+        rows = [json.loads(line) for line in (await self.export("ndjson", type="payout")).splitlines()]
+        self.assertEqual([r["id"] for r in rows], [self.ids[1]])
+
+    async def test_archived_rows_are_merged_in_id_order(self):
+        await sync_to_async(archive)(self.txns[0])
+        await sync_to_async(archive)(self.txns[1])
+
+        with mock.patch.object(transactions, "TRANSACTION_EXPORT_CHUNK_SIZE", 2):
+            rows = [json.loads(line) for line in (await self.export("ndjson")).splitlines()]
+        self.assertEqual([r["id"] for r in rows], self.ids)
+        self.assertEqual(rows[0]["room_bet_amount"], 50)
+
+    async def test_other_users_export_needs_staff(self):
+        response = await self.get("/api/transactions/export.csv", {"user": self.bob.id})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual((await self.get("/api/transactions/export.xml")).status_code, 404)
+
+        staff = await sync_to_async(make_user)("staff")
+        staff.is_staff = True
+        await staff.asave()
+        headers = {"Authorization": f"Token {await sync_to_async(token_for)(staff)}"}
+        rows = (await self.export("ndjson", headers=headers, user=self.bob.id)).splitlines()
+        self.assertEqual(len(rows), 1)
+
+    def test_wsgi_streams_a_sync_iterator(self):
+        response = self.client.get("/api/transactions/export.ndjson", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([r["id"] for r in rows], self.ids)
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from game.leaderboard import Leaderboard
+
+from .helpers import make_user
+
+User = get_user_model()
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.users = [make_user(f"user{i}", balance=1000 + 10 * i) for i in range(6)]
+        self.board = Leaderboard()
+
+    def test_top_and_rank_follow_balance_order(self):
+        top = self.board.top(3)
+        self.assertEqual([e["username"] for e in top], ["user5", "user4", "user3"])
+        self.assertEqual([e["rank"] for e in top], [1, 2, 3])
+        self.assertEqual(self.board.rank(self.users[0].id), 6)
+
+    def test_update_repositions_without_reload(self):
+        self.board.top(1)
+        with self.assertNumQueries(0):
+            self.board.update(self.users[0].id, 5000)
+            self.board.update(self.users[5].id, 1)
+            self.assertEqual(self.board.rank(self.users[0].id), 1)
+            self.assertEqual(self.board.rank(self.users[5].id), 6)
+            self.assertEqual(len(self.board.top(100)), 6)
+
+    def test_around_returns_neighbors_with_ranks(self):
+        around = self.board.around(self.users[2].id, radius=1)
+        self.assertEqual([(e["rank"], e["username"]) for e in around], [(3, "user3"), (4, "user2"), (5, "user1")])
+
+    def test_equal_balances_are_ordered_by_id(self):
+        self.board.top(1)
+        self.board.update(self.users[1].id, 2000)
+        self.board.update(self.users[3].id, 2000)
+        self.assertEqual([e["id"] for e in self.board.top(2)], [self.users[1].id, self.users[3].id])
+
+
+@override_settings(LEADERBOARD_REFRESH_SECONDS=60)
+class LeaderboardRefreshTests(TransactionTestCase):
+    """Başka process'in bakiye değişikliği: en geç LEADERBOARD_REFRESH_SECONDS sonra, arka planda."""
+
+    def setUp(self):
+        self.alice = make_user("alice", balance=1000)
+        self.bob = make_user("bob", balance=900)
+        self.board = Leaderboard()
+        self.board.top(2)
+
+    def _age(self, seconds: float):
+        self.board._next_refresh -= seconds
+
+    def test_out_of_band_change_is_stale_until_refresh_interval(self):
+        User.objects.filter(id=self.bob.id).update(balance=5000)
+
+        self._age(59)
+        self.assertEqual(self.board.top(1)[0]["username"], "alice")
+        self.assertIsNone(self.board._refresher)
+
+    def test_refresh_runs_off_the_request_thread(self):
+        User.objects.filter(id=self.bob.id).update(balance=5000)
+        self._age(61)
+
+        # süresi dolmuş istek beklemez: eski sıralamayı döner, yüklemeyi arka planda başlatır
+        with self.assertNumQueries(0):
+            self.assertEqual(self.board.top(1)[0]["username"], "alice")
+        self.board._refresher.join(timeout=5)
+
+        self.assertEqual(self.board.top(1)[0]["username"], "bob")
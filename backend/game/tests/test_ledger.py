@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from game import ledger
+from game.models import AccountTransaction
+
+from .helpers import make_room, make_user
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice", balance=100)
+        self.bob = make_user("bob", balance=30)
+        self.room = make_room(self.alice, self.bob, bet=30)
+
+    def balance(self, user):
+        user.refresh_from_db(fields=["balance"])
+        return user.balance
+
+    def rows(self, type_):
+        return sorted(
+            AccountTransaction.objects.filter(room=self.room, type=type_).values_list("user_id", "amount", "balance_after")
+        )
+
+    def test_lock_payout_refund_balances(self):
+        ids = [self.alice.id, self.bob.id]
+        self.assertEqual(ledger.lock_bets(self.room, ids, 30), {self.alice.id: 70, self.bob.id: 0})
+        self.assertEqual(self.rows("bet_lock"), [(self.alice.id, -30, 70), (self.bob.id, -30, 0)])
+
+        self.assertEqual(ledger.payout(self.room, self.bob.id, 60), 60)
+        self.assertEqual(self.rows("payout"), [(self.bob.id, 60, 60)])
+
+        self.assertEqual(ledger.refund(self.room, ids, 30), {self.alice.id: 100, self.bob.id: 90})
+        self.assertEqual(self.rows("refund"), [(self.alice.id, 30, 100), (self.bob.id, 30, 90)])
+        self.assertEqual((self.balance(self.alice), self.balance(self.bob)), (100, 90))
+
+    def test_insufficient_balance_debits_nobody(self):
+        with self.assertRaises(ledger.InsufficientBalance) as raised:
+            ledger.lock_bets(self.room, [self.alice.id, self.bob.id], 50)
+
+        self.assertEqual(raised.exception.user_ids, [self.bob.id])
+        self.assertEqual((self.balance(self.alice), self.balance(self.bob)), (100, 30))
+        self.assertFalse(AccountTransaction.objects.exists())
+
+    def test_commit_updates_leaderboard(self):
+        with mock.patch.object(ledger.leaderboard, "update") as update, self.captureOnCommitCallbacks(execute=True):
+            ledger.payout(self.room, self.alice.id, 10)
+        update.assert_called_once_with(self.alice.id, 110)
+
+
+class LedgerWithoutReturningTests(LedgerTests):
+    """RETURNING olmayan veritabanlarındaki UPDATE + SELECT yolu."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(ledger, "_supports_update_returning", return_value=False)
+        self.fallback = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.assertTrue(self.fallback.called)
+        super().tearDown()
@@ -0,0 +1,132 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from game import views
+from game.leaderboard import Leaderboard
+from game.models import Room
+from game.rooms import expire_stale_rooms
+
+from .helpers import add_txn, make_room, make_user, token_for, ws_application
+
+
+class LobbyFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+
+    async def open_feed(self):
+        token = await sync_to_async(token_for)(self.bob)
+        communicator = WebsocketCommunicator(ws_application(), f"/ws/lobby/?token={token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        snapshot = await communicator.receive_json_from()
+        self.assertEqual(snapshot["type"], "LOBBY_SNAPSHOT")
+        return communicator, snapshot["payload"]["rooms"]
+
+    async def next_event(self, communicator):
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["type"], "LOBBY_EVENT")
+        return message["payload"]["event"], message["payload"]["room"]
+
+    def api(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(user)}")
+        return client
+
+    def create_room(self):
+        return self.api(self.alice).post("/api/rooms/", {"bet_amount": 30}).json()["id"]
+
+    def join(self, room_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api(self.bob).post(f"/api/rooms/{room_id}/join/").status_code, 200)
+
+    async def test_created_and_filled_deltas(self):
+        feed, rooms = await self.open_feed()
+        self.assertEqual(rooms, [])
+
+        room_id = await sync_to_async(self.create_room)()
+        event, row = await self.next_event(feed)
+        self.assertEqual((event, row["id"], row["status"], row["player_count"]), ("ROOM_CREATED", room_id, "open", 1))
+
+        await sync_to_async(self.join)(room_id)
+        event, row = await self.next_event(feed)
+        self.assertEqual((event, row["id"], row["status"], row["player2_id"]), ("ROOM_FILLED", room_id, "full", self.bob.id))
+        await feed.disconnect()
+
+    async def test_expired_rooms_are_pushed(self):
+        room = await sync_to_async(make_room)(self.alice, bet=30)
+        await Room.objects.filter(id=room.id).aupdate(created_at=timezone.now() - timedelta(days=1))
+        feed, _ = await self.open_feed()
+
+        self.assertEqual(await sync_to_async(expire_stale_rooms)(), 1)
+        event, row = await self.next_event(feed)
+        self.assertEqual((event, row["id"], row["status"]), ("ROOM_EXPIRED", room.id, "expired"))
+        await feed.disconnect()
+
+    async def test_snapshot_lists_open_rooms(self):
+        room = await sync_to_async(make_room)(self.alice, bet=30)
+        await sync_to_async(make_room)(self.alice, self.bob, bet=40, status=Room.Status.FINISHED)
+        feed, rooms = await self.open_feed()
+        self.assertEqual([r["id"] for r in rooms], [room.id])
+        self.assertEqual(rooms[0]["status"], "open")
+        await feed.disconnect()
+
+    async def test_feed_is_read_only(self):
+        feed, _ = await self.open_feed()
+        await feed.send_json_to({"type": "PING"})
+        message = await feed.receive_json_from()
+        self.assertEqual(message, {"type": "ERROR", "payload": {"detail": "Lobby feed is read-only"}})
+        await feed.disconnect()
+
+    async def test_anonymous_is_rejected(self):
+        communicator = WebsocketCommunicator(ws_application(), "/ws/lobby/")
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+
+class LobbyBootstrapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice", balance=500)
+        self.bob = make_user("bob", balance=900)
+        self.room = make_room(self.alice, bet=30)
+        self.txn = add_txn(self.alice, "adjust", 5)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.alice)}")
+
+        patcher = mock.patch.object(views, "leaderboard", Leaderboard())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sections_match_their_endpoints(self):
+        data = self.client.get("/api/lobby/bootstrap/").json()
+
+        self.assertEqual(list(data), ["me", "rooms", "leaderboard", "transactions"])
+        self.assertEqual(data["me"], self.client.get("/api/me/").json())
+        self.assertEqual(data["rooms"], self.client.get("/api/rooms/").json())
+        self.assertEqual(data["rooms"]["results"][0]["id"], self.room.id)
+        self.assertEqual([r["username"] for r in data["leaderboard"]], ["bob", "alice"])
+        self.assertEqual(data["leaderboard"], self.client.get("/api/leaderboard/").json())
+        self.assertEqual(data["transactions"], self.client.get("/api/transactions/").json())
+        self.assertEqual(data["transactions"]["results"][0]["id"], self.txn.id)
+
+    def test_three_queries_when_caches_are_warm(self):
+        self.client.get("/api/lobby/bootstrap/")
+        # token ve rooms / leaderboard cache'ten: me bakiyesi + canlı ve arşiv hesap hareketleri
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get("/api/lobby/bootstrap/").status_code, 200)
+
+    def test_include_subset_and_invalid(self):
+        data = self.client.get("/api/lobby/bootstrap/", {"include": "me,leaderboard"}).json()
+        self.assertEqual(list(data), ["me", "leaderboard"])
+        self.assertEqual(self.client.get("/api/lobby/bootstrap/", {"include": "me,nope"}).status_code, 400)
+        self.assertEqual(APIClient().get("/api/lobby/bootstrap/").status_code, 401)
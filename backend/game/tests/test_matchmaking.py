@@ -0,0 +1,115 @@
+import asyncio
+from datetime import timedelta
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from game.matchmaking import join_queue, matchmaking_queue
+from game.models import MatchmakingTicket, Room
+
+from .helpers import make_user, receive_until, token_for, ws_application
+
+
+class MatchmakingQueueTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+
+    def test_same_bet_pairs_into_locked_room(self):
+        self.assertEqual(join_queue(self.alice, 50), {"status": "queued", "bet_amount": 50, "position": 1})
+        result = join_queue(self.bob, 50)
+
+        room = Room.objects.get(id=result["room_id"])
+        self.assertEqual(room.status, Room.Status.FULL)
+        self.assertTrue(room.is_locked)
+        self.assertEqual({room.player1_id, room.player2_id}, {self.alice.id, self.bob.id})
+        self.assertEqual(matchmaking_queue.status(self.alice.id), {"status": "matched", "room_id": room.id})
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.balance, 950)
+
+    def test_different_bets_do_not_pair(self):
+        join_queue(self.alice, 50)
+        self.assertEqual(join_queue(self.bob, 60)["status"], "queued")
+        self.assertFalse(Room.objects.exists())
+
+    def test_dequeue_returns_to_idle(self):
+        join_queue(self.alice, 50)
+        self.assertTrue(matchmaking_queue.dequeue(self.alice.id))
+        self.assertFalse(matchmaking_queue.dequeue(self.alice.id))
+        self.assertEqual(matchmaking_queue.status(self.alice.id), {"status": "idle"})
+        self.assertEqual(join_queue(self.bob, 50)["status"], "queued")
+
+    def test_stale_entry_is_skipped_and_purged(self):
+        join_queue(self.alice, 50)
+        MatchmakingTicket.objects.filter(user=self.alice).update(
+            last_seen=timezone.now() - timedelta(seconds=matchmaking_queue.ttl + 1)
+        )
+
+        self.assertEqual(join_queue(self.bob, 50)["status"], "queued")
+        self.assertEqual(matchmaking_queue.purge(), 1)
+        self.assertEqual(matchmaking_queue.status(self.alice.id), {"status": "idle"})
+
+    def test_touch_keeps_entry_alive(self):
+        join_queue(self.alice, 50)
+        MatchmakingTicket.objects.filter(user=self.alice).update(
+            last_seen=timezone.now() - timedelta(seconds=matchmaking_queue.ttl + 1)
+        )
+        self.assertTrue(matchmaking_queue.touch(self.alice.id))
+
+        self.assertEqual(join_queue(self.bob, 50)["status"], "matched")
+
+    def test_opponent_without_balance_is_dropped(self):
+        join_queue(self.alice, 50)
+        type(self.alice).objects.filter(id=self.alice.id).update(balance=10)
+
+        self.assertEqual(join_queue(self.bob, 50)["status"], "queued")
+        self.assertFalse(Room.objects.exists())
+        self.assertEqual(matchmaking_queue.status(self.alice.id), {"status": "idle"})
+
+    def test_claimed_opponent_is_not_paired_twice(self):
+        carol = make_user("carol")
+        join_queue(self.alice, 50)
+        self.assertEqual(matchmaking_queue.enqueue(self.bob.id, self.bob.username, 50), (self.alice.id, "alice"))
+        # alice'i başka bir worker sahiplendi; carol sıraya girer
+        self.assertIsNone(matchmaking_queue.enqueue(carol.id, carol.username, 50))
+
+
+@override_settings(MATCHMAKING_QUEUE_TTL=1.5)
+class MatchmakingSocketTests(TransactionTestCase):
+    """ws/matchmaking/: db_write thread'leri yüzünden TransactionTestCase."""
+
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.token = token_for(self.alice)
+
+    async def test_open_socket_keeps_entry_past_ttl(self):
+        communicator = WebsocketCommunicator(ws_application(), f"/ws/matchmaking/?token={self.token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())["payload"], {"status": "idle"})
+
+        await communicator.send_json_to({"type": "ENQUEUE", "payload": {"bet_amount": 50}})
+        queued = await communicator.receive_json_from()
+        self.assertEqual(queued["payload"]["status"], "queued")
+
+        # TTL'den uzun bekle; kaydı yalnızca heartbeat canlı tutuyor
+        await asyncio.sleep(2.25)
+        result = await database_sync_to_async(join_queue)(self.bob, 50)
+        self.assertEqual(result["status"], "matched")
+
+        found = await receive_until(communicator, lambda m: m["type"] == "MATCH_FOUND")
+        self.assertEqual(found["payload"]["room_id"], result["room_id"])
+        await communicator.disconnect()
+
+    async def test_disconnect_leaves_queue(self):
+        communicator = WebsocketCommunicator(ws_application(), f"/ws/matchmaking/?token={self.token}")
+        await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.send_json_to({"type": "ENQUEUE", "payload": {"bet_amount": 50}})
+        await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertFalse(await MatchmakingTicket.objects.filter(user_id=self.alice.id).aexists())
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from game import metrics
+from game.metrics import Registry
+
+from .helpers import make_user, token_for
+
+
+class RegistryRenderTests(SimpleTestCase):
+    def test_histogram_exposition(self):
+        registry = Registry()
+        labels = {"kind": "http", "endpoint": "GET /x"}
+        for value in (0, 2, 2, 40, 500):
+            registry.observe("app_handler_db_queries", labels, value)
+
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:2], [
+            "# HELP app_handler_db_queries DB queries per endpoint / message type",
+            "# TYPE app_handler_db_queries histogram",
+        ])
+        buckets = dict(line.rsplit(" ", 1) for line in lines if "_bucket" in line)
+        prefix = 'app_handler_db_queries_bucket{endpoint="GET /x",kind="http",le='
+        self.assertEqual(buckets[prefix + '"0"}'], "1")
+        self.assertEqual(buckets[prefix + '"2"}'], "3")
+        self.assertEqual(buckets[prefix + '"50"}'], "4")
+        self.assertEqual(buckets[prefix + '"100"}'], "4")
+        self.assertEqual(buckets[prefix + '"+Inf"}'], "5")
+        self.assertIn('app_handler_db_queries_sum{endpoint="GET /x",kind="http"} 544.0', lines)
+        self.assertIn('app_handler_db_queries_count{endpoint="GET /x",kind="http"} 5', lines)
+
+    def test_counter_exposition(self):
+        registry = Registry()
+        registry.inc("app_ws_throttled_total", {"consumer": "RoomConsumer"}, help_text="Throttled frames")
+        registry.inc("app_ws_throttled_total", {"consumer": "RoomConsumer"}, value=2)
+        registry.inc("app_ws_throttled_total", {"consumer": "LobbyConsumer"})
+
+        self.assertEqual(registry.render().splitlines(), [
+            "# HELP app_ws_throttled_total Throttled frames",
+            "# TYPE app_ws_throttled_total counter",
+            'app_ws_throttled_total{consumer="LobbyConsumer"} 1',
+            'app_ws_throttled_total{consumer="RoomConsumer"} 3',
+        ])
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        self.headers = {"Authorization": f"Token {token_for(make_user('alice'))}"}
+        patcher = mock.patch.object(metrics, "registry", Registry())
+        self.registry = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def histogram(self, name, endpoint):
+        return self.registry._histograms.get((name, (("endpoint", endpoint), ("kind", "http"))))
+
+    def test_request_is_recorded_by_route(self):
+        with CaptureQueriesContext(connection) as executed:
+            response = self.client.get("/api/me/", headers=self.headers)
+
+        endpoint = "GET /api/me/"
+        self.assertEqual(self.histogram("app_handler_duration_seconds", endpoint).count, 1)
+        queries = self.histogram("app_handler_db_queries", endpoint)
+        self.assertEqual((queries.count, queries.sum), (1, len(executed)))
+        self.assertEqual(self.histogram("app_handler_payload_bytes", endpoint).sum, len(response.content))
+
+    def test_unresolved_path(self):
+        self.client.get("/no-such-page/")
+        self.assertEqual(self.histogram("app_handler_duration_seconds", "unmatched").count, 1)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.client.get("/api/me/", headers=self.headers)
+        self.assertEqual(self.registry._histograms, {})
+
+    def test_metrics_view(self):
+        self.client.get("/api/me/", headers=self.headers)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('app_handler_db_queries_count{endpoint="GET /api/me/",kind="http"} 1', body)
+        self.assertIn("auth_token_cache_hits_total ", body)
+
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.0.0.5").status_code, 403)
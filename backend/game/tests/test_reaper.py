@@ -0,0 +1,130 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.utils import timezone
+
+from game import rooms
+from game.models import Room
+from game.reaper import forfeit_turn
+from game.room_state import LiveRoom, room_store
+from game.rooms import expire_stale_rooms, refund_abandoned_rooms
+from game.turn_journal import turn_journal
+
+from .helpers import RoomSocketTestCase, make_room, make_started_room, make_user
+
+
+def live_copy(room, current_turn, turn_count) -> LiveRoom:
+    return room_store.put(
+        LiveRoom(
+            room_id=room.id,
+            bet_amount=room.bet_amount,
+            player1_id=room.player1_id,
+            player2_id=room.player2_id,
+            player1_username="alice",
+            player2_username="bob",
+            secret_number=room.secret_number,
+            current_turn_id=current_turn.id,
+            turn_count=turn_count,
+        )
+    )
+
+
+class ForfeitTurnTests(RoomSocketTestCase):
+    async def started_room(self, **fields):
+        return await sync_to_async(make_started_room)(self.alice, self.bob, **fields)
+
+    async def test_timeout_gives_game_to_opponent(self):
+        room = await self.started_room(turn=self.alice, turn_count=2)
+        live_copy(room, self.alice, 2)
+
+        await forfeit_turn(room.id, 2)
+
+        room = await Room.objects.aget(id=room.id)
+        self.assertEqual(room.status, Room.Status.FINISHED)
+        self.assertEqual(room.winner_id, self.bob.id)
+        self.assertIsNone(room_store.get(room.id))
+        await self.bob.arefresh_from_db()
+        self.assertEqual(self.bob.balance, 1100)
+
+    async def test_stale_copy_does_not_forfeit(self):
+        # oyun başka worker'da ilerlemiş: DB'de sıra bob'da, bu process'in kopyası eski
+        room = await self.started_room(turn=self.bob, turn_count=3)
+        live_copy(room, self.alice, 2)
+
+        await forfeit_turn(room.id, 2)
+
+        room = await Room.objects.aget(id=room.id)
+        self.assertEqual(room.status, Room.Status.FULL)
+        self.assertIsNone(room.winner_id)
+        self.assertIsNone(room_store.get(room.id))
+
+    async def test_own_pending_move_is_written_before_comparing(self):
+        room = await self.started_room(turn=self.alice, turn_count=2)
+        live_copy(room, self.bob, 3)
+        await sync_to_async(turn_journal.record)(room.id, self.bob.id, 3)
+
+        await forfeit_turn(room.id, 3)
+
+        room = await Room.objects.aget(id=room.id)
+        self.assertEqual(room.status, Room.Status.FINISHED)
+        self.assertEqual(room.winner_id, self.alice.id)
+        self.assertEqual(room.turn_count, 3)
+
+    async def test_last_local_socket_evicts_live_copy(self):
+        room = await self.started_room(turn=self.alice)
+        alice = await self.open_socket(self.alice, room)
+        await alice.receive_json_from()
+        bob = await self.open_socket(self.bob, room)
+        await bob.receive_json_from()
+        self.assertIsNotNone(room_store.get(room.id))
+
+        await alice.disconnect()
+        self.assertIsNotNone(room_store.get(room.id))
+        await bob.disconnect()
+        self.assertIsNone(room_store.get(room.id))
+
+
+class ExpireStaleRoomsTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+
+    def test_notifies_only_rooms_it_expired(self):
+        stale = make_room(self.alice, bet=30)
+        joined = make_room(self.alice, bet=40)
+        Room.objects.update(created_at=timezone.now() - timedelta(days=1))
+
+        real_values_row = rooms.values_row
+
+        def join_after_read(values):
+            # satırlar okunduktan sonra, UPDATE'ten önce biri odaya katılır
+            Room.objects.filter(id=joined.id).update(player2=self.bob, status=Room.Status.FULL, is_locked=True)
+            return real_values_row(values)
+
+        with mock.patch.object(rooms, "values_row", join_after_read), mock.patch.object(
+            rooms, "notify_lobby_rows"
+        ) as notify:
+            self.assertEqual(expire_stale_rooms(), 1)
+
+        notified = notify.call_args.args[1]
+        self.assertEqual([row["id"] for row in notified], [stale.id])
+        self.assertEqual(Room.objects.get(id=joined.id).status, Room.Status.FULL)
+
+
+class RefundAbandonedRoomsTests(TestCase):
+    def tearDown(self):
+        turn_journal.flush_sync()
+
+    def test_late_journal_entry_does_not_rewind_turn(self):
+        alice, bob = make_user("alice"), make_user("bob")
+        room = make_started_room(alice, bob, turn=bob, turn_count=5)
+        Room.objects.filter(id=room.id).update(last_move_at=timezone.now() - timedelta(days=1))
+        turn_journal.record(room.id, alice.id, 3)
+
+        self.assertEqual(refund_abandoned_rooms(), 1)
+
+        room.refresh_from_db()
+        self.assertEqual(room.status, Room.Status.EXPIRED)
+        self.assertEqual(room.turn_count, 5)
@@ -0,0 +1,46 @@
+from asgiref.sync import sync_to_async
+
+from .helpers import RoomSocketTestCase, game_event, make_started_room, receive_until
+
+
+class ResumeTests(RoomSocketTestCase):
+    async def join_alice(self):
+        self.room = await sync_to_async(make_started_room)(self.alice, self.bob, secret=42, turn=self.alice)
+        self.alice_ws = await self.open_socket(self.alice, self.room)
+        await receive_until(self.alice_ws, lambda m: m["type"] == "SNAPSHOT")
+
+    async def miss_a_guess(self):
+        """bob ayrıldıktan sonra alice yanlış tahmin eder (seq 2)."""
+        await self.join_alice()
+        bob = await self.open_socket(self.bob, self.room)
+        await receive_until(bob, lambda m: m["type"] == "SNAPSHOT")
+        await bob.disconnect()
+
+        await self.alice_ws.send_json_to({"type": "GUESS", "payload": {"value": 10}})
+        await receive_until(self.alice_ws, game_event("GUESS"))
+
+    async def test_since_replays_missed_events(self):
+        await self.miss_a_guess()
+
+        bob = await self.open_socket(self.bob, self.room, query="since=1")
+        resumed = await bob.receive_json_from()
+        self.assertEqual(resumed["type"], "RESUMED")
+        self.assertEqual(resumed["payload"]["count"], 1)
+
+        guess = await bob.receive_json_from()
+        self.assertEqual(guess["payload"]["event"], "GUESS")
+        self.assertEqual(guess["payload"]["seq"], 2)
+        self.assertEqual(guess["payload"]["result"], "higher")
+        await bob.disconnect()
+        await self.alice_ws.disconnect()
+
+    async def test_unknown_since_falls_back_to_snapshot(self):
+        await self.miss_a_guess()
+
+        bob = await self.open_socket(self.bob, self.room, query="since=9")
+        snapshot = await bob.receive_json_from()
+        self.assertEqual(snapshot["type"], "SNAPSHOT")
+        self.assertEqual(snapshot["payload"]["turn_count"], 1)
+        self.assertEqual(snapshot["payload"]["seq"], 2)
+        await bob.disconnect()
+        await self.alice_ws.disconnect()
@@ -0,0 +1,83 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from game.models import Room
+from game.room_list import aroom_page, fetch_room_page, invalidate_room_list, room_page
+
+from .helpers import make_room, make_user, token_for
+
+
+class RoomPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.rooms = [make_room(self.alice, bet=10 * (i + 1)) for i in range(5)]
+        self.finished = make_room(self.alice, self.bob, status=Room.Status.FINISHED, winner=self.bob)
+
+    def test_keyset_pages_newest_first(self):
+        expected = [self.finished.id] + [r.id for r in reversed(self.rooms)]
+        seen, cursor = [], None
+        while True:
+            rows, cursor = fetch_room_page(cursor=cursor, limit=2)
+            seen += [r["id"] for r in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_status_filter_and_row_shape(self):
+        rows, cursor = fetch_room_page(status=Room.Status.OPEN, limit=10)
+        self.assertEqual([r["id"] for r in rows], [r.id for r in reversed(self.rooms)])
+        self.assertIsNone(cursor)
+        self.assertEqual(
+            {k: v for k, v in rows[0].items() if k != "created_at"},
+            {"id": self.rooms[-1].id, "bet_amount": 50, "status": "open",
+             "player1_id": self.alice.id, "player2_id": None, "player_count": 1},
+        )
+
+    def test_first_page_is_cached_until_invalidated(self):
+        first = room_page(limit=3)
+        make_room(self.bob, bet=70)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(room_page(limit=3), first)
+        # async yol aynı cache key'ini kullanır
+        self.assertEqual(async_to_sync(aroom_page)(limit=3), first)
+
+        invalidate_room_list()
+        rows, _ = room_page(limit=3)
+        self.assertEqual(rows[0]["bet_amount"], 70)
+
+    def test_cursor_pages_are_not_cached(self):
+        room_page(cursor=self.rooms[-1].id, limit=2)
+        with self.assertNumQueries(2):
+            room_page(cursor=self.rooms[-1].id, limit=2)
+
+
+class RoomListViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice")
+        self.rooms = [make_room(self.alice, bet=10) for _ in range(3)]
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.alice)}")
+
+    def test_cursor_and_limit(self):
+        page = self.client.get("/api/rooms/", {"limit": 2}).json()
+        self.assertEqual([r["id"] for r in page["results"]], [self.rooms[2].id, self.rooms[1].id])
+        self.assertEqual(page["next_cursor"], self.rooms[1].id)
+
+        page = self.client.get("/api/rooms/", {"limit": 2, "cursor": page["next_cursor"]}).json()
+        self.assertEqual([r["id"] for r in page["results"]], [self.rooms[0].id])
+        self.assertIsNone(page["next_cursor"])
+
+    def test_created_room_shows_up_immediately(self):
+        self.client.get("/api/rooms/")
+        created = self.client.post("/api/rooms/", {"bet_amount": 20}).json()
+        self.assertEqual(self.client.get("/api/rooms/").json()["results"][0]["id"], created["id"])
+
+    def test_invalid_params(self):
+        for params in ({"status": "nope"}, {"cursor": "x"}, {"limit": "many"}):
+            self.assertEqual(self.client.get("/api/rooms/", params).status_code, 400, params)
@@ -0,0 +1,128 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from game.ledger import InsufficientBalance
+from game.metrics import registry
+from game.models import AccountTransaction, Room
+from game.rooms import FULL, LOCKED, OPEN, JoinRejected, join_room, room_state, start_game
+
+from .helpers import make_room, make_user, token_for
+
+
+def join_attempts(result: str) -> float:
+    return registry._counters.get(("app_room_join_attempts_total", (("result", result),)), 0)
+
+
+class StartGameTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+
+    def test_full_room_starts_once_and_locks_bets(self):
+        room = make_room(self.alice, self.bob, bet=50)
+
+        self.assertTrue(start_game(room.id))
+        self.assertFalse(start_game(room.id))
+
+        room.refresh_from_db()
+        self.assertEqual(room_state(room.status, room.is_locked), LOCKED)
+        self.assertIn(room.current_turn_id, (self.alice.id, self.bob.id))
+        self.assertTrue(1 <= room.secret_number <= 100)
+        self.assertIsNotNone(room.started_at)
+        self.assertEqual(AccountTransaction.objects.filter(room=room, type="bet_lock").count(), 2)
+        self.bob.refresh_from_db()
+        self.assertEqual(self.bob.balance, 950)
+
+    def test_open_room_does_not_start(self):
+        room = make_room(self.alice, bet=50)
+
+        self.assertFalse(start_game(room.id))
+        room.refresh_from_db()
+        self.assertEqual(room_state(room.status, room.is_locked), OPEN)
+
+    def test_preset_secret_is_kept(self):
+        room = make_room(self.alice, self.bob, bet=50, secret_number=7)
+        start_game(room.id)
+        room.refresh_from_db()
+        self.assertEqual(room.secret_number, 7)
+
+    def test_insufficient_balance_leaves_room_full(self):
+        poor = make_user("poor", balance=10)
+        room = make_room(self.alice, poor, bet=50)
+
+        with self.assertRaises(InsufficientBalance) as ctx:
+            start_game(room.id)
+
+        self.assertEqual(ctx.exception.user_ids, [poor.id])
+        room.refresh_from_db()
+        self.assertEqual(room_state(room.status, room.is_locked), FULL)
+        self.assertIsNone(room.started_at)
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.balance, 1000)
+        self.assertFalse(AccountTransaction.objects.filter(room=room).exists())
+
+    def test_room_page_starts_game_for_participant(self):
+        room = make_room(self.alice, self.bob, bet=50)
+        self.client.force_login(self.alice)
+
+        self.assertEqual(self.client.get(f"/play/{room.id}/").status_code, 200)
+        room.refresh_from_db()
+        self.assertEqual(room_state(room.status, room.is_locked), LOCKED)
+
+
+class JoinRoomTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.room = make_room(self.alice, bet=50)
+
+    def assertRejected(self, user, reason):
+        with self.assertRaises(JoinRejected) as ctx:
+            join_room(self.room.id, user)
+        self.assertEqual(ctx.exception.reason, reason)
+
+    def test_join_fills_and_starts_the_room(self):
+        room = join_room(self.room.id, self.bob)
+
+        self.assertEqual(room.player2_id, self.bob.id)
+        self.assertEqual(room_state(room.status, room.is_locked), LOCKED)
+
+    def test_own_room_is_rejected(self):
+        self.assertRejected(self.alice, "own_room")
+
+    def test_poor_joiner_is_rejected_without_writing(self):
+        poor = make_user("poor", balance=10)
+
+        with self.assertRaises(InsufficientBalance):
+            join_room(self.room.id, poor)
+
+        self.room.refresh_from_db()
+        self.assertEqual(room_state(self.room.status, self.room.is_locked), OPEN)
+        self.assertIsNone(self.room.player2_id)
+
+    def test_race_loser_gets_full_and_counts_conflict(self):
+        carol = make_user("carol")
+        conflicts = join_attempts("conflict")
+        join_room(self.room.id, self.bob)
+
+        self.assertRejected(carol, "full")
+        self.assertEqual(join_attempts("conflict"), conflicts + 1)
+        self.assertEqual(Room.objects.get(id=self.room.id).player2_id, self.bob.id)
+        carol.refresh_from_db()
+        self.assertEqual(carol.balance, 1000)
+
+    def test_finished_and_missing_rooms(self):
+        Room.objects.filter(id=self.room.id).update(status=Room.Status.FINISHED)
+        self.assertRejected(self.bob, "finished")
+        with self.assertRaises(JoinRejected) as ctx:
+            join_room(self.room.id + 1000, self.bob)
+        self.assertEqual(ctx.exception.reason, "not_found")
+
+    def test_join_endpoint_status_codes(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.alice)}")
+        self.assertEqual(client.post(f"/api/rooms/{self.room.id}/join/").status_code, 400)
+        self.assertEqual(client.post(f"/api/rooms/{self.room.id + 1000}/join/").status_code, 404)
+
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.bob)}")
+        self.assertEqual(client.post(f"/api/rooms/{self.room.id}/join/").status_code, 200)
@@ -0,0 +1,70 @@
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, override_settings
+
+from game.throttle import TokenBucket, user_buckets
+
+from .helpers import RoomSocketTestCase, game_event, make_started_room, receive_until
+
+SLOW_DOWN = "Too many messages, slow down"
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2, burst=3)
+        start = bucket.updated
+        self.assertEqual([bucket.take(start) for _ in range(4)], [True, True, True, False])
+        self.assertTrue(bucket.take(start + 0.5))
+        self.assertFalse(bucket.take(start + 0.5))
+
+
+class GuessThrottleTests(RoomSocketTestCase):
+    def setUp(self):
+        super().setUp()
+        user_buckets._buckets.clear()
+
+    def tearDown(self):
+        user_buckets._buckets.clear()
+        super().tearDown()
+
+    async def test_out_of_turn_guess_is_rejected(self):
+        room = await sync_to_async(make_started_room)(self.alice, self.bob, turn=self.alice)
+        communicator = await self.open_socket(self.bob, room)
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to({"type": "GUESS", "payload": {"value": 10}})
+        error = await receive_until(communicator, lambda m: m["type"] == "ERROR")
+        self.assertEqual(error["payload"]["detail"], "Not your turn")
+        await communicator.disconnect()
+
+    @override_settings(WS_GUESS_RATE=0.01, WS_GUESS_BURST=1, WS_GUESS_MAX_THROTTLED=3)
+    async def test_flood_is_closed_with_4429(self):
+        room = await sync_to_async(make_started_room)(self.alice, self.bob, turn=self.alice)
+        communicator = await self.open_socket(self.bob, room)
+        await communicator.receive_json_from()
+
+        for _ in range(4):
+            await communicator.send_json_to({"type": "GUESS", "payload": {"value": 10}})
+
+        warning = await receive_until(
+            communicator, lambda m: m["type"] == "ERROR" and m["payload"]["detail"] == SLOW_DOWN
+        )
+        self.assertEqual(warning["payload"]["detail"], SLOW_DOWN)
+        while True:
+            output = await communicator.receive_output(timeout=3)
+            if output["type"] == "websocket.close":
+                break
+        self.assertEqual(output["code"], 4429)
+
+    async def test_disconnect_right_after_winning_guess_still_broadcasts(self):
+        room = await sync_to_async(make_started_room)(self.alice, self.bob, secret=42, turn=self.alice)
+        alice = await self.open_socket(self.alice, room)
+        bob = await self.open_socket(self.bob, room)
+        await receive_until(alice, lambda m: m["type"] == "SNAPSHOT")
+        await receive_until(bob, lambda m: m["type"] == "SNAPSHOT")
+
+        await alice.send_json_to({"type": "GUESS", "payload": {"value": 42}})
+        await alice.disconnect()
+
+        over = await receive_until(bob, game_event("GAME_OVER"))
+        self.assertEqual(over["payload"]["winner"], "alice")
+        await bob.disconnect()
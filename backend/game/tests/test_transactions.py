@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from game.models import AccountTransaction, ArchivedTransaction
+from game.transactions import transaction_page
+
+from .helpers import add_txn, make_room, make_user, token_for
+
+
+def archive(txn):
+    """archive.py'nin yaptığı gibi: aynı id ile arşive taşı."""
+    ArchivedTransaction.objects.create(
+        id=txn.id,
+        user_id=txn.user_id,
+        room_id=txn.room_id,
+        room_bet_amount=txn.room.bet_amount if txn.room_id else None,
+        type=txn.type,
+        amount=txn.amount,
+        balance_after=txn.balance_after,
+        note=txn.note,
+        created_at=AccountTransaction.objects.get(id=txn.id).created_at,
+    )
+    txn.delete()
+
+
+class TransactionPageTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.room = make_room(self.alice, self.bob, bet=50)
+        self.txns = [add_txn(self.alice, "bet_lock", -50, self.room, days_ago=3 - i) for i in range(4)]
+        add_txn(self.bob, "bet_lock", -50, self.room)
+
+    def test_keyset_pages_newest_first(self):
+        rows, cursor = transaction_page(self.alice.id, limit=3)
+        self.assertEqual([r["id"] for r in rows], [t.id for t in reversed(self.txns)][:3])
+        self.assertEqual(cursor, rows[-1]["id"])
+
+        rows, cursor = transaction_page(self.alice.id, cursor=cursor, limit=3)
+        self.assertEqual([r["id"] for r in rows], [self.txns[0].id])
+        self.assertIsNone(cursor)
+
+    def test_pages_across_live_and_archived_rows(self):
+        expected = [t.id for t in reversed(self.txns)]
+        # en eski iki kayıt arşivde; sayfa sınırı canlı / arşiv arasına düşer
+        archive(self.txns[0])
+        archive(self.txns[1])
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = transaction_page(self.alice.id, cursor=cursor, limit=1 if not seen else 2)
+            seen += [r["id"] for r in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertTrue(all(r["room_bet_amount"] == 50 for r in transaction_page(self.alice.id)[0]))
+
+    def test_payout_net_change(self):
+        add_txn(self.alice, "payout", 100, self.room)
+        row = transaction_page(self.alice.id, limit=1)[0][0]
+        self.assertEqual((row["amount"], row["net_change"]), (100, 50))
+
+
+class TransactionListViewTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token_for(self.alice)}")
+        self.old = add_txn(self.alice, "adjust", 10, days_ago=5)
+        self.today = [add_txn(self.alice, "adjust", 1), add_txn(self.alice, "refund", 2)]
+
+    def ids(self, **params):
+        response = self.client.get("/api/transactions/", params)
+        self.assertEqual(response.status_code, 200)
+        return [r["id"] for r in response.json()["results"]]
+
+    def test_date_to_includes_the_whole_day(self):
+        today = timezone.localdate().isoformat()
+        expected = [t.id for t in reversed(self.today)]
+        self.assertEqual(self.ids(date_to=today), expected + [self.old.id])
+        self.assertEqual(self.ids(date_from=today, date_to=today), expected)
+
+    def test_date_from_excludes_older_days(self):
+        since = (timezone.localdate() - timedelta(days=1)).isoformat()
+        self.assertEqual(self.ids(date_from=since), [t.id for t in reversed(self.today)])
+
+    def test_date_to_before_today_excludes_today(self):
+        yesterday = (timezone.localdate() - timedelta(days=1)).isoformat()
+        self.assertEqual(self.ids(date_to=yesterday), [self.old.id])
+
+    def test_datetime_bounds_are_used_as_is(self):
+        moment = (timezone.now() - timedelta(days=1)).isoformat()
+        self.assertEqual(self.ids(date_to=moment), [self.old.id])
+
+    def test_type_filter_and_cursor(self):
+        self.assertEqual(self.ids(type="refund"), [self.today[1].id])
+        self.assertEqual(self.ids(cursor=self.today[1].id), [self.today[0].id, self.old.id])
+
+    def test_invalid_params(self):
+        for params in ({"type": "nope"}, {"date_to": "yesterday"}, {"date_from": "2026-13-40"}, {"cursor": "x"}):
+            self.assertEqual(self.client.get("/api/transactions/", params).status_code, 400, params)
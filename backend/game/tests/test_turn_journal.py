@@ -0,0 +1,46 @@
+from django.test import TestCase
+
+from game.models import Room
+from game.turn_journal import TurnJournal
+
+from .helpers import make_started_room, make_user
+
+
+class TurnJournalFlushTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.journal = TurnJournal()
+
+    def test_flush_writes_latest_turns_in_one_query(self):
+        room1 = make_started_room(self.alice, self.bob)
+        room2 = make_started_room(self.alice, self.bob)
+        self.journal.record(room1.id, self.bob.id, 1)
+        self.journal.record(room1.id, self.alice.id, 2)
+        self.journal.record(room2.id, self.bob.id, 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.journal.flush_sync(), 2)
+
+        room1.refresh_from_db()
+        room2.refresh_from_db()
+        self.assertEqual((room1.current_turn_id, room1.turn_count), (self.alice.id, 2))
+        self.assertEqual((room2.current_turn_id, room2.turn_count), (self.bob.id, 1))
+        self.assertIsNotNone(room1.last_move_at)
+
+    def test_late_flush_does_not_move_turn_backwards(self):
+        room = make_started_room(self.alice, self.bob, turn=self.bob, turn_count=5)
+        self.journal.record(room.id, self.alice.id, 3)
+        self.journal.flush_sync()
+
+        room.refresh_from_db()
+        self.assertEqual((room.current_turn_id, room.turn_count), (self.bob.id, 5))
+
+    def test_flush_skips_finished_rooms(self):
+        room = make_started_room(self.alice, self.bob, turn_count=2)
+        Room.objects.filter(id=room.id).update(status=Room.Status.FINISHED, winner=self.alice)
+        self.journal.record(room.id, self.bob.id, 3)
+        self.journal.flush_sync()
+
+        room.refresh_from_db()
+        self.assertEqual(room.turn_count, 2)
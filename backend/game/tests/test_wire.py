@@ -0,0 +1,90 @@
+from unittest import mock
+
+import msgpack
+from django.test import SimpleTestCase
+
+from game import wire
+
+from .helpers import RoomSocketTestCase, make_started_room, receive_until
+
+
+class WireEncodingTests(SimpleTestCase):
+    def test_guess_frame_uses_player_indexes(self):
+        frame = wire.encode_message(
+            {
+                "type": "GAME_EVENT",
+                "payload": {
+                    "event": "GUESS",
+                    "by": "bob",
+                    "value": 40,
+                    "result": "higher",
+                    "next_turn": "alice",
+                    "turn_count": 3,
+                    "seq": 4,
+                },
+            },
+            ["alice", "bob"],
+        )
+        self.assertEqual(msgpack.unpackb(frame), [wire.T_EVENT, wire.E_GUESS, 1, 40, 1, 0, 3, 4])
+
+    def test_game_over_frame_carries_reason_code(self):
+        frame = wire.encode_message(
+            {
+                "type": "GAME_EVENT",
+                "payload": {
+                    "event": "GAME_OVER",
+                    "reason": "timeout",
+                    "winner": "alice",
+                    "number": 7,
+                    "turn_count": 2,
+                    "finished_at": "2026-01-01T00:00:00+00:00",
+                    "seq": 4,
+                },
+            },
+            ["alice", "bob"],
+        )
+        self.assertEqual(msgpack.unpackb(frame), [wire.T_EVENT, wire.E_GAME_OVER, 0, 7, 2, 1767225600, 4, 1])
+
+    def test_decode_compact_guess(self):
+        self.assertEqual(
+            wire.decode_message(msgpack.packb([wire.C_GUESS, 55])),
+            {"type": "GUESS", "payload": {"value": 55}},
+        )
+
+    def test_decode_rejects_other_arrays(self):
+        with self.assertRaises(ValueError):
+            wire.decode_message(msgpack.packb([9, 9, 9]))
+
+
+class WireNegotiationTests(RoomSocketTestCase):
+    def setUp(self):
+        super().setUp()
+        self.room = make_started_room(self.alice, self.bob, secret=42, turn=self.alice)
+
+    async def test_subprotocol_speaks_msgpack(self):
+        communicator = await self.open_socket(self.alice, self.room, subprotocols=[wire.MSGPACK_SUBPROTOCOL])
+        snapshot = msgpack.unpackb(await communicator.receive_from())
+        self.assertEqual(snapshot[0], wire.T_SNAPSHOT)
+        self.assertEqual(snapshot[4], ["alice", "bob"])
+
+        await communicator.send_to(bytes_data=msgpack.packb([wire.C_GUESS, 10]))
+        while True:
+            frame = msgpack.unpackb(await communicator.receive_from())
+            if frame[:2] == [wire.T_EVENT, wire.E_GUESS]:
+                break
+        self.assertEqual(frame[2:7], [0, 10, 1, 1, 1])
+        await communicator.disconnect()
+
+    async def test_subprotocol_without_msgpack_closes_with_explicit_code(self):
+        with mock.patch.object(wire, "msgpack", None):
+            communicator = await self.open_socket(self.alice, self.room, subprotocols=[wire.MSGPACK_SUBPROTOCOL])
+            output = await communicator.receive_output()
+        self.assertEqual(output["type"], "websocket.close")
+        self.assertEqual(output["code"], wire.WIRE_UNAVAILABLE_CLOSE_CODE)
+
+    async def test_query_param_without_msgpack_falls_back_to_json(self):
+        with mock.patch.object(wire, "msgpack", None), self.assertLogs("game.wire", "WARNING"):
+            communicator = await self.open_socket(self.alice, self.room, query="proto=msgpack")
+            message = await receive_until(communicator, lambda m: m["type"] == "SNAPSHOT")
+        self.assertEqual(message["payload"]["players"], ["alice", "bob"])
+        await communicator.disconnect()
@@ -0,0 +1,71 @@
+"""
+RoomConsumer için GUESS rate limit: bağlantı başına ve kullanıcı başına (aynı
+kullanıcının bu worker'daki tüm bağlantıları ortak) token bucket. Process-local;
+DB'ye ya da channel layer'a gitmez.
+"""
+import time
+
+from django.conf import settings
+
+
+class TokenBucket:
+    """Saniyede `rate` token dolar, en fazla `burst` birikir; her frame bir token harcar."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float | None = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def full(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class UserBuckets:
+    """user_id -> TokenBucket. Dolmuş (boşta) bucket'lar sözlük büyüdükçe atılır."""
+
+    PRUNE_THRESHOLD = 1024
+
+    def __init__(self):
+        self._buckets: dict[int, TokenBucket] = {}
+
+    def take(self, user_id: int) -> bool:
+        now = time.monotonic()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.PRUNE_THRESHOLD:
+                self._prune(now)
+            bucket = self._buckets[user_id] = TokenBucket(
+                getattr(settings, "WS_USER_GUESS_RATE", 4),
+                getattr(settings, "WS_USER_GUESS_BURST", 10),
+            )
+        return bucket.take(now)
+
+    def _prune(self, now: float):
+        for user_id in [u for u, b in self._buckets.items() if b.full(now)]:
+            del self._buckets[user_id]
+
+
+user_buckets = UserBuckets()
+
+
+def connection_bucket() -> TokenBucket:
+    return TokenBucket(getattr(settings, "WS_GUESS_RATE", 2), getattr(settings, "WS_GUESS_BURST", 5))
+
+
+def allow_guess(bucket: TokenBucket, user_id: int) -> bool:
+    # önce bağlantı bucket'ı: tek bağlantıdan gelen flood kullanıcının diğer sekmelerini tüketmesin
+    return bucket.take() and user_buckets.take(user_id)
@@ -0,0 +1,204 @@
+import csv
+import heapq
+import json
+from operator import itemgetter
+
+from django.db.models import F
+
+from .models import AccountTransaction, ArchivedTransaction
+
+TRANSACTION_LIST_DEFAULT_LIMIT = 50
+TRANSACTION_LIST_MAX_LIMIT = 200
+
+TRANSACTION_FIELDS = ("id", "type", "amount", "balance_after", "room_id", "note", "created_at")
+
+
+def transaction_row(values: dict) -> dict:
+    amount = int(values["amount"] or 0)
+    room_bet = int(values["room_bet_amount"] or 0) if values["room_id"] else 0
+
+    # PAYOUT'un net etkisi: 2 * bet - kilitlenen bet
+    net_change = amount
+    if values["type"] == AccountTransaction.Type.PAYOUT and values["room_id"]:
+        net_change = amount - room_bet
+
+    created = values["created_at"]
+    return {
+        "id": values["id"],
+        "type": values["type"],
+        "amount": amount,
+        "net_change": net_change,
+        "balance_after": values["balance_after"],
+        "room_id": values["room_id"],
+        "room_bet_amount": room_bet,
+        "note": values["note"],
+        "created_at": created.isoformat() if created else None,
+    }
+
+
+def _filtered(qs, user_id, cursor, types, created_from, created_to):
+    qs = qs.filter(user_id=user_id).order_by("-id")
+    if cursor is not None:
+        qs = qs.filter(id__lt=cursor)
+    if types:
+        qs = qs.filter(type__in=types)
+    if created_from is not None:
+        qs = qs.filter(created_at__gte=created_from)
+    if created_to is not None:
+        qs = qs.filter(created_at__lt=created_to)
+    return qs
+
+
+def transaction_page(
+    user_id: int,
+    cursor=None,
+    limit=TRANSACTION_LIST_DEFAULT_LIMIT,
+    types=None,
+    created_from=None,
+    created_to=None,
+):
+    """
+    Kullanıcının hesap hareketleri, (user_id, id) üzerinde keyset pagination:
+    id < cursor olan en yeni `limit` kayıt. Model instance üretmez; bet tutarı
+    join'den tek kolon olarak gelir. Arşive taşınmış kayıtlar da okunur (id'ler ortak).
+    (rows, next_cursor) döner.
+    """
+    live = _filtered(AccountTransaction.objects, user_id, cursor, types, created_from, created_to)
+    archived = _filtered(ArchivedTransaction.objects, user_id, cursor, types, created_from, created_to)
+
+    values = [
+        *live.values(*TRANSACTION_FIELDS, "room__bet_amount")[: limit + 1],
+        *archived.values(*TRANSACTION_FIELDS, "room_bet_amount")[: limit + 1],
+    ]
+    for v in values:
+        if "room__bet_amount" in v:
+            v["room_bet_amount"] = v.pop("room__bet_amount")
+    values.sort(key=lambda v: v["id"], reverse=True)
+
+    rows = [transaction_row(v) for v in values[: limit + 1]]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["id"]
+    return rows, next_cursor
+
+
+TRANSACTION_EXPORT_CHUNK_SIZE = 2000
+TRANSACTION_EXPORT_COLUMNS = (
+    "id",
+    "created_at",
+    "type",
+    "amount",
+    "net_change",
+    "balance_after",
+    "room_id",
+    "room_bet_amount",
+    "note",
+)
+
+
+def _export_querysets(user_id: int, types, created_from, created_to):
+    """Export için canlı + arşiv sorguları, eskiden yeniye; bet tutarı iki tarafta da room_bet_amount."""
+    live = _filtered(AccountTransaction.objects, user_id, None, types, created_from, created_to)
+    archived = _filtered(ArchivedTransaction.objects, user_id, None, types, created_from, created_to)
+    return (
+        live.order_by("id").values(*TRANSACTION_FIELDS, room_bet_amount=F("room__bet_amount")),
+        archived.order_by("id").values(*TRANSACTION_FIELDS, "room_bet_amount"),
+    )
+
+
+def iter_transactions(user_id: int, types=None, created_from=None, created_to=None):
+    """
+    Kullanıcının tüm hareketleri (eskiden yeniye) transaction_row formatında. Sorgular
+    iterator() ile chunk chunk okunur; bellek kullanımı geçmişin uzunluğundan bağımsız (WSGI yolu).
+    """
+    live, archived = _export_querysets(user_id, types, created_from, created_to)
+    rows = heapq.merge(
+        live.iterator(chunk_size=TRANSACTION_EXPORT_CHUNK_SIZE),
+        archived.iterator(chunk_size=TRANSACTION_EXPORT_CHUNK_SIZE),
+        key=itemgetter("id"),
+    )
+    for v in rows:
+        yield transaction_row(v)
+
+
+async def _merge_by_id(*iterators):
+    """id'ye göre artan sıralı async iterator'ları birleştirir (canlı + arşiv)."""
+    heads = {}
+    for iterator in iterators:
+        try:
+            heads[iterator] = await anext(iterator)
+        except StopAsyncIteration:
+            pass
+    while heads:
+        iterator = min(heads, key=lambda i: heads[i]["id"])
+        yield heads[iterator]
+        try:
+            heads[iterator] = await anext(iterator)
+        except StopAsyncIteration:
+            del heads[iterator]
+
+
+async def aiter_transactions(user_id: int, types=None, created_from=None, created_to=None):
+    """iter_transactions'ın async karşılığı (aiterator(); ASGI yolu)."""
+    live, archived = _export_querysets(user_id, types, created_from, created_to)
+    rows = _merge_by_id(
+        live.aiterator(chunk_size=TRANSACTION_EXPORT_CHUNK_SIZE),
+        archived.aiterator(chunk_size=TRANSACTION_EXPORT_CHUNK_SIZE),
+    )
+    async for v in rows:
+        yield transaction_row(v)
+
+
+class _Line:
+    """csv.writer'ın yazdığı satırı geri döndüren dosya benzeri nesne."""
+
+    def write(self, value):
+        return value
+
+
+class _ExportEncoder:
+    """Satırları "csv" ya da "ndjson" metnine çevirir, TRANSACTION_EXPORT_CHUNK_SIZE'lık parçalar halinde biriktirir."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.writer = csv.writer(_Line())
+        self.buffer = [self.writer.writerow(TRANSACTION_EXPORT_COLUMNS)] if fmt == "csv" else []
+
+    def add(self, row: dict):
+        """Parça dolduysa birleştirip döner, yoksa None."""
+        if self.fmt == "csv":
+            self.buffer.append(self.writer.writerow([row[column] for column in TRANSACTION_EXPORT_COLUMNS]))
+        else:
+            self.buffer.append(json.dumps(row, ensure_ascii=False) + "\n")
+        if len(self.buffer) >= TRANSACTION_EXPORT_CHUNK_SIZE:
+            return self.flush()
+        return None
+
+    def flush(self) -> str:
+        chunk, self.buffer = "".join(self.buffer), []
+        return chunk
+
+
+def export_transactions(fmt: str, user_id: int, **filters):
+    """StreamingHttpResponse için "csv" ya da "ndjson" parçaları (sync iterator; WSGI)."""
+    encoder = _ExportEncoder(fmt)
+    for row in iter_transactions(user_id, **filters):
+        chunk = encoder.add(row)
+        if chunk:
+            yield chunk
+    chunk = encoder.flush()
+    if chunk:
+        yield chunk
+
+
+async def aexport_transactions(fmt: str, user_id: int, **filters):
+    """export_transactions'ın async karşılığı (ASGI; worker thread'i tutmaz)."""
+    encoder = _ExportEncoder(fmt)
+    async for row in aiter_transactions(user_id, **filters):
+        chunk = encoder.add(row)
+        if chunk:
+            yield chunk
+    chunk = encoder.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,139 @@
+import asyncio
+import atexit
+import logging
+import threading
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .db_executor import db_write
+from .models import Room
+
+logger = logging.getLogger(__name__)
+
+
+class TurnJournal:
+    """
+    Write-behind journal for turn changes (current_turn / turn_count / last_move_at).
+
+    Her yanlış tahminde Room'a UPDATE atmak yerine son değer oda başına
+    bellekte tutulur (coalesce) ve tüm aktif odalar için tek bir UPDATE
+    ile yazılır (sadece DB'dekinden yeni turn'ler): GAME_TURN_FLUSH_INTERVAL_MS dolunca ya da
+    GAME_TURN_FLUSH_MAX_EVENTS kayıt birikince (hangisi önce olursa).
+
+    GAME_OVER'da db_finish_room_and_payout odanın bekleyen kaydını pop edip
+    finish transaction'ı içinde senkron yazar.
+    """
+
+    def __init__(self):
+        self._pending: dict[int, tuple] = {}
+        self._events = 0
+        self._mutex = threading.Lock()
+        self._task = None
+        self._wakeup = None
+
+    @property
+    def flush_interval(self) -> float:
+        return getattr(settings, "GAME_TURN_FLUSH_INTERVAL_MS", 200) / 1000
+
+    @property
+    def max_events(self) -> int:
+        return getattr(settings, "GAME_TURN_FLUSH_MAX_EVENTS", 500)
+
+    def record(self, room_id: int, current_turn_id: int, turn_count: int):
+        with self._mutex:
+            self._pending[room_id] = (current_turn_id, turn_count, timezone.now())
+            self._events += 1
+            full = self._events >= self.max_events
+
+        self._ensure_flusher()
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    def pop(self, room_id: int):
+        """Odanın bekleyen (current_turn_id, turn_count, moved_at) kaydını alır; yoksa None."""
+        with self._mutex:
+            return self._pending.pop(room_id, None)
+
+    def flush_room(self, room_id: int):
+        """Tek odanın bekleyen kaydını hemen yazar (DB thread'i); eskiyse yine dokunulmaz."""
+        pending = self.pop(room_id)
+        if pending is not None:
+            self._write({room_id: pending})
+
+    def flush_sync(self) -> int:
+        """Bekleyen tüm kayıtları tek UPDATE ile yazar. Sync context'te (DB thread'i) çağrılmalı."""
+        with self._mutex:
+            pending, self._pending = self._pending, {}
+            self._events = 0
+
+        if not pending:
+            return 0
+
+        try:
+            self._write(pending)
+        except Exception:
+            # yazılamayanları geri koy; bu arada daha yeni kayıt geldiyse o kazanır
+            with self._mutex:
+                for room_id, entry in pending.items():
+                    self._pending.setdefault(room_id, entry)
+            raise
+        return len(pending)
+
+    @staticmethod
+    def _write(pending: dict):
+        """
+        Tüm kayıtlar tek UPDATE ... CASE ile yazılır. Satır sadece kayıt DB'dekinden yeniyse
+        (turn_count büyükse) güncellenir: geç flush edilen eski bir kayıt (retry, başka worker)
+        turn'ü geri almaz. Biten odanın satırına da dokunulmaz (flush finish ile paralel çalışabilir).
+        """
+        newer = reduce(
+            or_,
+            (Q(id=room_id, turn_count__lt=turn_count) for room_id, (_, turn_count, _) in pending.items()),
+        )
+
+        def latest(field: str, index: int):
+            whens = [When(id=room_id, then=Value(entry[index])) for room_id, entry in pending.items()]
+            output_field = Room._meta.get_field(field)
+            return Case(*whens, default=F(field), output_field=getattr(output_field, "target_field", output_field))
+
+        Room.objects.filter(newer).exclude(status__in=[Room.Status.FINISHED, Room.Status.EXPIRED]).update(
+            current_turn_id=latest("current_turn_id", 0),
+            turn_count=latest("turn_count", 1),
+            last_move_at=latest("last_move_at", 2),
+        )
+
+    def _ensure_flusher(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # sync context (management command / test): flush_sync ya da atexit yazar
+            return
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self._pending:
+                continue
+            try:
+                await db_write(self.flush_sync)()
+            except Exception:
+                logger.exception("TurnJournal flush failed")
+
+
+turn_journal = TurnJournal()
+
+# process kapanırken flush interval içinde kalan turn'ler kaybolmasın
+atexit.register(turn_journal.flush_sync)
@@ -1,17 +1,27 @@
 from django.urls import path
 from .views import (
+    BetSettingsView,
     RoomListCreateView,
     RoomJoinView,
     MeView,
     TransactionListView,
+    TransactionExportView,
     LeaderboardView,
+    LeaderboardMeView,
+    MatchmakingView,
+    LobbyBootstrapView,
 )
 
 urlpatterns = [
     path("me/", MeView.as_view()),
+    path("lobby/bootstrap/", LobbyBootstrapView.as_view()),
     path("transactions/", TransactionListView.as_view()),
+    path("transactions/export.<str:fmt>", TransactionExportView.as_view()),
     path("leaderboard/", LeaderboardView.as_view()),
+    path("leaderboard/me/", LeaderboardMeView.as_view()),
 
+    path("bet-settings/", BetSettingsView.as_view()),
     path("rooms/", RoomListCreateView.as_view()),
     path("rooms/<int:room_id>/join/", RoomJoinView.as_view()),
+    path("matchmaking/", MatchmakingView.as_view()),
 ]
@@ -0,0 +1,68 @@
+"""
+Liste endpoint'lerinin ETag'leri için versiyon değerleri (Django cache'inde; çok
+process'li kurulumda cache'in ortak olması game/checks.py ile zorunlu). Yazma yolları
+bump() çağırır, view'lar If-None-Match eşleşirse ana sorguyu çalıştırmadan 304 döner.
+"""
+import hashlib
+import secrets
+import time
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+ROOM_LIST_VERSION_KEY = "rooms:list:version"
+
+
+def ledger_version_key(user_id: int) -> str:
+    """Kullanıcının hesap hareketleri / bakiyesi (ledger.py yazma yolları bump eder)."""
+    return f"ledger:{user_id}:version"
+
+
+def _initial() -> int:
+    # cache key'i düşerse sayaç eski bir değerden başlamasın (eski ETag'ler yanlışlıkla eşleşmesin)
+    return time.time_ns() // 1000
+
+
+def get_version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+async def aget_version(key: str) -> int:
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _initial(), timeout=None)
+        version = await cache.aget(key, 0)
+    return version
+
+
+def bump(key: str):
+    # incr değil set: file / db cache'te incr atomik değil (get + set), aynı anda iki bump
+    # aynı değeri yazıp bir değişikliği gizleyebilirdi. Rastgele değer her bump'ta yenidir.
+    cache.set(key, secrets.randbits(62), timeout=None)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request, etag: str):
+    """If-None-Match etag'i kapsıyorsa 304 Response, değilse None."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    if header.strip() != "*" and etag not in [t.strip() for t in header.split(",")]:
+        return None
+    return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def with_etag(response, etag: str):
+    response["ETag"] = etag
+    # tarayıcı her seferinde If-None-Match ile doğrulasın
+    response["Cache-Control"] = "private, no-cache"
+    return response
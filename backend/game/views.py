@@ -1,11 +1,12 @@
-import random
+from datetime import datetime, timedelta
 
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
-from django.db.models import F
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -13,7 +14,28 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 
-from .models import Room, BetSettings, AccountTransaction
+from .models import Room, AccountTransaction
+from .bets import bet_settings_cache, validate_bet_amount
+from .leaderboard import leaderboard
+from .ledger import InsufficientBalance
+from .lobby import ROOM_CREATED, notify_lobby
+from .matchmaking import join_queue, matchmaking_queue
+from .rooms import JoinRejected, join_room, start_game
+from .room_list import (
+    ROOM_LIST_DEFAULT_LIMIT,
+    ROOM_LIST_MAX_LIMIT,
+    invalidate_room_list,
+    room_list_version,
+    room_page,
+)
+from .transactions import (
+    TRANSACTION_LIST_DEFAULT_LIMIT,
+    TRANSACTION_LIST_MAX_LIMIT,
+    aexport_transactions,
+    export_transactions,
+    transaction_page,
+)
+from .versions import get_version, ledger_version_key, make_etag, not_modified, with_etag
 
 User = get_user_model()
 
@@ -36,112 +58,71 @@ class ApiLoginView(APIView):
         return Response({"token": token.key, "user": {"id": user.id, "username": user.username}})
 
 
+def _me_payload(u) -> dict:
+    return {
+        "id": u.id,
+        "username": u.username,
+        "email": getattr(u, "email", ""),
+        "role": getattr(u, "role", "user"),
+        "balance": u.current_balance(),
+    }
+
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        u = request.user
-        return Response(
-            {
-                "id": u.id,
-                "username": u.username,
-                "email": getattr(u, "email", ""),
-                "role": getattr(u, "role", "user"),
-                "balance": getattr(u, "balance", 0),
-            }
-        )
+        return Response(_me_payload(request.user))
 
 
-def _validate_bet_amount(bet_amount: int) -> tuple[bool, str]:
-    settings_obj = BetSettings.objects.first()
-    if not settings_obj:
-        return True, ""
-
-    if bet_amount < settings_obj.min_bet or bet_amount > settings_obj.max_bet:
-        return False, "bet_amount out of allowed range"
-
-    if ((bet_amount - settings_obj.min_bet) % settings_obj.step) != 0:
-        return False, "bet_amount must follow step"
-
-    return True, ""
-
-
-def _start_game_lock_and_init(room: Room):
-    if room.is_locked:
-        return
-    if not room.player1_id or not room.player2_id:
-        return
-
-    p1 = User.objects.select_for_update().get(id=room.player1_id)
-    p2 = User.objects.select_for_update().get(id=room.player2_id)
-
-    if p1.balance < room.bet_amount:
-        raise ValueError("Player1 has insufficient balance")
-    if p2.balance < room.bet_amount:
-        raise ValueError("Player2 has insufficient balance")
-
-    User.objects.filter(id=p1.id).update(balance=F("balance") - room.bet_amount)
-    User.objects.filter(id=p2.id).update(balance=F("balance") - room.bet_amount)
-
-    p1.refresh_from_db(fields=["balance"])
-    p2.refresh_from_db(fields=["balance"])
-
-    AccountTransaction.objects.create(
-        user=p1,
-        room=room,
-        type=AccountTransaction.Type.BET_LOCK,
-        amount=-room.bet_amount,
-        balance_after=int(p1.balance),
-        note=f"Bet locked for room {room.id}",
-    )
-    AccountTransaction.objects.create(
-        user=p2,
-        room=room,
-        type=AccountTransaction.Type.BET_LOCK,
-        amount=-room.bet_amount,
-        balance_after=int(p2.balance),
-        note=f"Bet locked for room {room.id}",
-    )
-
-    if room.secret_number is None:
-        room.secret_number = random.randint(1, 100)
-
-    room.current_turn_id = random.choice([room.player1_id, room.player2_id])
-    room.turn_count = 0
-    room.is_locked = True
-    room.status = Room.Status.FULL
-    room.started_at = room.started_at or timezone.now()
-
-    room.save(
-        update_fields=[
-            "secret_number",
-            "current_turn",
-            "turn_count",
-            "started_at",
-            "is_locked",
-            "status",
-        ]
-    )
+class BetSettingsView(APIView):
+    """
+    GET /api/bet-settings/ -> {"min_bet", "max_bet", "step"} (ayar yoksa null'lar)
+    Client tarafı validasyon için; ETag / If-None-Match ile 304 döner.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        etag = bet_settings_cache.etag()
+        response = not_modified(request, etag)
+        if response is None:
+            data = bet_settings_cache.get() or {"min_bet": None, "max_bet": None, "step": None}
+            response = with_etag(Response(data), etag)
+        # kullanıcıya özel değil: paylaşılan cache'ler de tutabilir
+        response["Cache-Control"] = "public, max-age=60"
+        return response
 
 
 class RoomListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        rooms = Room.objects.all().order_by("-id")
-        data = [
-            {
-                "id": r.id,
-                "bet_amount": r.bet_amount,
-                "status": str(r.status).lower(),
-                "player1_id": r.player1_id,
-                "player2_id": r.player2_id,
-                "player_count": r.player_count,
-                "created_at": r.created_at.isoformat() if r.created_at else None,
-            }
-            for r in rooms
-        ]
-        return Response(data)
+        """
+        GET /api/rooms/?status=open&cursor=<id>&limit=50
+        -> { "results": [...], "next_cursor": <id|null> }
+        ETag / If-None-Match ile değişmeyen sayfa 304.
+        """
+        status_filter = (request.query_params.get("status") or "").lower() or None
+        if status_filter and status_filter not in Room.Status.values:
+            return Response({"detail": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            cursor = request.query_params.get("cursor")
+            cursor = int(cursor) if cursor else None
+            limit = int(request.query_params.get("limit") or ROOM_LIST_DEFAULT_LIMIT)
+        except (TypeError, ValueError):
+            return Response({"detail": "cursor and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, ROOM_LIST_MAX_LIMIT))
+
+        # oda yazma yolları invalidate_room_list ile versiyonu artırır; değişmediyse sorgusuz 304
+        etag = make_etag("rooms", room_list_version(), status_filter, cursor, limit)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        rows, next_cursor = room_page(status=status_filter, cursor=cursor, limit=limit)
+        return with_etag(Response({"results": rows, "next_cursor": next_cursor}), etag)
 
     def post(self, request):
         bet_amount = request.data.get("bet_amount")
@@ -153,11 +134,11 @@ class RoomListCreateView(APIView):
         except (TypeError, ValueError):
             return Response({"detail": "bet_amount must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
 
-        ok, msg = _validate_bet_amount(bet_amount)
+        ok, msg = validate_bet_amount(bet_amount)
         if not ok:
             return Response({"detail": msg}, status=status.HTTP_400_BAD_REQUEST)
 
-        if request.user.balance < bet_amount:
+        if request.user.current_balance() < bet_amount:
             return Response({"detail": "Insufficient balance to create room"}, status=status.HTTP_400_BAD_REQUEST)
 
         room = Room.objects.create(
@@ -165,6 +146,8 @@ class RoomListCreateView(APIView):
             status=Room.Status.OPEN,
             player1=request.user,
         )
+        invalidate_room_list()
+        notify_lobby(ROOM_CREATED, room)
 
         return Response(
             {
@@ -183,118 +166,265 @@ class RoomJoinView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, room_id):
-        with transaction.atomic():
-            room = (
-                Room.objects.select_for_update()
-                .select_related("player1", "player2")
-                .filter(id=room_id)
-                .first()
-            )
-            if not room:
-                return Response({"detail": "Room not found"}, status=status.HTTP_404_NOT_FOUND)
+        # kilitsiz: yarışı kaybeden satır kilidinde beklemeden cevap alır (bkz. rooms.join_room)
+        try:
+            join_room(room_id, request.user)
+        except JoinRejected as e:
+            code = status.HTTP_404_NOT_FOUND if e.reason == "not_found" else status.HTTP_400_BAD_REQUEST
+            return Response({"detail": str(e)}, status=code)
+        except InsufficientBalance as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            if room.status == Room.Status.FINISHED:
-                return Response({"detail": "Room already finished"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": "Joined room successfully"})
 
-            if room.player1_id == request.user.id:
-                return Response({"detail": "Cannot join your own room"}, status=status.HTTP_400_BAD_REQUEST)
 
-            if room.player2_id is not None:
-                return Response({"detail": "Room is full"}, status=status.HTTP_400_BAD_REQUEST)
+class MatchmakingView(APIView):
+    """
+    POST   /api/matchmaking/ {"bet_amount": 50} -> sıraya gir ya da hemen eşleş
+    GET    /api/matchmaking/                    -> {"status": "idle" | "queued" | "matched", ...}
+    DELETE /api/matchmaking/                    -> sıradan çık
+    Eşleşince oda FULL ve bet'ler kilitli oluşur; ws/rooms/<room_id>/ ile oyuna bağlanılır.
+    """
+    permission_classes = [IsAuthenticated]
 
-            room.player2 = request.user
-            room.status = Room.Status.FULL
-            room.save(update_fields=["player2", "status"])
+    def get(self, request):
+        return Response(matchmaking_queue.status(request.user.id))
 
-            try:
-                _start_game_lock_and_init(room)
-            except ValueError as e:
-                room.player2 = None
-                room.status = Room.Status.OPEN
-                room.save(update_fields=["player2", "status"])
-                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    def post(self, request):
+        try:
+            bet_amount = int(request.data.get("bet_amount"))
+        except (TypeError, ValueError):
+            return Response({"detail": "bet_amount must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({"detail": "Joined room successfully"})
+        ok, msg = validate_bet_amount(bet_amount)
+        if not ok:
+            return Response({"detail": msg}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.current_balance() < bet_amount:
+            return Response({"detail": "Insufficient balance to join matchmaking"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = join_queue(request.user, bet_amount)
+        except InsufficientBalance as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    def delete(self, request):
+        matchmaking_queue.dequeue(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _parse_date_param(value, end=False):
+    """
+    ISO tarih ya da datetime. Sadece tarih verilirse günün başı; end=True ise ertesi günün
+    başı (o gün dahil). Hatalıysa ValueError.
+    """
+    # parse_datetime "2026-01-31"i de gece yarısı olarak kabul eder; tarih önce denenmeli
+    day = parse_date(value)
+    if day is not None:
+        moment = datetime.combine(day + timedelta(days=1) if end else day, datetime.min.time())
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(value)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _transaction_filters(params) -> dict:
+    """?type=a,b&date_from=&date_to= -> transaction_page / export filtreleri. Hatalıysa ValueError(detail)."""
+    types = [t for t in (params.get("type") or "").lower().split(",") if t]
+    if any(t not in AccountTransaction.Type.values for t in types):
+        raise ValueError("Invalid type")
+
+    try:
+        created_from = _parse_date_param(params["date_from"]) if params.get("date_from") else None
+        created_to = _parse_date_param(params["date_to"], end=True) if params.get("date_to") else None
+    except ValueError:
+        raise ValueError("date_from and date_to must be ISO dates") from None
+
+    return {"types": types, "created_from": created_from, "created_to": created_to}
 
 
 class TransactionListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = AccountTransaction.objects.filter(user=request.user).select_related("room").order_by("-created_at")[:200]
-
-        data = []
-        for t in qs:
-            created = t.created_at
-            amount = int(t.amount or 0)
-            t_type = t.type
-
-            room_bet = int(t.room.bet_amount) if t.room_id and t.room else 0
-
-            net_change = amount
-            if t_type == AccountTransaction.Type.PAYOUT and t.room_id:
-                net_change = amount - room_bet
-
-            data.append(
-                {
-                    "id": t.id,
-                    "type": t_type,
-                    "amount": amount,
-                    "net_change": net_change,
-                    "balance_after": t.balance_after,
-                    "room_id": t.room_id,
-                    "room_bet_amount": room_bet,
-                    "note": t.note,
-                    "created_at": created.isoformat() if created else None,
-                }
-            )
+        """
+        GET /api/transactions/?cursor=<id>&limit=50&type=bet_lock,payout&date_from=2026-01-01&date_to=2026-01-31
+        -> { "results": [...], "next_cursor": <id|null> }  (en yeni önce; date_to dahil)
+        ETag / If-None-Match ile değişmeyen sayfa 304.
+        """
+        params = request.query_params
+        try:
+            cursor = params.get("cursor")
+            cursor = int(cursor) if cursor else None
+            limit = int(params.get("limit") or TRANSACTION_LIST_DEFAULT_LIMIT)
+        except (TypeError, ValueError):
+            return Response({"detail": "cursor and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, TRANSACTION_LIST_MAX_LIMIT))
+
+        try:
+            filters = _transaction_filters(params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = make_etag(
+            "transactions",
+            request.user.id,
+            get_version(ledger_version_key(request.user.id)),
+            params.urlencode(),
+        )
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        rows, next_cursor = transaction_page(request.user.id, cursor=cursor, limit=limit, **filters)
+        return with_etag(Response({"results": rows, "next_cursor": next_cursor}), etag)
 
-        return Response(data)
+
+class TransactionExportView(APIView):
+    """
+    GET /api/transactions/export.csv | export.ndjson  (type / date_from / date_to filtreleri list ile aynı)
+    Tüm geçmiş, eskiden yeniye, stream olarak (ASGI'de async, WSGI'de sync iterator; ikisinde de
+    bellek sabit). Staff kullanıcılar ?user=<id> ile başkasınınkini alabilir.
+    """
+    permission_classes = [IsAuthenticated]
+
+    CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson; charset=utf-8"}
+
+    def get(self, request, fmt: str):
+        if fmt not in self.CONTENT_TYPES:
+            return Response({"detail": "Format must be csv or ndjson"}, status=status.HTTP_404_NOT_FOUND)
+
+        user_id = request.user.id
+        if request.query_params.get("user"):
+            if not request.user.is_staff:
+                return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
+            try:
+                user_id = int(request.query_params["user"])
+            except ValueError:
+                return Response({"detail": "user must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            filters = _transaction_filters(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Django WSGI altında async iterator'ı önce tamamen belleğe alır; orada sync iterator
+        if isinstance(request._request, ASGIRequest):
+            chunks = aexport_transactions(fmt, user_id, **filters)
+        else:
+            chunks = export_transactions(fmt, user_id, **filters)
+        response = StreamingHttpResponse(chunks, content_type=self.CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="transactions-{user_id}.{fmt}"'
+        return response
+
+
+LEADERBOARD_DEFAULT_LIMIT = 50
+LEADERBOARD_MAX_LIMIT = 100
+
+
+def _leaderboard_rows(limit: int) -> list[dict]:
+    return [{"id": e["id"], "username": e["username"], "balance": e["balance"]} for e in leaderboard.top(limit)]
 
 
 class LeaderboardView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = User.objects.all().order_by("-balance", "id")[:50]
-        return Response([{"id": u.id, "username": u.username, "balance": getattr(u, "balance", 0)} for u in qs])
+        try:
+            limit = int(request.query_params.get("limit") or LEADERBOARD_DEFAULT_LIMIT)
+        except (TypeError, ValueError):
+            return Response({"detail": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, LEADERBOARD_MAX_LIMIT))
 
+        etag = make_etag("leaderboard", *leaderboard.version(), limit)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-@login_required
-def play_room_view(request, room_id: int):
-    with transaction.atomic():
-        room = (
-            Room.objects.select_for_update()
-            .select_related("player1", "player2")
-            .filter(id=room_id)
-            .first()
+        return with_etag(Response(_leaderboard_rows(limit)), etag)
+
+
+class LeaderboardMeView(APIView):
+    """
+    GET /api/leaderboard/me/?radius=5
+    -> { "rank": 12, "balance": ..., "neighbors": [{rank, id, username, balance}, ...] }
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            radius = int(request.query_params.get("radius") or 5)
+        except (TypeError, ValueError):
+            return Response({"detail": "radius must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        radius = max(0, min(radius, LEADERBOARD_MAX_LIMIT // 2))
+
+        neighbors = leaderboard.around(request.user.id, radius=radius)
+        me = next((e for e in neighbors if e["id"] == request.user.id), None)
+        return Response(
+            {
+                "id": request.user.id,
+                "username": request.user.username,
+                "rank": me["rank"] if me else None,
+                "balance": me["balance"] if me else request.user.current_balance(),
+                "neighbors": neighbors,
+            }
         )
-        if room is None:
-            return render(request, "game/play_room.html", {"error": "Room not found", "room_id": room_id}, status=404)
 
-        if request.user.id in (room.player1_id, room.player2_id):
-            if room.player2_id is not None and room.status not in (Room.Status.FULL, Room.Status.FINISHED):
-                room.status = Room.Status.FULL
-                room.save(update_fields=["status"])
 
-            if room.player2_id is not None and room.status == Room.Status.FULL and not room.is_locked:
-                _start_game_lock_and_init(room)
+LOBBY_BOOTSTRAP_SECTIONS = ("me", "rooms", "leaderboard", "transactions")
 
-        else:
-            if room.status == Room.Status.OPEN and room.player2_id is None and request.user.id != room.player1_id:
-                room.player2 = request.user
-                room.status = Room.Status.FULL
-                room.save(update_fields=["player2", "status"])
-
-                try:
-                    _start_game_lock_and_init(room)
-                except ValueError as e:
-                    room.player2 = None
-                    room.status = Room.Status.OPEN
-                    room.save(update_fields=["player2", "status"])
-                    return render(request, "game/play_room.html", {"error": str(e), "room_id": room_id}, status=400)
-            else:
-                return render(request, "game/play_room.html", {"error": "Bu odaya katılımcı değilsin.", "room_id": room_id}, status=403)
+
+class LobbyBootstrapView(APIView):
+    """
+    GET /api/lobby/bootstrap/?include=me,rooms,leaderboard,transactions (varsayılan: hepsi)
+    -> { "me": {...}, "rooms": {"results", "next_cursor"}, "leaderboard": [...], "transactions": {"results", "next_cursor"} }
+
+    Lobby / oda ekranının açılışta attığı dört isteğin tek seferlik hali; her bölüm
+    kendi endpoint'inin ilk sayfasıyla aynı. rooms (room_page cache'i) ve leaderboard
+    (process içi) sorgusuz gelir; me ve transactions kullanıcıya özel, DB'den taze.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        include = [s for s in (request.query_params.get("include") or "").lower().split(",") if s]
+        if any(s not in LOBBY_BOOTSTRAP_SECTIONS for s in include):
+            return Response({"detail": "Invalid include"}, status=status.HTTP_400_BAD_REQUEST)
+        include = include or LOBBY_BOOTSTRAP_SECTIONS
+
+        data = {}
+        if "me" in include:
+            data["me"] = _me_payload(request.user)
+        if "rooms" in include:
+            rows, next_cursor = room_page()
+            data["rooms"] = {"results": rows, "next_cursor": next_cursor}
+        if "leaderboard" in include:
+            data["leaderboard"] = _leaderboard_rows(LEADERBOARD_DEFAULT_LIMIT)
+        if "transactions" in include:
+            rows, next_cursor = transaction_page(request.user.id)
+            data["transactions"] = {"results": rows, "next_cursor": next_cursor}
+        return Response(data)
+
+
+@login_required
+def play_room_view(request, room_id: int):
+    room = Room.objects.filter(id=room_id).values("player1_id", "player2_id").first()
+    if room is None:
+        return render(request, "game/play_room.html", {"error": "Room not found", "room_id": room_id}, status=404)
+
+    if request.user.id in (room["player1_id"], room["player2_id"]):
+        # FULL ve başlamamışsa başlatır; değilse no-op (bkz. rooms.start_game)
+        start_game(room_id)
+    else:
+        try:
+            join_room(room_id, request.user)
+        except JoinRejected:
+            return render(request, "game/play_room.html", {"error": "Bu odaya katılımcı değilsin.", "room_id": room_id}, status=403)
+        except InsufficientBalance as e:
+            return render(request, "game/play_room.html", {"error": str(e), "room_id": room_id}, status=400)
 
     return render(request, "game/play_room.html", {"room_id": room_id})
 
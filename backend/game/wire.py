@@ -0,0 +1,174 @@
+"""
+RoomConsumer için kompakt msgpack wire protokolü (opsiyonel; varsayılan JSON).
+
+Negotiation: Sec-WebSocket-Protocol: sans.msgpack.v1 ya da ?proto=msgpack.
+msgpack requirements.txt'te; yine de kurulu değilse: ?proto=msgpack isteyen bağlantı
+JSON ile devam eder (uyarı loglanır), subprotocol isteyen bağlantı kabul edilip
+WIRE_UNAVAILABLE_CLOSE_CODE ile kapatılır (tarayıcı handshake'i sessizce düşürmesin).
+
+Server -> client frame'leri dizi (array) olarak kodlanır; oyuncular username
+yerine SNAPSHOT'taki "players" listesindeki index'leri (0/1) ile gider,
+zamanlar epoch saniyesidir:
+
+    SNAPSHOT      [1, room, status, bet_amount, [p1, p2], turn, winner, turn_count, finished_at, seq]
+    GAME_STARTED  [2, 1, turn, turn_count, [p1, p2], seq]
+    GUESS         [2, 2, by, value, result, next_turn, turn_count, seq]
+    GAME_OVER     [2, 3, winner, number, turn_count, finished_at, seq, reason]
+    INFO / ERROR  [3, detail] / [4, detail]
+    RESUMED       [5, since, count, [p1, p2]]
+
+status: 0 open, 1 full, 2 finished, 3 expired; result: 1 higher, 2 lower;
+reason: 1 timeout, 2 abandoned (doğru tahminle bitişte nil); bilinmeyen değerler nil.
+
+Client -> server: [1, value] (GUESS) ya da JSON protokolündeki map'in msgpack hali.
+"""
+import logging
+from datetime import datetime
+from urllib.parse import parse_qs
+
+try:
+    import msgpack
+except ImportError:  # opsiyonel bağımlılık
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_SUBPROTOCOL = "sans.msgpack.v1"
+# subprotocol istendi ama sunucuda msgpack yok
+WIRE_UNAVAILABLE_CLOSE_CODE = 4406
+
+T_SNAPSHOT, T_EVENT, T_INFO, T_ERROR, T_RESUMED = 1, 2, 3, 4, 5
+E_GAME_STARTED, E_GUESS, E_GAME_OVER = 1, 2, 3
+C_GUESS = 1
+
+STATUS_CODES = {"open": 0, "full": 1, "finished": 2, "expired": 3}
+RESULT_CODES = {"higher": 1, "lower": 2}
+REASON_CODES = {"timeout": 1, "abandoned": 2}
+EVENT_CODES = {"GAME_STARTED": E_GAME_STARTED, "GUESS": E_GUESS, "GAME_OVER": E_GAME_OVER}
+
+
+def _epoch(iso):
+    return int(datetime.fromisoformat(iso).timestamp()) if iso else None
+
+
+def _index(players, username):
+    try:
+        return players.index(username) if username is not None else None
+    except ValueError:
+        return None
+
+
+def encode_message(content: dict, players) -> bytes:
+    """JSON protokolündeki {"type", "payload"} mesajını kompakt frame'e çevirir."""
+    msg_type = content.get("type")
+    payload = content.get("payload") or {}
+
+    if msg_type == "SNAPSHOT":
+        players = payload.get("players") or [None, None]
+        frame = [
+            T_SNAPSHOT,
+            payload.get("room"),
+            STATUS_CODES.get(payload.get("status")),
+            payload.get("bet_amount"),
+            players,
+            _index(players, payload.get("turn")),
+            _index(players, payload.get("winner")),
+            payload.get("turn_count"),
+            _epoch(payload.get("finished_at")),
+            payload.get("seq"),
+        ]
+    elif msg_type == "GAME_EVENT" and payload.get("event") == "GAME_STARTED":
+        players = payload.get("players") or players
+        frame = [
+            T_EVENT,
+            E_GAME_STARTED,
+            _index(players, payload.get("turn")),
+            payload.get("turn_count"),
+            players,
+            payload.get("seq"),
+        ]
+    elif msg_type == "GAME_EVENT" and payload.get("event") == "GUESS":
+        frame = [
+            T_EVENT,
+            E_GUESS,
+            _index(players, payload.get("by")),
+            payload.get("value"),
+            RESULT_CODES.get(payload.get("result")),
+            _index(players, payload.get("next_turn")),
+            payload.get("turn_count"),
+            payload.get("seq"),
+        ]
+    elif msg_type == "GAME_EVENT" and payload.get("event") == "GAME_OVER":
+        frame = [
+            T_EVENT,
+            E_GAME_OVER,
+            _index(players, payload.get("winner")),
+            payload.get("number"),
+            payload.get("turn_count"),
+            _epoch(payload.get("finished_at")),
+            payload.get("seq"),
+            REASON_CODES.get(payload.get("reason")),
+        ]
+    elif msg_type in ("INFO", "ERROR"):
+        frame = [T_INFO if msg_type == "INFO" else T_ERROR, payload.get("detail")]
+    elif msg_type == "RESUMED":
+        frame = [T_RESUMED, payload.get("since"), payload.get("count"), players]
+    else:
+        frame = content
+    return msgpack.packb(frame, use_bin_type=True)
+
+
+def decode_message(data: bytes) -> dict:
+    """Client frame'ini JSON protokolündeki map'e çevirir."""
+    content = msgpack.unpackb(data, raw=False)
+    if isinstance(content, list) and len(content) == 2 and content[0] == C_GUESS:
+        return {"type": "GUESS", "payload": {"value": content[1]}}
+    if not isinstance(content, dict):
+        raise ValueError("Invalid frame")
+    return content
+
+
+class WireProtocolMixin:
+    """
+    Consumer'a msgpack desteği ekler: negotiation, send_json'ın binary'ye
+    çevrilmesi ve binary frame decode'u. InstrumentedConsumerMixin'den önce gelmeli.
+    """
+
+    wire = "json"
+
+    def negotiate_wire(self):
+        """connect() başında çağrılır; seçilen subprotocol'ü (header ile istendiyse) döner."""
+        self.players = [None, None]
+        if MSGPACK_SUBPROTOCOL in (self.scope.get("subprotocols") or []):
+            # msgpack yoksa da subprotocol seçilir; connect accept'ten sonra açık kodla kapatır
+            self.wire = "msgpack" if msgpack is not None else "unavailable"
+            return MSGPACK_SUBPROTOCOL
+        params = parse_qs(self.scope.get("query_string", b"").decode("utf-8"))
+        if (params.get("proto") or [None])[0] == "msgpack":
+            if msgpack is None:
+                logger.warning("?proto=msgpack requested but msgpack is not installed; falling back to JSON")
+            else:
+                self.wire = "msgpack"
+        return None
+
+    async def reject_unavailable_wire(self) -> bool:
+        """accept()'ten hemen sonra: istenen protokol konuşulamıyorsa kapatır (True)."""
+        if self.wire != "unavailable":
+            return False
+        await self.close(code=WIRE_UNAVAILABLE_CLOSE_CODE, reason="msgpack not available")
+        return True
+
+    async def send_json(self, content, close=False):
+        if self.wire != "msgpack":
+            return await super().send_json(content, close=close)
+
+        # index'ler için son bilinen oyuncu listesi (SNAPSHOT / RESUMED / GAME_STARTED taşır)
+        payload = content.get("payload") or {}
+        if content.get("type") in ("SNAPSHOT", "RESUMED") or payload.get("event") == "GAME_STARTED":
+            self.players = list(payload.get("players") or self.players)
+        await self.send(bytes_data=encode_message(content, self.players), close=close)
+
+    async def decode_frame(self, text_data=None, bytes_data=None):
+        if bytes_data is not None and msgpack is not None:
+            return decode_message(bytes_data)
+        return await super().decode_frame(text_data, bytes_data)
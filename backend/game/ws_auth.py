@@ -2,17 +2,18 @@ from urllib.parse import parse_qs
 
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
-from rest_framework.authtoken.models import Token
 from channels.db import database_sync_to_async
 
+from users.authentication import token_cache
+
 
 @database_sync_to_async
 def _get_user_from_token(token_key: str):
-    try:
-        token = Token.objects.select_related("user").get(key=token_key)
-        return token.user
-    except Token.DoesNotExist:
+    # reconnect fırtınalarında DB'ye değil token cache'ine gider
+    user = token_cache.get_user(token_key)
+    if user is None or not user.is_active:
         return AnonymousUser()
+    return user
 
 
 class TokenAuthMiddleware(BaseMiddleware):
@@ -0,0 +1,97 @@
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+User = get_user_model()
+
+
+class TokenUserCache:
+    """
+    token key -> user cache'i (Django cache üzerinden; CACHES redis ise worker'lar arası paylaşılır).
+    REST (CachedTokenAuthentication) ve WS (TokenAuthMiddleware) aynı cache'i kullanır.
+
+    Cache'e model instance'ı değil sadece CACHED_FIELDS yazılır (parola hash'i, izinler
+    cache'e girmez). Dönen user bu alanlar yüklenmiş deferred bir instance'tır: diğer
+    alanlara erişim DB'den okur, save() sadece yüklü alanları yazar. Bakiye gereken
+    yerler DB'den okur (User.current_balance).
+
+    User kaydedilince (is_active, şifre, username ...) users/signals.py cache'i düşürür.
+    QuerySet.update() sinyal üretmez; öyle yapılan değişiklikler en geç ttl sonra görünür.
+    """
+
+    KEY_PREFIX = "authtoken:key:"
+    CACHED_FIELDS = ("id", "username", "email", "is_active", "is_staff", "is_superuser", "role")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, "AUTH_TOKEN_CACHE_TTL", 60)
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _user(self, values: tuple):
+        # from_db değerleri modelin alan sırasıyla bekler
+        by_field = dict(zip(self.CACHED_FIELDS, values))
+        fields = [f.attname for f in User._meta.concrete_fields if f.attname in by_field]
+        return User.from_db(DEFAULT_DB_ALIAS, fields, [by_field[f] for f in fields])
+
+    def get_user(self, key: str):
+        """Token geçerliyse user, değilse None. Miss'te tek bir join sorgusu."""
+        values = cache.get(self.KEY_PREFIX + key)
+        if values is not None:
+            self._count(hit=True)
+            return self._user(values)
+
+        self._count(hit=False)
+        values = (
+            Token.objects.filter(key=key)
+            .values_list(*(f"user__{field}" for field in self.CACHED_FIELDS))
+            .first()
+        )
+        if values is None:
+            return None
+
+        cache.set(self.KEY_PREFIX + key, values, timeout=self.ttl)
+        return self._user(values)
+
+    def invalidate(self, key: str):
+        cache.delete(self.KEY_PREFIX + key)
+
+    def invalidate_user(self, user_id: int):
+        keys = Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+        cache.delete_many([self.KEY_PREFIX + key for key in keys])
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenUserCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """DRF TokenAuthentication; her istekte authtoken_token join'i yerine token_cache."""
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+
+        return (user, key)
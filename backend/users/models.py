@@ -11,6 +11,17 @@ class User(AbstractUser):
     balance = models.IntegerField(default=1000)
     date_of_birth = models.DateField(null=True, blank=True)  # yaş kontrolü için
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # leaderboard sıralaması (game/leaderboard.py)
+            models.Index(fields=["-balance", "id"], name="users_user_balance_rank_idx"),
+        ]
+
+    def current_balance(self) -> int:
+        """Token cache'inden gelen instance bayat olabilir; bakiyeyi DB'den okur."""
+        balance = type(self).objects.filter(id=self.id).values_list("balance", flat=True).first()
+        return balance if balance is not None else self.balance
+
     def is_adult(self) -> bool:
         if not self.date_of_birth:
             return False
@@ -1,3 +1,55 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.authtoken.models import Token
 
-# Create your tests here.
+from .authentication import TokenUserCache
+from .models import User
+
+
+class TokenUserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", password="secret12", is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.cache = TokenUserCache()
+
+    def test_cache_holds_only_whitelisted_fields(self):
+        self.cache.get_user(self.token.key)
+        cached = cache.get(TokenUserCache.KEY_PREFIX + self.token.key)
+        self.assertEqual(cached, (self.user.id, "alice", "", True, True, False, User.Role.USER))
+        self.assertNotIn(self.user.password, cached)
+
+    def test_hit_needs_no_query_and_keeps_fields(self):
+        self.cache.get_user(self.token.key)
+        with self.assertNumQueries(0):
+            user = self.cache.get_user(self.token.key)
+            self.assertEqual((user.id, user.username, user.is_active, user.is_staff), (self.user.id, "alice", True, True))
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_cached_user_save_does_not_touch_other_fields(self):
+        user = self.cache.get_user(self.token.key)
+        self.assertIn("password", user.get_deferred_fields())
+        user.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("secret12"))
+
+    def test_deactivation_invalidates(self):
+        self.cache.get_user(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.cache.get_user(self.token.key).is_active)
+
+    def test_password_change_invalidates(self):
+        self.cache.get_user(self.token.key)
+        self.user.set_password("changed12")
+        self.user.save()
+        self.assertIsNone(cache.get(TokenUserCache.KEY_PREFIX + self.token.key))
+
+    def test_token_delete_invalidates(self):
+        key = self.token.key
+        self.cache.get_user(key)
+        self.token.delete()
+        self.assertIsNone(self.cache.get_user(key))
+
+    def test_unknown_token(self):
+        self.assertIsNone(self.cache.get_user("nope"))
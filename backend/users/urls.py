@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import SignupView, LoginView, MeView
+from .views import SignupView, LoginView, LogoutView, MeView
 
 urlpatterns = [
     path("signup/", SignupView.as_view(), name="auth-signup"),
     path("login/", LoginView.as_view(), name="auth-login"),
+    path("logout/", LogoutView.as_view(), name="auth-logout"),
     path("me/", MeView.as_view(), name="auth-me"),
 ]
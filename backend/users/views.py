@@ -99,10 +99,22 @@ class MeView(APIView):
                 "username": u.username,
                 "email": getattr(u, "email", ""),
                 "role": getattr(u, "role", "user"),
-                "balance": getattr(u, "balance", 0),
+                "balance": u.current_balance(),
             }
         )
 
 
+class LogoutView(APIView):
+    """
+    POST /api/auth/logout/
+    Token silinir; token cache'i post_delete sinyaliyle temizlenir.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        Token.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 # --- Backward compatible aliases (eğer eski importlar varsa patlamasın diye) ---
 RegisterView = SignupView
@@ -10,7 +10,7 @@ export default function AdminBetSettings({ token, me, onError }) {
       onError("");
       setInfo("");
       try {
-        const res = await api.betSettings(token);
+        const res = await api("/api/bet-settings/");
         setData(res);
       } catch (e) {
         if (e.status === 404) {
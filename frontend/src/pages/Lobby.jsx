@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
-import { api } from "../api";
+import { api, getToken } from "../api";
 
 const STATUS = ["all", "open", "full", "finished"];
 
@@ -37,17 +37,13 @@ export default function Lobby({ user }) {
   async function refreshAll() {
     setError("");
     try {
-      const [meRes, roomsRes, lbRes, txRes] = await Promise.all([
-        api("/api/me/"),
-        api("/api/rooms/"),
-        api("/api/leaderboard/"),
-        api("/api/transactions/"),
-      ]);
-
-      setMe(meRes);
-      setRooms(Array.isArray(roomsRes) ? roomsRes : roomsRes.results || []);
-      setLeaderboard(Array.isArray(lbRes) ? lbRes : lbRes.results || []);
-      setTxs(Array.isArray(txRes) ? txRes : txRes.results || []);
+      // me + rooms + leaderboard + transactions tek istekte
+      const data = await api("/api/lobby/bootstrap/");
+
+      setMe(data.me);
+      setRooms(data.rooms?.results || []);
+      setLeaderboard(data.leaderboard || []);
+      setTxs(data.transactions?.results || []);
     } catch (e) {
       setError(e?.message || "Veri çekilemedi.");
     }
@@ -58,6 +54,33 @@ export default function Lobby({ user }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // canlı lobby feed: polling yerine snapshot + ROOM_CREATED / ROOM_FILLED / ROOM_FINISHED delta'ları
+  useEffect(() => {
+    const token = getToken();
+    const ws = new WebSocket(`ws://127.0.0.1:8000/ws/lobby/?token=${encodeURIComponent(token || "")}`);
+
+    ws.onmessage = (m) => {
+      try {
+        const msg = JSON.parse(m.data);
+        if (msg.type === "LOBBY_SNAPSHOT") {
+          setRooms((prev) => upsertRooms(prev, msg.payload?.rooms || []));
+          return;
+        }
+        if (msg.type === "LOBBY_EVENT" && msg.payload?.room) {
+          setRooms((prev) => upsertRooms(prev, [msg.payload.room]));
+        }
+      } catch {
+        // ignore
+      }
+    };
+
+    return () => {
+      try {
+        ws.close();
+      } catch {}
+    };
+  }, []);
+
   function normalizeBet(v) {
     const n = Number(v);
     if (!Number.isFinite(n)) return 50;
@@ -379,6 +402,12 @@ export default function Lobby({ user }) {
   );
 }
 
+function upsertRooms(prev, incoming) {
+  const byId = new Map(prev.map((r) => [r.id, r]));
+  for (const r of incoming) byId.set(r.id, { ...byId.get(r.id), ...r });
+  return Array.from(byId.values()).sort((a, b) => b.id - a.id);
+}
+
 function formatDT(s) {
   if (!s) return "-";
   try {
@@ -34,17 +34,13 @@ export default function Lobby({ user }) {
   async function refreshAll() {
     setError("");
     try {
-      const [meRes, roomsRes, lbRes, txRes] = await Promise.all([
-        api("/api/me/"),
-        api("/api/rooms/"),
-        api("/api/leaderboard/"),
-        api("/api/transactions/"),
-      ]);
-
-      setMe(meRes);
-      setRooms(Array.isArray(roomsRes) ? roomsRes : roomsRes.results || []);
-      setLeaderboard(Array.isArray(lbRes) ? lbRes : lbRes.results || []);
-      setTxs(Array.isArray(txRes) ? txRes : txRes.results || []);
+      // me + rooms + leaderboard + transactions tek istekte
+      const data = await api("/api/lobby/bootstrap/");
+
+      setMe(data.me);
+      setRooms(data.rooms?.results || []);
+      setLeaderboard(data.leaderboard || []);
+      setTxs(data.transactions?.results || []);
     } catch (e) {
       setError(e?.message || "Veri çekilemedi.");
     }
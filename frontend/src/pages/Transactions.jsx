@@ -3,17 +3,22 @@ import { api } from "../api.js";
 
 export default function Transactions() {
   const [rows, setRows] = useState([]);
+  const [cursor, setCursor] = useState(null);
   const [err, setErr] = useState("");
 
+  async function load(next) {
+    try {
+      const data = await api(`/api/transactions/${next ? `?cursor=${next}` : ""}`);
+      const page = Array.isArray(data) ? data : data?.results || [];
+      setRows((prev) => (next ? [...prev, ...page] : page));
+      setCursor(data?.next_cursor || null);
+    } catch (e) {
+      setErr(String(e.message || e));
+    }
+  }
+
   useEffect(() => {
-    (async () => {
-      try {
-        const data = await api("/api/transactions/");
-        setRows(Array.isArray(data) ? data : data?.results || []);
-      } catch (e) {
-        setErr(String(e.message || e));
-      }
-    })();
+    load(null);
   }, []);
 
   return (
@@ -44,9 +49,24 @@ export default function Transactions() {
           {!rows.length ? <tr><td style={td} colSpan={5}>Kayıt yok.</td></tr> : null}
         </tbody>
       </table>
+
+      {cursor ? (
+        <button style={btn} onClick={() => load(cursor)} type="button">
+          Daha fazla
+        </button>
+      ) : null}
     </div>
   );
 }
 
 const th = { padding: "10px 8px" };
 const td = { padding: "12px 8px" };
+const btn = {
+  marginTop: 12,
+  padding: "10px 12px",
+  borderRadius: 10,
+  border: "1px solid #3a3a3a",
+  background: "#1d1d1d",
+  color: "#fff",
+  cursor: "pointer",
+};